@@ -20,6 +20,14 @@ class IndexType(str, Enum):
     IVF = "IVF"
     ISH = "ISH"
 
+class StorageFormat(str, Enum):
+    HEAP = "heap"
+    COLUMNAR = "columnar"
+
+class CompressionType(str, Enum):
+    NONE = "none"
+    ZLIB = "zlib"
+
 # Auth schemas
 class UserRegister(BaseModel):
     username: str
@@ -41,12 +49,16 @@ class ColumnDefinition(BaseModel):
     data_type: DataType
     size: Optional[int] = None  # For VARCHAR(n)
     index_type: Optional[IndexType] = None
+    bloom_filter: bool = False  # Per-page bloom filter for equality filters on this column
+    date_format: Optional[str] = None  # strptime format of DATE values, detected on load when not given
 
 class CreateTableRequest(BaseModel):
     table_name: str
     file_name: str
     columns: List[ColumnDefinition]
     has_headers: bool = True # Nuevo campo con valor por defecto
+    storage_format: StorageFormat = StorageFormat.HEAP
+    compression: CompressionType = CompressionType.NONE
 
 class TableInfo(BaseModel):
     name: str
@@ -58,6 +70,14 @@ class TableResponse(BaseModel):
     message: str
     table_name: str
     rows_inserted: int
+    rows_per_second: Optional[float] = None
+
+class BulkInsertResponse(BaseModel):
+    table_name: str
+    rows_inserted: int
+    rows_per_second: float
+    io_operations: int
+    execution_time_ms: float
 
 # File schemas
 class FileInfo(BaseModel):
@@ -68,6 +88,8 @@ class FileInfo(BaseModel):
 class FileUploadResponse(BaseModel):
     filename: str
     message: str
+    size: Optional[int] = None
+    sha256: Optional[str] = None
 
 # Query schemas
 class QueryRequest(BaseModel):
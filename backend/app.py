@@ -1,20 +1,26 @@
-from fastapi import FastAPI, Depends, HTTPException, UploadFile, File, Query,APIRouter,Form
+from fastapi import FastAPI, Depends, HTTPException, UploadFile, File, Query,APIRouter,Form,Request
 from fastapi.security import HTTPBearer
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 import os
+import uuid
 from dotenv import load_dotenv
 import json
 
 from auth.auth_service import AuthService, get_current_user
 from catalog.metadata_catalog import MetadataCatalog
 from storage.storage_manager import StorageManager
-from query.query_planner import QueryPlanner
+from query.query_planner import BulkInsertError, QueryPlanner
+from storage.arrow_io import write_batches
 from api.schemas import *
 from api.responses import *
+from utils.logger import get_logger
 from utils.metrics import MetricsService
 
 load_dotenv()
 
+logger = get_logger(__name__)
+
 app = FastAPI(
     title="BD2 Project API",
     description="Database Management System with Custom Indices",
@@ -34,8 +40,8 @@ security = HTTPBearer()
 
 # Services
 auth_service = AuthService()
-catalog = MetadataCatalog()
 storage_manager = StorageManager()
+catalog = MetadataCatalog(storage_manager)
 query_planner = QueryPlanner(catalog, storage_manager)
 metrics_service = MetricsService()
 
@@ -44,6 +50,18 @@ async def startup_event():
     await auth_service.initialize()
     await catalog.initialize()
     await storage_manager.initialize()
+    # Replay committed writes left in the WAL before serving any request
+    recovered_files = await storage_manager.recover()
+    await catalog.reconcile_row_counts(recovered_files)
+    storage_manager.start_checkpointer()
+    catalog.vacuum.start()
+    catalog.index_compactor.start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await catalog.index_compactor.stop()
+    await catalog.vacuum.stop()
+    await storage_manager.shutdown()
 
 # API Router with prefix
 api_router = APIRouter()
@@ -84,6 +102,8 @@ async def create_table(
     table_name: str = Form(...),
     columns: str = Form(...),
     has_headers: str = Form("true"),  # Nuevo parámetro
+    storage_format: StorageFormat = Form(StorageFormat.HEAP),
+    compression: CompressionType = Form(CompressionType.NONE),
     file: UploadFile = File(...),
     current_user: dict = Depends(get_current_user)
 ):
@@ -94,10 +114,9 @@ async def create_table(
     # Guarda el archivo en el servidor
     file_path = os.path.join(upload_dir, file.filename)
     
-    # Escribir el archivo
-    with open(file_path, "wb") as f:
-        content = await file.read()
-        f.write(content)
+    # Escribir el archivo por bloques (límite de tamaño y hash mientras llega)
+    size, sha256 = await storage_manager.save_upload(file, file_path)
+    logger.info("Upload %s: %d bytes, sha256 %s", file.filename, size, sha256)
     
     # Verificar que el archivo se guardó correctamente
     if not os.path.exists(file_path):
@@ -117,7 +136,9 @@ async def create_table(
         table_name=table_name,
         file_name=file_path,
         columns=columns_data,
-        has_headers=has_headers_bool  # Agregar este campo
+        has_headers=has_headers_bool,  # Agregar este campo
+        storage_format=storage_format,
+        compression=compression
     )
     
     # Llama al método create_table
@@ -175,6 +196,54 @@ async def get_table_data(
         print(f"Error in get_table_data endpoint: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@api_router.post("/tables/{table_name}/bulk_insert", response_model=BulkInsertResponse)
+async def bulk_insert(
+    table_name: str,
+    request: Request,
+    format: Optional[str] = Query(None, pattern="^(csv|ndjson)$"),
+    has_headers: bool = Query(True),
+    current_user: dict = Depends(get_current_user)
+):
+    # CSV o NDJSON según el parámetro format o el Content-Type del cuerpo
+    content_type = request.headers.get("content-type", "")
+    body_format = format or ("ndjson" if "json" in content_type else "csv")
+    
+    upload_dir = "backend/uploads"
+    os.makedirs(upload_dir, exist_ok=True)
+    file_path = os.path.join(upload_dir, f"bulk_{uuid.uuid4().hex}.{body_format}")
+    
+    # El cuerpo se escribe a disco por bloques a medida que llega
+    size, sha256 = await storage_manager.save_stream(request.stream(), file_path)
+    logger.info("Bulk insert body for %s: %d bytes, sha256 %s", table_name, size, sha256)
+    try:
+        return await query_planner.bulk_insert(table_name, file_path, current_user["user_id"], has_headers)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except BulkInsertError as e:
+        # Los bloques ya confirmados se quedan en la tabla
+        raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        os.remove(file_path)
+
+@api_router.get("/tables/{table_name}/export")
+async def export_table(
+    table_name: str,
+    format: str = Query("arrow", pattern="^(arrow|parquet)$"),
+    query: Optional[str] = Query(None),
+    current_user: dict = Depends(get_current_user)
+):
+    # Tabla completa o resultado de un SELECT, como stream Arrow IPC o archivo Parquet
+    try:
+        schema, batches = await query_planner.arrow_batches(table_name, current_user["user_id"], query)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    media_type = "application/vnd.apache.parquet" if format == "parquet" else "application/vnd.apache.arrow.stream"
+    return StreamingResponse(
+        write_batches(schema, batches, format),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{table_name}.{format}"'}
+    )
+
 # Query execution endpoint
 @api_router.post("/query", response_model=QueryResponse)
 async def execute_query(
@@ -1,18 +1,50 @@
+import asyncio
+import itertools
 import os
 import json
-from typing import Dict, List, Optional
+import time
+from typing import Dict, List, Optional, Set
 from datetime import datetime
-from api.schemas import CreateTableRequest, TableInfo, ColumnDefinition, TableResponse
-from storage.file_processor import FileProcessor
+from api.schemas import CreateTableRequest, TableInfo, ColumnDefinition, TableResponse, StorageFormat
+from storage.file_processor import BATCH_ROWS, FileProcessor
+from storage.mapped_reader import MappedHeapReader
+from storage.storage_manager import StorageManager
+from catalog.table_statistics import TableStatsBuilder, merge_table_statistics
+from storage.table_storage import create_table_storage, data_file_name, open_table_storage, remove_table_storage
+from indices.index_interface import IndexInterface, remove_index_files, replace_index_files
+from indices.index_compactor import IndexCompactor
+from catalog.vacuum import VacuumWorker
 from utils.metrics import MetricsService
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Table properties whose change invalidates the plans built for the table
+SCHEMA_PROPERTIES = {"columns", "indices", "storage_format", "compression"}
+
 
 class MetadataCatalog:
-    def __init__(self):
+    def __init__(self, storage_manager: Optional[StorageManager] = None):
         self.catalog_file = os.getenv("CATALOG_FILE", "./catalog.json")
         self.data_dir = os.getenv("DATA_DIR", "./data")  # Cambiar de "../data" a "./data"
         self.catalog: Dict = {}
+        # Bumped on every schema change (tables, indices, storage, ANALYZE); keys the plan cache
+        self.version = 0
         self.file_processor = FileProcessor()
+        self.storage_manager = storage_manager or StorageManager()
+        self.index_interface = IndexInterface()
         self.metrics = MetricsService()
+        self.vacuum = VacuumWorker(
+            self,
+            interval=float(os.getenv("VACUUM_INTERVAL_SECONDS", "60")),
+            dead_ratio=float(os.getenv("VACUUM_DEAD_RATIO", "0.2"))
+        )
+        self.index_compactor = IndexCompactor(
+            self,
+            interval=float(os.getenv("INDEX_COMPACTION_INTERVAL_SECONDS", "30")),
+            dead_ratio=float(os.getenv("INDEX_COMPACTION_DEAD_RATIO", "0.5")),
+            max_bytes_per_second=int(float(os.getenv("INDEX_COMPACTION_MB_PER_SECOND", "8")) * 1024 * 1024)
+        )
     
     async def initialize(self):
         # Crear directorio de datos si no existe
@@ -43,43 +75,76 @@ class MetadataCatalog:
         if not os.path.exists(file_path):
             raise ValueError(f"File {file_path} not found")
         
-        # Process file data
-        processed_data = await self.file_processor.process_file(file_path, table_data.columns, table_data.has_headers)
-        
         # Crear directorio de datos del usuario si no existe
         user_data_dir = os.path.join(self.data_dir, str(user_id))
         os.makedirs(user_data_dir, exist_ok=True)
         
         # Usar rutas absolutas para evitar problemas
-        data_file_name = f"{table_key}.dat"
-        data_file_path = os.path.join(user_data_dir, data_file_name)
+        data_file_path = os.path.join(user_data_dir, data_file_name(table_key, table_data.storage_format))
         data_file_path = os.path.abspath(data_file_path)  # Convertir a ruta absoluta
         
-        # Save processed data
-        await self.file_processor.save_table_data(data_file_path, processed_data)
+        if not table_data.columns:
+            # Parquet/Arrow files carry their schema
+            table_data.columns = self.file_processor.infer_columns(file_path)
+        columns = [col.dict() for col in table_data.columns]
+        
+        # Stream the file into the requested binary format: each converted batch
+        # is written (and folded into the statistics) before the next one is read
+        table_storage = create_table_storage(table_data.storage_format, data_file_path, columns, self.storage_manager,
+                                             table_data.compression)
+        statistics = TableStatsBuilder(columns)
+        
+        # Declared indices are filled batch by batch as the rows are written
+        indices = {}
+        for col in table_data.columns:
+            if col.index_type:
+                indices[col.name] = {
+                    "type": col.index_type,
+                    "path": await self._create_index(user_data_dir, table_key, col.name, col.index_type)
+                }
+        index_target = {"columns": columns, "indices": indices}
+        
+        async def converted_batches():
+            position = 0
+            async for batch in self.file_processor.iter_batches(file_path, table_data.columns, table_data.has_headers):
+                statistics.add_rows(batch)
+                await asyncio.to_thread(self.index_interface.update_table_indices, index_target, batch, position)
+                position += len(batch)
+                yield batch
+        
+        started = time.perf_counter()
+        try:
+            row_count = await table_storage.write_batches(converted_batches())
+        except Exception:
+            async with self.storage_manager.exclusive():
+                remove_table_storage(data_file_path)
+                self.storage_manager.invalidate_file(data_file_path)
+            for index_info in indices.values():
+                remove_index_files(index_info["path"])
+            raise
+        elapsed = time.perf_counter() - started
+        # Incluye los formatos de fecha detectados durante la carga
+        columns = [col.dict() for col in table_data.columns]
+        rows_per_second = row_count / elapsed if elapsed > 0 else float(row_count)
+        print(f"Loaded {row_count} rows into {table_data.table_name} in {elapsed:.2f}s ({rows_per_second:.0f} rows/s)")
         
         # Create table metadata
         table_metadata = {
             "name": table_data.table_name,
             "user_id": user_id,
             "file_path": file_path,
-            "columns": [col.dict() for col in table_data.columns],
-            "row_count": len(processed_data),
+            "columns": columns,
+            "row_count": row_count,
             "created_at": datetime.now().isoformat(),
             "data_file": data_file_path,  # Guardar la ruta absoluta
-            "indices": {}
+            "storage_format": table_data.storage_format.value,
+            "compression": table_data.compression.value,
+            "statistics": statistics.result(),
+            "indices": indices
         }
         
-        # Create indices for columns that specify them
-        for col in table_data.columns:
-            if col.index_type:
-                index_path = await self._create_index(table_key, col.name, col.index_type, processed_data)
-                table_metadata["indices"][col.name] = {
-                    "type": col.index_type,
-                    "path": index_path
-                }
-        
         self.catalog["tables"][table_key] = table_metadata
+        self.version += 1
         await self._save_catalog()
         
         print(f"Table created successfully. Data file: {data_file_path}")  # Debug
@@ -87,21 +152,18 @@ class MetadataCatalog:
         return TableResponse(
             message=f"Table {table_data.table_name} created successfully",
             table_name=table_data.table_name,
-            rows_inserted=len(processed_data)
+            rows_inserted=row_count,
+            rows_per_second=round(rows_per_second, 1)
         )
     
-    async def _create_index(self, table_key: str, column_name: str, index_type: str, data: List[List]) -> str:
-        # This would interface with your existing index implementations
-        index_dir = os.getenv("INDEX_DIR", "./index")
+    async def _create_index(self, index_dir: str, table_key: str, column_name: str, index_type: str) -> str:
+        """Path of a new, empty index next to the table data; its implementation creates the files"""
+        # INDEX_DIR apunta a las implementaciones de /index, no a los datos
         index_file = f"{table_key}_{column_name}_{index_type.lower()}.idx"
-        index_path = os.path.join(index_dir, index_file)
+        index_path = os.path.abspath(os.path.join(index_dir, index_file))
         
-        # Here you would call the appropriate index creation method
-        # from your existing index implementations
-        # For now, we'll create a placeholder
-        os.makedirs(os.path.dirname(index_path), exist_ok=True)
-        with open(index_path, 'w') as f:
-            f.write(f"Index for {table_key}.{column_name} using {index_type}")
+        # Restos de una tabla anterior con el mismo nombre
+        remove_index_files(index_path)
         
         return index_path
     
@@ -129,19 +191,117 @@ class MetadataCatalog:
         # Delete data file
         data_file_path = metadata.get("data_file")
         if data_file_path and os.path.exists(data_file_path):
-            os.remove(data_file_path)
+            # Checkpointed first: no log record may outlive the file it refers to
+            async with self.storage_manager.exclusive():
+                remove_table_storage(data_file_path)
+                self.storage_manager.invalidate_file(data_file_path)
         
         # Delete index files
         for col_name, index_info in metadata.get("indices", {}).items():
-            if os.path.exists(index_info["path"]):
-                os.remove(index_info["path"])
+            remove_index_files(index_info["path"])
         
         # Remove from catalog
         del self.catalog["tables"][table_key]
+        self.version += 1
         await self._save_catalog()
         
         return {"message": f"Table {table_name} deleted successfully"}
     
+    async def reconcile_row_counts(self, data_files: Set[str]):
+        """Recount the rows of heap tables whose files were replayed from the WAL"""
+        changed = False
+        for metadata in self.catalog["tables"].values():
+            if metadata.get("data_file") not in data_files or metadata.get("storage_format") != StorageFormat.HEAP.value:
+                continue
+            heap_file = open_table_storage(metadata, self.storage_manager)
+            metadata["dead_rows"] = await heap_file.count_deleted_rows()
+            metadata["row_count"] = await heap_file.count_rows() - metadata["dead_rows"]
+            changed = True
+        if changed:
+            await self._save_catalog()
+    
+    async def set_table_statistics(self, table_name: str, user_id: int, statistics: Dict):
+        """Replace the column statistics of a table (ANALYZE)"""
+        self.version += 1
+        await self.set_table_properties(table_name, user_id, statistics=statistics, row_count=statistics["row_count"])
+    
+    async def record_appended_rows(self, table_name: str, user_id: int, added_statistics: Dict):
+        """Add the row count and statistics of appended rows with a single catalog write"""
+        metadata = self._require_table(table_name, user_id)
+        await self.set_table_properties(
+            table_name, user_id,
+            row_count=metadata["row_count"] + added_statistics["row_count"],
+            statistics=merge_table_statistics(metadata.get("statistics"), added_statistics)
+        )
+    
+    async def record_tombstones(self, table_name: str, user_id: int, tombstones: int, deleted: int = 0):
+        """Count the slots tombstoned by a DELETE (deleted rows) or by rows an UPDATE moved"""
+        metadata = self._require_table(table_name, user_id)
+        await self.set_table_properties(
+            table_name, user_id,
+            row_count=max(metadata["row_count"] - deleted, 0),
+            dead_rows=metadata.get("dead_rows", 0) + tombstones
+        )
+    
+    async def vacuum_table(self, table_name: str, user_id: int) -> int:
+        """Rewrite a heap table without its deleted rows and rebuild its indices.
+
+        Rows are renumbered, so the indices are rebuilt aside from the
+        compacted rows and swapped in right after the new data file.
+        Returns the number of row positions reclaimed.
+        """
+        metadata = self._require_table(table_name, user_id)
+        if metadata.get("storage_format") != StorageFormat.HEAP.value:
+            return 0
+        heap_file = open_table_storage(metadata, self.storage_manager)
+        async with self.storage_manager.exclusive():
+            # Leído con los locks tomados: otra sentencia pudo borrar filas mientras se esperaba
+            metadata = self._require_table(table_name, user_id)
+            dead_rows = metadata.get("dead_rows", 0)
+            if not dead_rows:
+                return 0
+            indices = metadata.get("indices", {})
+            rebuilt = {column: {**info, "path": info["path"] + ".vacuum"} for column, info in indices.items()}
+            for info in rebuilt.values():
+                remove_index_files(info["path"])
+            index_target = {"columns": metadata["columns"], "indices": rebuilt}
+            
+            async def live_batches():
+                rows = MappedHeapReader(heap_file, self.storage_manager).iter_rows()
+                position = 0
+                while True:
+                    batch = list(itertools.islice(rows, BATCH_ROWS))
+                    if not batch:
+                        return
+                    await asyncio.to_thread(self.index_interface.update_table_indices, index_target, batch, position)
+                    position += len(batch)
+                    yield batch
+            
+            try:
+                row_count = await heap_file.write_batches(live_batches())
+            except Exception:
+                for info in rebuilt.values():
+                    remove_index_files(info["path"])
+                raise
+            for column, info in indices.items():
+                replace_index_files(rebuilt[column]["path"], info["path"])
+            await self.set_table_properties(table_name, user_id, row_count=row_count, dead_rows=0)
+        logger.info("Vacuumed %s: %d deleted rows reclaimed", table_name, dead_rows)
+        return dead_rows
+    
+    async def set_table_properties(self, table_name: str, user_id: int, **properties):
+        """Update top-level metadata fields of a table and persist the catalog"""
+        self._require_table(table_name, user_id).update(properties)
+        if SCHEMA_PROPERTIES & properties.keys():
+            self.version += 1
+        await self._save_catalog()
+    
+    def _require_table(self, table_name: str, user_id: int) -> Dict:
+        metadata = self.get_table_metadata(table_name, user_id)
+        if metadata is None:
+            raise ValueError(f"Table {table_name} not found")
+        return metadata
+    
     def get_table_metadata(self, table_name: str, user_id: int) -> Optional[Dict]:
         table_key = f"{user_id}_{table_name}"
         return self.catalog["tables"].get(table_key)
@@ -0,0 +1,264 @@
+import hashlib
+import heapq
+import random
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+from api.schemas import DataType
+
+# Número de buckets de los histogramas equi-depth
+HISTOGRAM_BUCKETS = 32
+# Rows kept in the reservoir sample used to build histograms
+SAMPLE_SIZE = 30000
+# k of the KMV sketch: the k smallest value hashes give a mergeable distinct estimate
+KMV_SIZE = 128
+HASH_SPACE = float(2 ** 64)
+# Selectivity assumed when a predicate cannot be estimated
+DEFAULT_SELECTIVITY = 1 / 3
+
+ORDERED_TYPES = {DataType.INT, DataType.FLOAT, DataType.DATE, DataType.VARCHAR}
+NUMERIC_TYPES = {DataType.INT, DataType.FLOAT}
+
+
+def _value_hash(value: Any) -> int:
+    return int.from_bytes(hashlib.blake2b(repr(value).encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+def _coerce(value: Any, data_type: DataType) -> Any:
+    """Bring a literal from a query to the type the statistics were collected with"""
+    if data_type in NUMERIC_TYPES:
+        return float(value)
+    return str(value)
+
+
+class ColumnStatsBuilder:
+    """Single-pass collector of the statistics of one column"""
+
+    def __init__(self, data_type: DataType, sample_size: int = SAMPLE_SIZE):
+        self.data_type = data_type
+        self.sample_size = sample_size
+        self.row_count = 0
+        self.null_count = 0
+        self.min = None
+        self.max = None
+        self.sample: List[Any] = []
+        self.non_null_count = 0
+        self._kmv: List[int] = []  # max-heap (negated) of the smallest hashes
+        self._kmv_members = set()
+        # Semilla fija: el mismo contenido produce siempre el mismo histograma
+        self._random = random.Random(0)
+
+    def add(self, value: Any):
+        self.row_count += 1
+        if value is None:
+            self.null_count += 1
+            return
+        self.non_null_count += 1
+        self._add_hash(_value_hash(value))
+        if self.data_type not in ORDERED_TYPES:
+            return
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+        # Reservoir sampling (algoritmo R)
+        if len(self.sample) < self.sample_size:
+            self.sample.append(value)
+        else:
+            position = self._random.randrange(self.non_null_count)
+            if position < self.sample_size:
+                self.sample[position] = value
+
+    def _add_hash(self, value_hash: int):
+        if value_hash in self._kmv_members:
+            return
+        if len(self._kmv) < KMV_SIZE:
+            heapq.heappush(self._kmv, -value_hash)
+            self._kmv_members.add(value_hash)
+        elif value_hash < -self._kmv[0]:
+            removed = -heapq.heapreplace(self._kmv, -value_hash)
+            self._kmv_members.discard(removed)
+            self._kmv_members.add(value_hash)
+
+    def result(self) -> Dict[str, Any]:
+        kmv = sorted(-h for h in self._kmv)
+        return {
+            "row_count": self.row_count,
+            "null_count": self.null_count,
+            "min": self.min,
+            "max": self.max,
+            "distinct_count": _distinct_from_kmv(kmv),
+            "histogram": equi_depth_histogram(sorted(self.sample)),
+            "kmv": kmv,
+        }
+
+
+def _distinct_from_kmv(kmv: List[int]) -> int:
+    if len(kmv) < KMV_SIZE:
+        return len(kmv)
+    return int((KMV_SIZE - 1) * HASH_SPACE / (kmv[KMV_SIZE - 1] + 1))
+
+
+def equi_depth_histogram(sorted_values: List[Any], buckets: int = HISTOGRAM_BUCKETS) -> List[Any]:
+    """Bucket boundaries such that every bucket holds the same number of values"""
+    if not sorted_values:
+        return []
+    last = len(sorted_values) - 1
+    return [sorted_values[round(i * last / buckets)] for i in range(buckets + 1)]
+
+
+class TableStatsBuilder:
+    """Statistics of a whole table, fed batch by batch while it is loaded"""
+
+    def __init__(self, columns: List[Dict[str, Any]]):
+        self.columns = columns
+        self.builders = [ColumnStatsBuilder(DataType(col["data_type"])) for col in columns]
+        self.row_count = 0
+
+    def add_rows(self, rows: Iterable[List[Any]]):
+        for row in rows:
+            self.row_count += 1
+            for builder, value in zip(self.builders, row):
+                builder.add(value)
+
+    def result(self) -> Dict[str, Any]:
+        return {
+            "row_count": self.row_count,
+            "analyzed_at": datetime.now().isoformat(),
+            "columns": {col["name"]: builder.result() for col, builder in zip(self.columns, self.builders)},
+        }
+
+
+def build_table_statistics(columns: List[Dict[str, Any]], rows: Iterable[List[Any]]) -> Dict[str, Any]:
+    """Collect per-column statistics in one pass over rows"""
+    builder = TableStatsBuilder(columns)
+    builder.add_rows(rows)
+    return builder.result()
+
+
+def merge_table_statistics(current: Optional[Dict[str, Any]], added: Dict[str, Any]) -> Dict[str, Any]:
+    """Fold the statistics of newly loaded rows into the existing ones"""
+    if not current:
+        return added
+    columns = {}
+    for name, new_stats in added["columns"].items():
+        old_stats = current["columns"].get(name)
+        columns[name] = _merge_column_statistics(old_stats, new_stats) if old_stats else new_stats
+    return {
+        "row_count": current["row_count"] + added["row_count"],
+        "analyzed_at": current.get("analyzed_at"),
+        "refreshed_at": datetime.now().isoformat(),
+        "columns": columns,
+    }
+
+
+def _merge_column_statistics(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+    kmv = sorted(set(old["kmv"]) | set(new["kmv"]))[:KMV_SIZE]
+    bounds = [value for value in (old["min"], new["min"]) if value is not None]
+    upper = [value for value in (old["max"], new["max"]) if value is not None]
+    return {
+        "row_count": old["row_count"] + new["row_count"],
+        "null_count": old["null_count"] + new["null_count"],
+        "min": min(bounds) if bounds else None,
+        "max": max(upper) if upper else None,
+        "distinct_count": _distinct_from_kmv(kmv),
+        "histogram": _merge_histograms(old, new),
+        "kmv": kmv,
+    }
+
+
+def _merge_histograms(old: Dict[str, Any], new: Dict[str, Any]) -> List[Any]:
+    # Cada frontera representa la misma fracción de las filas no nulas de su histograma
+    weighted = []
+    for stats in (old, new):
+        bounds = stats["histogram"]
+        if bounds:
+            weight = (stats["row_count"] - stats["null_count"]) / len(bounds)
+            weighted.extend((value, weight) for value in bounds)
+    if not weighted:
+        return []
+    weighted.sort(key=lambda item: item[0])
+    total = sum(weight for _, weight in weighted)
+    histogram = []
+    cumulative = 0.0
+    target = 0
+    for value, weight in weighted:
+        cumulative += weight
+        while target <= HISTOGRAM_BUCKETS and cumulative >= total * target / HISTOGRAM_BUCKETS:
+            histogram.append(value)
+            target += 1
+    while len(histogram) < HISTOGRAM_BUCKETS + 1:
+        histogram.append(weighted[-1][0])
+    histogram[0] = weighted[0][0]
+    return histogram
+
+
+def _fraction_below(stats: Dict[str, Any], value: Any, data_type: DataType, inclusive: bool = False) -> float:
+    """Estimated fraction of non-null values smaller than value (or equal to it, when inclusive)"""
+    bounds = stats["histogram"]
+    if not bounds:
+        return DEFAULT_SELECTIVITY
+    value = _coerce(value, data_type)
+    bounds = [_coerce(bound, data_type) for bound in bounds]
+    if value < bounds[0]:
+        return 0.0
+    if value > bounds[-1]:
+        return 1.0
+    buckets = len(bounds) - 1
+    equal = 1 / max(stats["distinct_count"], 1)
+    first, last = bisect_left(bounds, value), bisect_right(bounds, value)
+    if first < last:
+        # El valor es un límite: su masa son los buckets que llena, al menos la de un valor distinto
+        if not buckets:
+            return 1.0 if inclusive else 0.0
+        equal = max((last - first - 1) / buckets, equal)
+        below = min(first / buckets, 1 - equal)
+    else:
+        low, high = bounds[first - 1], bounds[first]
+        within = 0.5
+        if data_type in NUMERIC_TYPES:
+            within = (value - low) / (high - low)
+        below = (first - 1 + within) / buckets
+    return min(below + equal, 1.0) if inclusive else below
+
+
+def estimate_selectivity(stats: Optional[Dict[str, Any]], data_type: DataType, operator: str, value: Any) -> float:
+    """Fraction of the rows of a table expected to satisfy `column operator value`"""
+    if not stats or not stats["row_count"]:
+        return DEFAULT_SELECTIVITY
+    non_null = 1 - stats["null_count"] / stats["row_count"]
+    try:
+        if value is None:
+            return stats["null_count"] / stats["row_count"] if operator == "=" else non_null
+        if operator == "=":
+            return non_null / max(stats["distinct_count"], 1)
+        if operator == "!=":
+            return non_null * (1 - 1 / max(stats["distinct_count"], 1))
+        if operator in ("<", "<="):
+            return non_null * _fraction_below(stats, value, data_type, inclusive=operator == "<=")
+        if operator in (">", ">="):
+            return non_null * (1 - _fraction_below(stats, value, data_type, inclusive=operator == ">"))
+        if operator == "BETWEEN":
+            start, end = value
+            fraction = _fraction_below(stats, end, data_type, inclusive=True) - _fraction_below(stats, start, data_type)
+            return non_null * max(fraction, 1 / max(stats["distinct_count"], 1))
+        if operator == "IN":
+            values = {v for v in value if v is not None}
+            return min(non_null, non_null * len(values) / max(stats["distinct_count"], 1))
+        if operator in ("NOT IN", "NOT BETWEEN"):
+            # NULL no satisface ni la condición ni su negación
+            return max(non_null - estimate_selectivity(stats, data_type, operator[len("NOT "):], value), 0.0)
+    except (TypeError, ValueError):
+        pass
+    return DEFAULT_SELECTIVITY
+
+
+def estimate_condition_selectivity(table_metadata: Dict[str, Any], condition: Dict[str, Any]) -> float:
+    """Selectivity of a parsed WHERE condition using the statistics stored in the catalog"""
+    statistics = table_metadata.get("statistics") or {}
+    stats = statistics.get("columns", {}).get(condition["column"])
+    data_types = {col["name"]: DataType(col["data_type"]) for col in table_metadata["columns"]}
+    data_type = data_types.get(condition["column"])
+    if data_type is None:
+        return DEFAULT_SELECTIVITY
+    return estimate_selectivity(stats, data_type, condition["operator"], condition["value"])
@@ -0,0 +1,68 @@
+import asyncio
+from typing import Any, Dict, Optional
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class VacuumWorker:
+    """Background task that vacuums heap tables with many deleted rows.
+
+    Runs every interval seconds, or earlier when a DELETE/UPDATE asks for it,
+    and rewrites one table at a time: the tables whose deleted rows reach
+    dead_ratio of their row positions.
+    """
+
+    def __init__(self, catalog, interval: float = 60.0, dead_ratio: float = 0.2, min_dead_rows: int = 64):
+        self.catalog = catalog
+        self.interval = interval
+        self.dead_ratio = dead_ratio
+        self.min_dead_rows = min_dead_rows
+        self.vacuums = 0
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+
+    def start(self):
+        if self._task is None:
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def request(self):
+        """Ask for an early pass (called after DML leaves a table with many deleted rows)"""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def needs_vacuum(self, table_metadata: Dict[str, Any]) -> bool:
+        dead_rows = table_metadata.get("dead_rows", 0)
+        positions = table_metadata["row_count"] + dead_rows
+        return dead_rows >= self.min_dead_rows and dead_rows >= positions * self.dead_ratio
+
+    async def run_once(self) -> int:
+        """Vacuum every table that needs it. Returns the row positions reclaimed"""
+        reclaimed = 0
+        for metadata in list(self.catalog.catalog["tables"].values()):
+            if self.needs_vacuum(metadata):
+                reclaimed += await self.catalog.vacuum_table(metadata["name"], metadata["user_id"])
+                self.vacuums += 1
+        return reclaimed
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.run_once()
+            except Exception:
+                logger.exception("Vacuum failed")
@@ -0,0 +1,142 @@
+import asyncio
+import os
+from typing import List, Optional, Tuple
+from indices.index_interface import (
+    INDEX_FILE_SUFFIXES, IndexType, as_index_type, index_files_signature, read_dead_bytes, remove_index_files,
+    replace_index_files
+)
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Indices of /index whose compact_data_file rewrites their own data file
+COMPACTABLE_TYPES = (IndexType.BTREE, IndexType.HASH, IndexType.AVL)
+COPY_CHUNK_SIZE = 1024 * 1024
+
+
+class IndexCompactor:
+    """Background task that compacts the data files of the table indices.
+
+    The B+ tree, extendible hash and AVL files append a new version of a
+    record on every update, and RecordFileIndex counts the bytes left behind
+    in a .stats file. Every interval seconds, the indices whose dead bytes
+    reach dead_ratio of their data file are compacted one at a time, reading
+    and writing at most max_bytes_per_second.
+
+    Compaction runs on a copy of the index files in a worker thread, and the
+    result is swapped in with os.replace from the event loop, so lookups keep
+    using the old files meanwhile. If the index was written in between, the
+    copy is dropped and the index is retried on a later pass.
+    """
+
+    def __init__(self, catalog, interval: float = 30.0, dead_ratio: float = 0.5,
+                 min_bytes: int = 64 * 1024, max_bytes_per_second: int = 8 * 1024 * 1024):
+        self.catalog = catalog
+        self.interval = interval
+        self.dead_ratio = dead_ratio
+        self.min_bytes = min_bytes
+        self.max_bytes_per_second = max_bytes_per_second
+        self.compactions = 0
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+
+    def start(self):
+        if self._task is None:
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def request(self):
+        """Ask for an early pass"""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def candidates(self) -> List[Tuple[IndexType, str]]:
+        """(type, path) of the table indices whose data file is worth compacting"""
+        found = []
+        for metadata in list(self.catalog.catalog["tables"].values()):
+            for index_info in metadata.get("indices", {}).values():
+                try:
+                    index_type = as_index_type(index_info["type"])
+                except ValueError:
+                    continue
+                if index_type in COMPACTABLE_TYPES and self.needs_compaction(index_info["path"]):
+                    found.append((index_type, index_info["path"]))
+        return found
+
+    def needs_compaction(self, filepath: str) -> bool:
+        data_file = f"{filepath}.data"
+        size = os.path.getsize(data_file) if os.path.exists(data_file) else 0
+        return size >= self.min_bytes and read_dead_bytes(filepath) >= size * self.dead_ratio
+
+    async def run_once(self) -> int:
+        """Compact every index that needs it. Returns the number compacted"""
+        compacted = 0
+        for index_type, filepath in self.candidates():
+            if await self.compact(index_type, filepath):
+                compacted += 1
+                self.compactions += 1
+        return compacted
+
+    async def compact(self, index_type: IndexType, filepath: str) -> bool:
+        """Compact one index aside and swap it in. False if it changed meanwhile"""
+        signature = index_files_signature(filepath)
+        work_path = f"{filepath}.compact"
+        remove_index_files(work_path)
+        try:
+            for suffix in INDEX_FILE_SUFFIXES:
+                # La copia compactada empieza sin bytes muertos: sin .stats
+                if suffix != ".stats" and os.path.exists(filepath + suffix):
+                    await self._copy(filepath + suffix, work_path + suffix)
+            await asyncio.to_thread(self._compact_copy, index_type, work_path)
+            written = os.path.getsize(f"{work_path}.data") if os.path.exists(f"{work_path}.data") else 0
+            # Comprobación e intercambio sin ceder el event loop: ninguna búsqueda ve un estado intermedio
+            if index_files_signature(filepath) != signature:
+                logger.info("Index %s changed during compaction, retrying later", os.path.basename(filepath))
+                return False
+            before = os.path.getsize(f"{filepath}.data")
+            replace_index_files(work_path, filepath)
+        finally:
+            remove_index_files(work_path)
+        logger.info("Compacted index %s: %d -> %d bytes", os.path.basename(filepath), before, written)
+        # Lo escrito por la compactación también cuenta para el límite de E/S
+        await self._throttle(written)
+        return True
+
+    def _compact_copy(self, index_type: IndexType, work_path: str):
+        index = self.catalog.index_interface.open_index(index_type, work_path)
+        index.index.compact_data_file()
+
+    async def _copy(self, source: str, target: str):
+        with open(source, 'rb') as src, open(target, 'wb') as dst:
+            while True:
+                chunk = src.read(COPY_CHUNK_SIZE)
+                if not chunk:
+                    break
+                dst.write(chunk)
+                await self._throttle(len(chunk))
+
+    async def _throttle(self, nbytes: int):
+        # Limita el ritmo de E/S: cada byte movido cuesta 1 / max_bytes_per_second segundos
+        if self.max_bytes_per_second > 0 and nbytes:
+            await asyncio.sleep(nbytes / self.max_bytes_per_second)
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.run_once()
+            except Exception:
+                logger.exception("Index compaction failed")
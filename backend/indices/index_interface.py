@@ -1,6 +1,11 @@
 import os
+import sys
+import json
+import hashlib
 import importlib.util
-from typing import Any, List, Dict, Optional, Union
+import inspect
+import threading
+from typing import Any, List, Dict, Iterable, Optional, Sequence, Tuple, Union
 from abc import ABC, abstractmethod
 from enum import Enum
 
@@ -14,6 +19,76 @@ class IndexType(Enum):
     IVF = "ivf"
     ISH = "ish"
 
+# Indices of /index that map each key to a JSON record of their own data file
+RECORD_FILE_TYPES = (IndexType.AVL, IndexType.HASH, IndexType.BTREE, IndexType.ISAM)
+
+
+def as_index_type(index_type: Union[IndexType, str]) -> IndexType:
+    """IndexType from the catalog value ("HASH", "BTREE", ...)"""
+    if isinstance(index_type, IndexType):
+        return index_type
+    try:
+        return IndexType(str(getattr(index_type, "value", index_type)).lower())
+    except ValueError:
+        raise ValueError(f"Index type {index_type} not supported")
+
+
+# An index file, the data and meta files of its implementation and its dead-byte count
+INDEX_FILE_SUFFIXES = ("", ".data", ".meta", ".stats")
+
+
+def remove_index_files(filepath: str):
+    """Delete an index file together with the files kept next to it"""
+    forget_record_file_index(filepath)
+    for suffix in INDEX_FILE_SUFFIXES:
+        if os.path.exists(filepath + suffix):
+            os.remove(filepath + suffix)
+
+
+def read_dead_bytes(filepath: str) -> int:
+    """Bytes of the index data file held by records that were replaced or deleted"""
+    try:
+        with open(f"{filepath}.stats", 'r', encoding='utf-8') as f:
+            return json.load(f).get("dead_bytes", 0)
+    except (OSError, ValueError):
+        return 0
+
+
+def add_dead_bytes(filepath: str, dead_bytes: int):
+    if dead_bytes <= 0:
+        return
+    temp_path = f"{filepath}.stats.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump({"dead_bytes": read_dead_bytes(filepath) + dead_bytes}, f)
+    os.replace(temp_path, f"{filepath}.stats")
+
+
+def index_files_signature(filepath: str) -> Tuple:
+    """Inode, size and modification time of every file of an index, to notice writes"""
+    signature = []
+    for suffix in INDEX_FILE_SUFFIXES:
+        try:
+            stat = os.stat(filepath + suffix)
+            signature.append((stat.st_ino, stat.st_size, stat.st_mtime_ns))
+        except OSError:
+            signature.append(None)
+    return tuple(signature)
+
+
+def replace_index_files(source: str, filepath: str):
+    """Move the index built at source over the index at filepath, file by file"""
+    for suffix in INDEX_FILE_SUFFIXES:
+        if os.path.exists(source + suffix):
+            os.replace(source + suffix, filepath + suffix)
+        elif os.path.exists(filepath + suffix):
+            os.remove(filepath + suffix)
+
+
+def table_index_name(table_metadata: Dict[str, Any], column: str) -> str:
+    index_info = table_metadata["indices"][column]
+    return f"{table_metadata['user_id']}_{table_metadata['name']}_{column}_{index_info['type'].lower()}"
+
+
 class BaseIndex(ABC):
     """Abstract base class for all index implementations"""
     
@@ -82,11 +157,8 @@ class IndexInterface:
                 try:
                     file_path = os.path.join(self.index_dir, f"{filename}.py")
                     if os.path.exists(file_path):
-                        spec = importlib.util.spec_from_file_location(filename, file_path)
-                        if spec and spec.loader:
-                            module = importlib.util.module_from_spec(spec)
-                            spec.loader.exec_module(module)
-                            
+                        module = self._import_index_module(filename, file_path)
+                        if module is not None:
                             if hasattr(module, class_name):
                                 self._index_classes[index_type] = getattr(module, class_name)
                             else:
@@ -105,6 +177,24 @@ class IndexInterface:
             for index_type in IndexType:
                 self._index_classes[index_type] = PlaceholderIndex
     
+    def _import_index_module(self, name: str, file_path: str):
+        # Un solo módulo por archivo, registrado en sys.modules: pickle guarda los
+        # nodos de los índices por nombre y debe encontrar las mismas clases
+        module = sys.modules.get(name)
+        if module is not None and getattr(module, "__file__", None) == file_path:
+            return module
+        spec = importlib.util.spec_from_file_location(name, file_path)
+        if not spec or not spec.loader:
+            return None
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[name] = module
+        try:
+            spec.loader.exec_module(module)
+        except BaseException:
+            del sys.modules[name]
+            raise
+        return module
+    
     def create_index(self, index_type: IndexType, index_name: str, **kwargs) -> BaseIndex:
         """Create a new index of the specified type"""
         if index_type not in self._index_classes:
@@ -162,6 +252,65 @@ class IndexInterface:
         
         return index_instance
     
+    def open_index(self, index_type: Union[IndexType, str], filepath: str) -> BaseIndex:
+        """Open the index stored at filepath, backed by the file-based implementation of its type.
+
+        Record file indices stay open in a cache shared by every IndexInterface
+        while their files are not written by anyone else.
+        """
+        index_type = as_index_type(index_type)
+        index_class = self._index_classes.get(index_type, PlaceholderIndex)
+        if issubclass(index_class, BaseIndex):
+            index_instance = index_class()
+            if os.path.exists(filepath):
+                index_instance.load_from_file(filepath)
+            return index_instance
+        if index_type in RECORD_FILE_TYPES:
+            return open_record_file_index(index_class, filepath, hash_keys=index_type == IndexType.HASH)
+        raise ValueError(f"Index type {index_type.value} does not support key lookups")
+    
+    def update_table_indices(self, table_metadata: Dict[str, Any], rows: List[List[Any]], first_position: int) -> int:
+        """Add rows stored from row position first_position on to every index of the table"""
+        positions = range(first_position, first_position + len(rows))
+        return self.add_index_entries(table_metadata, self.index_entries(table_metadata, rows, positions))
+    
+    def index_entries(
+        self, table_metadata: Dict[str, Any], rows: List[List[Any]], positions: Sequence[int]
+    ) -> Dict[str, List[Tuple[Any, int]]]:
+        """(key, row position) pairs of the rows, stored at positions, for each indexed column.
+
+        NULL keys are not indexed.
+        """
+        columns = [col["name"] for col in table_metadata["columns"]]
+        entries = {}
+        for column in table_metadata.get("indices", {}):
+            col_idx = columns.index(column)
+            entries[column] = [(row[col_idx], position) for row, position in zip(rows, positions)
+                               if row[col_idx] is not None]
+        return entries
+    
+    def add_index_entries(self, table_metadata: Dict[str, Any], entries: Dict[str, List[Tuple[Any, int]]]) -> int:
+        """Insert the entries of each column in its index, opening and saving every index once.
+
+        Every index is opened before any is written: one that cannot be opened
+        raises ValueError, so the statement rolls back instead of leaving an
+        index without its rows. Returns the number of entries added.
+        """
+        opened = {}
+        for column, column_entries in entries.items():
+            if not column_entries:
+                continue
+            index_info = table_metadata["indices"][column]
+            try:
+                opened[column] = self.open_index(index_info["type"], index_info["path"])
+            except ValueError as e:
+                raise ValueError(f"Index on {column} cannot be updated: {str(e)}") from e
+        added = 0
+        for column, index_instance in opened.items():
+            added += insert_many(index_instance, entries[column])
+            index_instance.save_to_file(table_metadata["indices"][column]["path"])
+        return added
+    
     def get_optimal_index_type(self, column_type: str, query_patterns: List[str]) -> IndexType:
         """Suggest optimal index type based on data type and query patterns"""
         
@@ -178,6 +327,123 @@ class IndexInterface:
             return IndexType.BTREE  # Default choice
 
 
+def insert_many(index_instance: BaseIndex, entries: Iterable[Tuple[Any, Any]]) -> int:
+    """Insert (key, value) pairs, in one batch when the index supports it"""
+    if hasattr(index_instance, "insert_many"):
+        return index_instance.insert_many(entries)
+    return sum(1 for key, value in entries if index_instance.insert(key, value))
+
+
+class RecordFileIndex(BaseIndex):
+    """BaseIndex over the AVL, hash, B+ tree and ISAM files of /index.
+
+    Those keep one JSON record per key in their data file; here the record
+    holds the row positions of the key, so a key may appear in many rows.
+    The extendible hash takes keys as bit strings (hash_keys).
+    """
+    
+    def __init__(self, index_class: type, filepath: str, hash_keys: bool = False):
+        self.filepath = filepath
+        self.hash_keys = hash_keys
+        self._lock = threading.RLock()
+        files = {"data_file": f"{filepath}.data", "index_file": filepath}
+        if "meta_file" in inspect.signature(index_class).parameters:
+            files["meta_file"] = f"{filepath}.meta"
+        self.index = index_class(**files)
+        # Estado de los archivos que corresponde a la estructura en memoria
+        self.signature = index_files_signature(filepath)
+    
+    def insert(self, key: Any, value: Any) -> bool:
+        return self.insert_many([(key, value)]) == 1
+    
+    def insert_many(self, entries: Iterable[Tuple[Any, Any]]) -> int:
+        """Add (key, row position) pairs writing one record per distinct key and saving the index once"""
+        positions: Dict[Any, List[Any]] = {}
+        for key, value in entries:
+            positions.setdefault(key, []).append(value)
+        with self._lock:
+            records = []
+            dead_bytes = 0
+            for key, rows in positions.items():
+                stored_key = self._stored_key(key)
+                record = self.index.search(stored_key)
+                if record is not None:
+                    # La nueva versión se agrega al final del archivo de datos
+                    rows = record["rows"] + rows
+                    dead_bytes += self._record_size(record)
+                records.append((stored_key, {"key": key, "rows": rows}))
+            if records:
+                self.index.insert_many(records)
+            add_dead_bytes(self.filepath, dead_bytes)
+            self.signature = index_files_signature(self.filepath)
+        return sum(len(rows) for rows in positions.values())
+    
+    def search(self, key: Any) -> Optional[Any]:
+        with self._lock:
+            record = self.index.search(self._stored_key(key))
+        return record["rows"] if record else []
+    
+    def delete(self, key: Any) -> bool:
+        with self._lock:
+            record = self.index.search(self._stored_key(key))
+            if record is None or not self.index.delete(self._stored_key(key)):
+                return False
+            add_dead_bytes(self.filepath, self._record_size(record))
+            self.signature = index_files_signature(self.filepath)
+        return True
+    
+    def range_search(self, start_key: Any, end_key: Any) -> List[Any]:
+        if self.hash_keys or not hasattr(self.index, "range_search"):
+            raise ValueError(f"{type(self.index).__name__} does not support range searches")
+        with self._lock:
+            records = self.index.range_search(start_key, end_key)
+        return [row for record in records for row in record["rows"]]
+    
+    def save_to_file(self, filepath: str) -> bool:
+        # Cada operación ya guarda la estructura en su archivo
+        return True
+    
+    def load_from_file(self, filepath: str) -> bool:
+        # La implementación carga su archivo al construirse
+        return True
+    
+    @staticmethod
+    def _record_size(record: Dict[str, Any]) -> int:
+        # Las implementaciones guardan json.dumps(record) + "\n"
+        return len(json.dumps(record)) + 1
+    
+    def _stored_key(self, key: Any) -> Any:
+        if not self.hash_keys:
+            return key
+        return format(int(hashlib.sha1(str(key).encode('utf-8')).hexdigest(), 16), '0160b')
+
+
+# Las implementaciones deserializan toda la estructura al abrirse: los índices
+# abiertos se reutilizan mientras sus archivos no cambien por otro lado
+# (compactación, borrado de la tabla)
+_open_record_indices: Dict[str, RecordFileIndex] = {}
+_open_record_indices_lock = threading.Lock()
+
+
+def open_record_file_index(index_class: type, filepath: str, hash_keys: bool = False) -> RecordFileIndex:
+    """RecordFileIndex of filepath, from the cache when its files are unchanged"""
+    with _open_record_indices_lock:
+        cached = _open_record_indices.get(filepath)
+        if cached is not None and isinstance(cached.index, index_class):
+            # Espera a que termine una escritura en curso sobre el índice
+            with cached._lock:
+                if cached.signature == index_files_signature(filepath):
+                    return cached
+        index_instance = RecordFileIndex(index_class, filepath, hash_keys=hash_keys)
+        _open_record_indices[filepath] = index_instance
+        return index_instance
+
+
+def forget_record_file_index(filepath: str):
+    with _open_record_indices_lock:
+        _open_record_indices.pop(filepath, None)
+
+
 class PlaceholderIndex(BaseIndex):
     """Placeholder implementation for when actual index classes are not available"""
     
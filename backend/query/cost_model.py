@@ -0,0 +1,201 @@
+import math
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from catalog.table_statistics import estimate_condition_selectivity
+from indices.index_interface import as_index_type
+
+# Costes relativos; la unidad es leer una página en secuencia
+SEQ_PAGE_COST = 1.0
+RANDOM_PAGE_COST = 4.0
+# Decoding and filtering one row
+CPU_ROW_COST = 0.02
+# The /index structures are unpickled whole the first time they are opened and
+# then stay cached: a small cost per key of the index, amortized over queries
+INDEX_LOAD_COST = 0.001
+# Reading the JSON record of one key from the data file of an index
+INDEX_ENTRY_COST = 0.2
+# Rows per page assumed for tables whose storage does not tell its page count
+DEFAULT_ROWS_PER_PAGE = 100
+# Orden por defecto de index/bplus_tree.py
+BPLUS_TREE_ORDER = 4
+# Index levels of the static ISAM over its data pages
+ISAM_LEVELS = 2
+
+RANGE_OPERATORS = {"=", "IN", "BETWEEN", "<", "<=", ">", ">="}
+# WHERE operators each index kind can answer. GIN (full text) and R-tree
+# (spatial) have no operator of the SQL subset, so they are never chosen.
+INDEX_OPERATORS = {
+    "HASH": {"=", "IN"},
+    "BTREE": RANGE_OPERATORS,
+    "AVL": RANGE_OPERATORS,
+    "ISAM": RANGE_OPERATORS,
+    "GIN": set(),
+    "RTREE": set(),
+}
+LOWER_BOUNDS = (">", ">=")
+
+
+def choose_access_path(
+    table_metadata: Dict[str, Any], conditions: List[Dict[str, Any]], page_count: Optional[int]
+) -> Dict[str, Any]:
+    """Cheapest way to find the rows matching conditions: a full scan or an index plan.
+
+    Returns {"type": "scan", "cost"} or {"type": "index", "cost", "groups"}.
+    The positions of an index plan are the union over its groups (the OR
+    groups of the WHERE) of the intersection of the lookups of each group.
+    Index results are only candidates: the caller still applies every
+    condition to the rows. page_count is None when fetching rows by
+    position loads the whole table (columnar and JSON tables).
+    """
+    row_count = _row_count(table_metadata)
+    pages = page_count if page_count is not None else math.ceil(row_count / DEFAULT_ROWS_PER_PAGE)
+    scan = {"type": "scan", "cost": pages * SEQ_PAGE_COST + row_count * CPU_ROW_COST}
+    if not conditions or not row_count:
+        return scan
+
+    def fetch_cost(selectivity: float) -> float:
+        rows = selectivity * row_count
+        if page_count is None:
+            return pages * SEQ_PAGE_COST + rows * CPU_ROW_COST
+        # Cárdenas: páginas distintas que tocan `rows` filas repartidas al azar
+        touched = page_count * (1 - (1 - 1 / page_count) ** rows) if page_count else 0
+        return touched * RANDOM_PAGE_COST + rows * CPU_ROW_COST
+
+    groups = []
+    selectivity = 0.0
+    cost = 0.0
+    loads = {}
+    for group_conditions in _or_groups(conditions):
+        group = _group_plan(_lookups(table_metadata, group_conditions, row_count), fetch_cost)
+        if group is None:
+            # Un grupo sin índice obliga a leer toda la tabla
+            return scan
+        lookups, group_selectivity, group_cost = group
+        groups.append(lookups)
+        selectivity += group_selectivity
+        cost += group_cost
+        for lookup in lookups:
+            cost -= lookup["load"]
+            loads[lookup["column"]] = lookup["load"]
+    # Each index is opened once for the whole plan
+    cost += sum(loads.values()) + fetch_cost(min(selectivity, 1.0))
+    if cost >= scan["cost"]:
+        return scan
+    return {"type": "index", "cost": cost, "groups": groups}
+
+
+def describe_access_path(plan: Dict[str, Any]) -> str:
+    if plan["type"] == "scan":
+        return "full scan"
+    groups = [" AND ".join(f"{lookup['kind']}({lookup['column']})" for lookup in group) for group in plan["groups"]]
+    return "index " + " OR ".join(groups)
+
+
+def _row_count(table_metadata: Dict[str, Any]) -> int:
+    statistics = table_metadata.get("statistics") or {}
+    return statistics.get("row_count") or table_metadata.get("row_count") or 0
+
+
+def _or_groups(conditions: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+    groups = []
+    group = []
+    for condition in conditions:
+        group.append(condition)
+        if condition.get("logical_op") != "AND":
+            groups.append(group)
+            group = []
+    return groups
+
+
+def _lookups(table_metadata: Dict[str, Any], conditions: List[Dict[str, Any]], row_count: int) -> List[Dict[str, Any]]:
+    """Index lookups that can answer conditions of one AND group, with their selectivity and cost.
+
+    A lookup is {"column", "kind", "operation", "values"}: "search" probes
+    the index once per value, "range" reads the keys between two bounds.
+    Its cost includes loading the index ("load"), paid once per plan.
+    One-sided comparisons only give a range together with the opposite bound
+    on the same column.
+    """
+    indices = table_metadata.get("indices", {})
+    statistics = (table_metadata.get("statistics") or {}).get("columns", {})
+    lookups = []
+    bounds: Dict[str, Dict[str, Any]] = {}
+    for condition in conditions:
+        column, operator, value = condition["column"], condition["operator"], condition["value"]
+        if column not in indices or value is None:
+            continue
+        try:
+            kind = as_index_type(indices[column]["type"]).value.upper()
+        except ValueError:
+            continue
+        if operator not in INDEX_OPERATORS.get(kind, ()):
+            continue
+        if operator == "=":
+            lookups.append(_lookup(column, kind, "search", [value], condition))
+        elif operator == "IN":
+            values = [v for v in value if v is not None]
+            lookups.append(_lookup(column, kind, "search", values, condition))
+        elif operator == "BETWEEN":
+            lookups.append(_lookup(column, kind, "range", list(value), condition))
+        else:
+            side = "low" if operator in LOWER_BOUNDS else "high"
+            bounds.setdefault(column, {"kind": kind}).setdefault(side, value)
+    for column, column_bounds in bounds.items():
+        if "low" in column_bounds and "high" in column_bounds:
+            value = [column_bounds["low"], column_bounds["high"]]
+            condition = {"column": column, "operator": "BETWEEN", "value": value}
+            lookups.append(_lookup(column, column_bounds["kind"], "range", value, condition))
+
+    for lookup in lookups:
+        selectivity = estimate_condition_selectivity(table_metadata, lookup.pop("condition"))
+        distinct = (statistics.get(lookup["column"]) or {}).get("distinct_count") or row_count
+        if lookup["operation"] == "search":
+            probes = len(lookup["values"])
+            keys = probes
+        else:
+            probes = 1
+            keys = max(selectivity * distinct, 1)
+        lookup["selectivity"] = selectivity
+        lookup["load"] = distinct * INDEX_LOAD_COST
+        lookup["cost"] = (lookup["load"] + probes * _probe_steps(lookup["kind"], row_count) * CPU_ROW_COST
+                          + keys * INDEX_ENTRY_COST + selectivity * row_count * CPU_ROW_COST)
+    return lookups
+
+
+def _lookup(column: str, kind: str, operation: str, values: List[Any], condition: Dict[str, Any]) -> Dict[str, Any]:
+    return {"column": column, "kind": kind, "operation": operation, "values": values, "condition": condition}
+
+
+def _probe_steps(kind: str, row_count: int) -> int:
+    """Nodes (or buckets and pages) visited to reach the first key"""
+    if kind == "HASH":
+        return 1
+    if kind == "ISAM":
+        return ISAM_LEVELS + 1
+    fanout = 2 if kind == "AVL" else BPLUS_TREE_ORDER
+    return max(1, math.ceil(math.log(max(row_count, 2), fanout)))
+
+
+def _group_plan(
+    lookups: List[Dict[str, Any]], fetch_cost: Callable[[float], float]
+) -> Optional[Tuple[List[Dict[str, Any]], float, float]]:
+    """(lookups, selectivity, cost of the lookups) of the cheapest index plan for one AND group.
+
+    Starts from the lookup with the cheapest plan on its own and intersects
+    the next most selective ones while the rows they save cost more to
+    fetch than the lookup itself.
+    """
+    if not lookups:
+        return None
+    best = min(lookups, key=lambda lookup: lookup["cost"] + fetch_cost(lookup["selectivity"]))
+    chosen = [best]
+    selectivity = best["selectivity"]
+    cost = best["cost"]
+    for lookup in sorted(lookups, key=lambda lookup: lookup["selectivity"]):
+        if lookup is best:
+            continue
+        narrowed = selectivity * lookup["selectivity"]
+        if lookup["cost"] + fetch_cost(narrowed) < fetch_cost(selectivity):
+            chosen.append(lookup)
+            selectivity = narrowed
+            cost += lookup["cost"]
+    return chosen, selectivity, cost
@@ -0,0 +1,133 @@
+from itertools import compress, islice
+from operator import itemgetter
+from typing import Any, Callable, Iterable, Iterator, List, Optional
+
+# Posiciones de índice leídas por lote: LIMIT deja de leer páginas en cuanto tiene sus filas
+INDEX_SCAN_BATCH = 256
+# Filas por lote de los filtros vectorizados
+BATCH_SIZE = 4096
+
+
+class Operator:
+    """Node of a SELECT plan (Volcano model).
+
+    Iterating an operator pulls rows from its child one at a time, so rows
+    flow through the tree lazily and a Limit stops the scan below it as soon
+    as it has its rows. Only Sort has to consume its whole input.
+    """
+
+    child: Optional["Operator"] = None
+
+    def __iter__(self) -> Iterator[List[Any]]:
+        raise NotImplementedError
+
+    def explain(self) -> List[str]:
+        """Names of the operators from this one down to the scan"""
+        names = [type(self).__name__]
+        if self.child is not None:
+            names.extend(self.child.explain())
+        return names
+
+
+class Scan(Operator):
+    """Full-width rows of a table, as its storage yields them"""
+
+    def __init__(self, rows: Iterable[List[Any]]):
+        self.rows = rows
+        self.rows_read = 0
+
+    def __iter__(self) -> Iterator[List[Any]]:
+        for row in self.rows:
+            self.rows_read += 1
+            yield row
+
+
+class IndexScan(Operator):
+    """Rows at the positions an index returned, fetched in position order a batch at a time"""
+
+    def __init__(self, positions: Iterable[int], fetch: Callable[[List[int]], Iterable[List[Any]]],
+                 batch_size: int = INDEX_SCAN_BATCH):
+        self.positions = positions
+        self.fetch = fetch
+        self.batch_size = batch_size
+        self.rows_read = 0
+
+    def __iter__(self) -> Iterator[List[Any]]:
+        positions = sorted(set(self.positions))
+        for start in range(0, len(positions), self.batch_size):
+            rows = list(self.fetch(positions[start:start + self.batch_size]))
+            self.rows_read += len(rows)
+            yield from rows
+
+
+class Filter(Operator):
+    def __init__(self, child: Operator, predicate: Callable[[List[Any]], bool]):
+        self.child = child
+        self.predicate = predicate
+
+    def __iter__(self) -> Iterator[List[Any]]:
+        predicate = self.predicate
+        for row in self.child:
+            if predicate(row):
+                yield row
+
+
+class BatchFilter(Operator):
+    """Filter evaluating batch_size rows at a time with a function returning a boolean mask"""
+
+    def __init__(self, child: Operator, mask_of: Callable[[List[List[Any]]], Any],
+                 batch_size: int = BATCH_SIZE):
+        self.child = child
+        self.mask_of = mask_of
+        self.batch_size = batch_size
+
+    def __iter__(self) -> Iterator[List[Any]]:
+        rows = iter(self.child)
+        while True:
+            batch = list(islice(rows, self.batch_size))
+            if not batch:
+                return
+            yield from compress(batch, self.mask_of(batch).tolist())
+
+
+class Project(Operator):
+    def __init__(self, child: Operator, column_indices: List[int]):
+        self.child = child
+        self.column_indices = column_indices
+
+    def __iter__(self) -> Iterator[List[Any]]:
+        if len(self.column_indices) == 1:
+            i = self.column_indices[0]
+            return ([row[i]] for row in self.child)
+        # itemgetter toma todas las columnas en una sola llamada en C
+        getter = itemgetter(*self.column_indices)
+        return (list(values) for values in map(getter, self.child))
+
+
+class Sort(Operator):
+    """Sort by one column; NULLs go first (last when descending)"""
+
+    def __init__(self, child: Operator, column_index: int, descending: bool = False):
+        self.child = child
+        self.column_index = column_index
+        self.descending = descending
+
+    def __iter__(self) -> Iterator[List[Any]]:
+        i = self.column_index
+        rows = list(self.child)
+        rows.sort(key=lambda row: (row[i] is not None, row[i]), reverse=self.descending)
+        yield from rows
+
+
+class Limit(Operator):
+    def __init__(self, child: Operator, count: int):
+        self.child = child
+        self.count = count
+
+    def __iter__(self) -> Iterator[List[Any]]:
+        rows = iter(self.child)
+        try:
+            yield from islice(rows, self.count)
+        finally:
+            # Cierra la cadena de generadores: el scan suelta el mmap sin leer más páginas
+            rows.close()
@@ -0,0 +1,47 @@
+import os
+import sys
+import importlib
+import importlib.machinery
+import importlib.util
+
+# El parser SQL vive en la raíz del proyecto (parser/), fuera de backend, y su
+# nombre choca con otros paquetes "parser". Lo registramos como paquete
+# "sql_parser" apuntando a esa carpeta, igual que type_loader carga backend/types.
+_PARSER_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "parser"
+)
+_PACKAGE = "sql_parser"
+
+
+def load_parser_package():
+    """Register the parser/ folder as the sql_parser package and return it"""
+    package = sys.modules.get(_PACKAGE)
+    if package is None:
+        spec = importlib.machinery.ModuleSpec(_PACKAGE, None, is_package=True)
+        spec.submodule_search_locations = [_PARSER_DIR]
+        package = importlib.util.module_from_spec(spec)
+        sys.modules[_PACKAGE] = package
+    return package
+
+
+def load_parser_module(name: str):
+    """Import parser/<name>.py (scanner, parser or ast)"""
+    load_parser_package()
+    return importlib.import_module(f"{_PACKAGE}.{name}")
+
+
+sql_ast = load_parser_module("ast")
+TokenType = load_parser_module("scanner").TokenType
+
+
+def parse_statement(query: str):
+    """Parse one SQL statement into its AST. Raises ValueError on syntax errors"""
+    scanner = load_parser_module("scanner").Scanner(query)
+    tokens = scanner.scan_tokens()
+    if scanner.errors:
+        raise ValueError(scanner.errors[0])
+    parser_module = load_parser_module("parser")
+    try:
+        return parser_module.Parser(tokens).parse_statement()
+    except parser_module.ParserError as e:
+        raise ValueError(str(e))
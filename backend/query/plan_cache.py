@@ -0,0 +1,80 @@
+import re
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+# Literales entre comillas (se conservan tal cual) y el texto entre ellos
+_QUOTED = re.compile(r"('(?:[^']|'')*'|\"[^\"]*\")")
+_SPACES = re.compile(r"\s+")
+_AROUND_SYMBOLS = re.compile(r"\s*([(),=<>!\[\]])\s*")
+
+
+def normalize_statement(query: str) -> str:
+    """Cache key of a statement: keywords and names upper-cased, blanks collapsed, no trailing ';'.
+
+    Quoted literals are kept as written, so 'abc' and 'ABC' stay different
+    statements.
+    """
+    parts = _QUOTED.split(query.strip().rstrip(";").strip())
+    for i in range(0, len(parts), 2):
+        parts[i] = _AROUND_SYMBOLS.sub(r"\1", _SPACES.sub(" ", parts[i])).upper()
+    return "".join(parts)
+
+
+class PlanCache:
+    """LRU of compiled statements keyed by normalized text and catalog version.
+
+    The catalog version changes whenever a table is created, dropped,
+    converted or analyzed, so a cached plan never outlives the schema it
+    was built for. Next to the parsed plan of a statement, the planner keeps
+    the parts it prepared for a table (compiled predicates, access path)
+    under a scope of its choice; they are dropped with the statement.
+    """
+
+    def __init__(self, size: int = 256):
+        self.cache: OrderedDict = OrderedDict()
+        self.prepared: Dict[Tuple[str, int], Dict[Any, Any]] = {}
+        self.max_size = size
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, query: str, version: int) -> Optional[Dict[str, Any]]:
+        key = self._key(query, version)
+        if key in self.cache:
+            self.hits += 1
+            self.cache.move_to_end(key)
+            return self.cache[key]
+        self.misses += 1
+        return None
+
+    def put(self, query: str, version: int, plan: Dict[str, Any]):
+        if self.max_size <= 0:
+            return
+        key = self._key(query, version)
+        self.cache[key] = plan
+        self.cache.move_to_end(key)
+        self.prepared.pop(key, None)
+        if len(self.cache) > self.max_size:
+            # Remove least recently used
+            evicted, _ = self.cache.popitem(last=False)
+            self.prepared.pop(evicted, None)
+
+    def get_prepared(self, query: str, version: int, scope: Any) -> Optional[Any]:
+        return self.prepared.get(self._key(query, version), {}).get(scope)
+
+    def put_prepared(self, query: str, version: int, scope: Any, prepared: Any):
+        """Keep prepared parts of a cached statement; ignored once the statement was evicted"""
+        key = self._key(query, version)
+        if key in self.cache:
+            self.prepared.setdefault(key, {})[scope] = prepared
+
+    def clear(self):
+        self.cache.clear()
+        self.prepared.clear()
+
+    def get_hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total > 0 else 0.0
+
+    @staticmethod
+    def _key(query: str, version: int) -> Tuple[str, int]:
+        return normalize_statement(query), version
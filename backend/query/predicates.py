@@ -0,0 +1,113 @@
+import operator as op
+from typing import Any, Callable, Dict, List, Optional
+from utils.date_formats import get_date_parser
+
+Predicate = Callable[[List[Any]], bool]
+
+ORDERING = {"<": op.lt, "<=": op.le, ">": op.gt, ">=": op.ge}
+
+
+def compile_predicate(conditions: List[Dict[str, Any]], columns: List[Dict[str, Any]]) -> Predicate:
+    """Compile WHERE conditions into one function of a full-width row.
+
+    conditions are the plan conditions of QueryPlanner: an OR of AND groups
+    joined by logical_op. Column positions are resolved and literals are
+    converted to the column type here, once per query, so evaluating a row
+    is only comparisons. Raises ValueError for unknown columns and for
+    literals that cannot take the column type.
+    """
+    if not conditions:
+        return lambda row: True
+    names = [col["name"] for col in columns]
+    groups = []
+    group = []
+    for condition in conditions:
+        group.append(compile_condition(condition, columns, names))
+        if condition.get("logical_op") != "AND":
+            groups.append(_all(group))
+            group = []
+    if len(groups) == 1:
+        return groups[0]
+    return lambda row: any(test(row) for test in groups)
+
+
+def compile_condition(condition: Dict[str, Any], columns: List[Dict[str, Any]], names: List[str]) -> Predicate:
+    name = condition["column"]
+    if name not in names:
+        raise ValueError(f"Column {name} not found")
+    i = names.index(name)
+    column = columns[i]
+    operator = condition["operator"]
+    negated = operator in ("NOT IN", "NOT BETWEEN")
+    if negated:
+        operator = operator[len("NOT "):]
+    convert = literal_converter(column["data_type"], column.get("date_format"))
+    try:
+        test = _compile_test(i, operator, condition["value"], convert)
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Cannot compare column {name} ({column['data_type']}) with {condition['value']!r}: {e}")
+    if negated:
+        # NULL no satisface ni IN ni NOT IN
+        return lambda row: row[i] is not None and not test(row)
+    return test
+
+
+def literal_converter(data_type: str, date_format: Optional[str] = None) -> Callable[[Any], Any]:
+    """Function converting a literal of a query to the values stored for a column type"""
+    if data_type in ("INT", "FLOAT"):
+        return _to_number
+    if data_type == "DATE":
+        parser = get_date_parser(date_format)
+        return lambda value: parser.to_iso(str(value))
+    if data_type == "ARRAY[FLOAT]":
+        return _to_array
+    return str
+
+
+def _compile_test(i: int, operator: str, value: Any, convert: Callable[[Any], Any]) -> Predicate:
+    if operator in ("=", "!=") and value is None:
+        # "= NULL" matches the NULL values
+        return (lambda row: row[i] is None) if operator == "=" else (lambda row: row[i] is not None)
+    if operator == "IN":
+        values = {convert(v) for v in value if v is not None}
+        return lambda row: row[i] in values
+    if operator == "BETWEEN":
+        low, high = convert(value[0]), convert(value[1])
+        return lambda row: row[i] is not None and low <= row[i] <= high
+    if value is None:
+        # Ninguna comparación de orden con NULL es verdadera
+        return lambda row: False
+    literal = convert(value)
+    if operator == "=":
+        return lambda row: row[i] == literal
+    if operator == "!=":
+        return lambda row: row[i] is not None and row[i] != literal
+    if operator in ORDERING:
+        compare = ORDERING[operator]
+        return lambda row: row[i] is not None and compare(row[i], literal)
+    raise ValueError(f"Unsupported operator: {operator}")
+
+
+def _all(tests: List[Predicate]) -> Predicate:
+    if len(tests) == 1:
+        return tests[0]
+    if len(tests) == 2:
+        first, second = tests
+        return lambda row: first(row) and second(row)
+    return lambda row: all(test(row) for test in tests)
+
+
+def _to_number(value: Any) -> Any:
+    if isinstance(value, (int, float)):
+        return value
+    text = str(value).strip()
+    try:
+        return int(text)
+    except ValueError:
+        return float(text)
+
+
+def _to_array(value: Any) -> List[float]:
+    if isinstance(value, str):
+        value = [x for x in value.strip().strip('[]').split(',') if x.strip()]
+    return [float(x) for x in value]
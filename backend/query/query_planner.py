@@ -1,25 +1,72 @@
-import re
+import csv
 import time
 import json
 import os
-from typing import List, Dict, Any, Optional, Tuple
+import pickle
+import tempfile
+from typing import List, Dict, Any, Callable, Iterable, Iterator, Optional, Tuple
+import pyarrow as pa
 from catalog.metadata_catalog import MetadataCatalog
 from storage.storage_manager import StorageManager
-from indices.index_interface import IndexInterface
-from api.schemas import QueryResponse, PaginatedDataResponse
+from storage.heap_file import HeapFile
+from storage.mapped_reader import MappedHeapReader
+from storage.table_storage import TableStorage, open_table_storage, position_count
+from storage.zone_map import ZoneMap
+from catalog.table_statistics import build_table_statistics
+from indices.index_interface import BaseIndex, IndexInterface
+from storage.file_processor import BATCH_ROWS, FileProcessor
+from storage.arrow_io import record_batches, table_schema
+from api.schemas import ColumnDefinition, QueryResponse, PaginatedDataResponse
 from api.responses import ResponseFormatter
 from utils.metrics import MetricsService
+from utils.date_formats import get_date_parser
 from utils.logger import get_logger
+from query.parser_loader import TokenType, parse_statement, sql_ast
+from query.cost_model import choose_access_path, describe_access_path
+from query.plan_cache import PlanCache
+from query.operators import BATCH_SIZE, BatchFilter, Filter, IndexScan, Limit, Operator, Project, Scan, Sort
+from query.predicates import compile_predicate, literal_converter
+from query.vectorized import compile_batch_predicate
 
 
 logger = get_logger(__name__)
 
+COMPARISON_OPERATORS = {
+    TokenType.EQUALS: "=", TokenType.NOT_EQUALS: "!=", TokenType.LESS_THAN: "<",
+    TokenType.LESS_EQUALS: "<=", TokenType.GREATER_THAN: ">", TokenType.GREATER_EQUALS: ">=",
+}
+NEGATED_OPERATORS = {"=": "!=", "!=": "=", "<": ">=", ">=": "<", ">": "<=", "<=": ">"}
+# Operators a zone map can use to skip pages
+ZONE_OPERATORS = ("=", "<", "<=", ">", ">=", "BETWEEN")
+# Límite de grupos AND al distribuir un WHERE en forma normal disyuntiva
+MAX_WHERE_GROUPS = 64
+
+
+class BulkInsertError(RuntimeError):
+    """A bulk insert that failed after some of its chunks were committed"""
+
+    def __init__(self, table_name: str, rows_committed: int, cause: Exception):
+        super().__init__(table_name, rows_committed, cause)
+        self.table_name = table_name
+        self.rows_committed = rows_committed
+        self.cause = cause
+
+    def __str__(self) -> str:
+        return f"Bulk insert into {self.table_name} failed after {self.rows_committed} rows were committed: {self.cause}"
+
+
 class QueryPlanner:
     def __init__(self, catalog: MetadataCatalog, storage_manager: StorageManager):
         self.catalog = catalog
         self.storage_manager = storage_manager
         self.metrics = MetricsService()
         self.index_interface = IndexInterface()
+        self.file_processor = FileProcessor()
+        self.plan_cache = PlanCache(int(os.getenv("PLAN_CACHE_SIZE", "256")))
+        # Filas por lote de los filtros con NumPy; 0 los desactiva
+        self.batch_size = int(os.getenv("SCAN_BATCH_SIZE", str(BATCH_SIZE)))
+        # Filas por transacción de bulk_insert
+        self.bulk_commit_rows = int(os.getenv("BULK_COMMIT_ROWS", "50000"))
         # Asegúrate de que storage_manager use la misma ruta base
         self.data_dir = "./data"  # Agregar esta línea si no existe
         
@@ -30,23 +77,23 @@ class QueryPlanner:
         start_time = time.time()
         
         try:
-            print(f"=== EXECUTE QUERY DEBUG ===")
-            print(f"Query: {query}")
-            print(f"User ID: {user_id}")
+            logger.debug("Executing query for user %s: %s", user_id, query)
             
-            # Parse the query
-            parsed_query = self._parse_query(query)
-            print(f"Parsed query: {parsed_query}")
+            # Parse the query (or reuse its cached plan)
+            parsed_query = self._plan(query)
+            logger.debug("Parsed query: %s", parsed_query)
             
             # Execute based on query type
             if parsed_query["type"] == "SELECT":
-                result = await self._execute_select(parsed_query, user_id)
+                result = await self._execute_select(parsed_query, user_id, query)
             elif parsed_query["type"] == "INSERT":
                 result = await self._execute_insert(parsed_query, user_id)
             elif parsed_query["type"] == "UPDATE":
                 result = await self._execute_update(parsed_query, user_id)
             elif parsed_query["type"] == "DELETE":
                 result = await self._execute_delete(parsed_query, user_id)
+            elif parsed_query["type"] == "ANALYZE":
+                result = await self._execute_analyze(parsed_query, user_id)
             else:
                 raise ValueError(f"Unsupported query type: {parsed_query['type']}")
             
@@ -56,7 +103,6 @@ class QueryPlanner:
             # IMPORTANTE: Asegurar que devolvemos estructura completa
             if isinstance(result, dict):
                 result["execution_time_ms"] = execution_time
-                print(f"Final result (dict): {result}")
             else:
                 # Si result no es dict, crear estructura válida
                 result = {
@@ -69,227 +115,148 @@ class QueryPlanner:
                     "rows_affected": len(result) if isinstance(result, list) else 0,
                     "io_operations": 1
                 }
-                print(f"Final result (converted): {result}")
         
-            print(f"=== END EXECUTE QUERY DEBUG ===")
+            logger.debug("Query finished in %.1f ms: %d rows", execution_time, len(result.get("data") or []))
             
             return result
             
         except Exception as e:
-            print(f"Error executing query: {str(e)}")
+            logger.error("Error executing query: %s", e)
             raise ValueError(f"Query execution failed: {str(e)}")
     
-    def _parse_query(self, query: str) -> Dict[str, Any]:
-        query = query.upper().strip()
-        
-        if query.startswith("SELECT"):
-            return self._parse_select(query)
-        elif query.startswith("INSERT"):
-            return self._parse_insert(query)
-        elif query.startswith("DELETE"):
-            return self._parse_delete(query)
-        elif query.startswith("UPDATE"):
-            return self._parse_update(query)
-        else:
-            raise ValueError("Unsupported query type")
-    
-    def _parse_select(self, query: str) -> Dict[str, Any]:
-        # Remove SELECT keyword and normalize
-        query_without_select = query[6:].strip()  # Remove "SELECT"
-
-        print(f"=== PARSE SELECT DEBUG ===")
-        print(f"Original query: {query}")
-        print(f"Query without SELECT: {query_without_select}")
-
-        # Find FROM clause
-        from_match = re.search(r'\bFROM\s+(\w+)', query_without_select, re.IGNORECASE)
-        if not from_match:
-            raise ValueError("Missing FROM clause in SELECT statement")
-
-        table_name = from_match.group(1).lower()
-        print(f"Table name: {table_name}")
-
-        # Extract column list (everything before FROM)
-        columns_part = query_without_select[:from_match.start()].strip()
-        if columns_part == "*":
-            columns = ["*"]
-        else:
-            columns = [col.strip().lower() for col in columns_part.split(",")]
-
-        print(f"Columns: {columns}")
-
-        # Parse optional clauses (WHERE, ORDER BY, LIMIT)
-        remaining_query = query_without_select[from_match.end():].strip()
-
-        where_conditions = None
-        order_by = None
-        limit = None
+    def _plan(self, query: str) -> Dict[str, Any]:
+        """Plan of a statement, reused from the plan cache when it was already planned"""
+        version = self.catalog.version
+        plan = self.plan_cache.get(query, version)
+        if plan is None:
+            plan = self._parse_query(query)
+            self.plan_cache.put(query, version, plan)
+        return plan
 
-        # --- MEJORAR AQUÍ ---
-        # Extraer WHERE, ORDER BY y LIMIT de forma robusta
-        where_clause = None
-        order_by_clause = None
-        limit_clause = None
-
-        # Busca WHERE
-        where_match = re.search(r'\bWHERE\s+(.+?)(?=\s+ORDER\s+BY|\s+LIMIT|$)', remaining_query, re.IGNORECASE)
-        if where_match:
-            where_clause = where_match.group(1).strip()
-
-        # Busca ORDER BY
-        order_match = re.search(r'\bORDER\s+BY\s+(\w+)', remaining_query, re.IGNORECASE)
-        if order_match:
-            order_by_clause = order_match.group(1).lower()
-
-        # Busca LIMIT
-        limit_match = re.search(r'\bLIMIT\s+(\d+)', remaining_query, re.IGNORECASE)
-        if limit_match:
-            limit_clause = int(limit_match.group(1))
+    def _parse_query(self, query: str) -> Dict[str, Any]:
+        """Parse a statement with the SQL parser and translate its AST into a plan.
 
-        if where_clause:
-            where_conditions = self._parse_where_clause(where_clause)
+        Plans are plain dicts shared through the plan cache: executors must
+        not modify them.
+        """
+        statement = parse_statement(query)
+        if isinstance(statement, sql_ast.SelectStmt):
+            return self._plan_select(statement)
+        elif isinstance(statement, sql_ast.InsertStmt):
+            return self._plan_insert(statement)
+        elif isinstance(statement, sql_ast.DeleteStmt):
+            return {
+                "type": "DELETE",
+                "table": self._name(statement.table_name),
+                "where": self._where_conditions(statement.where)
+            }
+        elif isinstance(statement, sql_ast.UpdateStmt):
+            return self._plan_update(statement)
+        elif isinstance(statement, sql_ast.AnalyzeStmt):
+            return {"type": "ANALYZE", "table": self._name(statement.table_name)}
         else:
-            where_conditions = []
+            raise ValueError("Unsupported query type")
 
-        result = {
+    def _plan_select(self, statement) -> Dict[str, Any]:
+        order_by = statement.order_by
+        return {
             "type": "SELECT",
-            "table": table_name,
-            "columns": columns,
-            "where": where_conditions,
-            "order_by": order_by_clause,
-            "limit": limit_clause
+            "table": self._name(statement.table_name),
+            "columns": ["*"] if statement.columns == ["*"] else [self._name(col) for col in statement.columns],
+            "where": self._where_conditions(statement.where),
+            "order_by": self._name(order_by.column) if order_by else None,
+            "descending": bool(order_by and order_by.descending),
+            "limit": statement.limit
         }
 
-        print(f"Parsed result: {result}")
-        print(f"=== END PARSE SELECT DEBUG ===")
-
-        return result
-    
-    def _parse_where_clause(self, where_clause: str) -> List[Dict[str, Any]]:
-        conditions = []
-        # Soporta BETWEEN
-        between_match = re.match(r"(\w+)\s+BETWEEN\s+(.+)\s+AND\s+(.+)", where_clause, re.IGNORECASE)
-        if between_match:
-            column, start, end = between_match.groups()
-            start_val = self._convert_value(start.strip())
-            end_val = self._convert_value(end.strip())
-            print(f"DEBUG PARSED BETWEEN: {column} BETWEEN {start_val} ({type(start_val)}) AND {end_val} ({type(end_val)})")
-            conditions.append({
-                "column": column.lower(),
-                "operator": "BETWEEN",
-                "value": [start_val, end_val],
-                "logical_op": None
-            })
-            return conditions
-        # Soporta condiciones normales
-        parts = re.split(r'\s+(AND|OR)\s+', where_clause, flags=re.IGNORECASE)
-        for i in range(0, len(parts), 2):
-            condition_str = parts[i].strip()
-            operator_match = re.match(r'(\w+)\s*(=|!=|<|>|<=|>=)\s*(.+)', condition_str)
-            if operator_match:
-                column, operator, value = operator_match.groups()
-                value = value.strip().strip("'\"")
-                conditions.append({
-                    "column": column.lower(),
-                    "operator": operator,
-                    "value": self._convert_value(value),
-                    "logical_op": parts[i+1].upper() if i+1 < len(parts) else None
-                })
-        return conditions
-    
-    def _convert_value(self, value: str) -> Any:
-        # Try to convert to appropriate type
-        if value.upper() == "NULL":
-            return None
-        try:
-            return int(value)
-        except ValueError:
-            try:
-                return float(value)
-            except ValueError:
-                return value
-    
-    def _parse_insert(self, query: str) -> Dict[str, Any]:
-        """Parse INSERT query"""
-        # INSERT INTO table (col1, col2) VALUES (val1, val2)
-        insert_pattern = r"INSERT\s+INTO\s+(\w+)\s*\(([^)]+)\)\s+VALUES\s*\(([^)]+)\)"
-        match = re.match(insert_pattern, query, re.IGNORECASE)
-        
-        if not match:
-            raise ValueError("Invalid INSERT syntax. Expected: INSERT INTO table (columns) VALUES (values)")
-        
-        table, columns_str, values_str = match.groups()
-        
-        # Parse columns
-        columns = [col.strip() for col in columns_str.split(",")]
-        
-        # Parse values
-        values = []
-        for value in values_str.split(","):
-            value = value.strip()
-            # Remove quotes if present
-            if (value.startswith("'") and value.endswith("'")) or (value.startswith('"') and value.endswith('"')):
-                values.append(value[1:-1])
-            else:
-                values.append(value)
-    
+    def _plan_insert(self, statement) -> Dict[str, Any]:
+        # INSERT INTO table [(col1, col2)] VALUES (val1, val2)[, (val1, val2) ...]
+        # INSERT INTO table [(col1, col2)] SELECT ...
         return {
             "type": "INSERT",
-            "table": table.lower(),
-            "columns": columns,
-            "values": values
-        }
-    
-    def _parse_delete(self, query: str) -> Dict[str, Any]:
-        # DELETE FROM table WHERE conditions
-        delete_pattern = r"DELETE\s+FROM\s+(\w+)(?:\s+WHERE\s+(.+?))?"
-        match = re.match(delete_pattern, query, re.IGNORECASE)
-        
-        if not match:
-            raise ValueError("Invalid DELETE syntax")
-        
-        table, where_clause = match.groups()
-        
-        return {
-            "type": "DELETE",
-            "table": table.lower(),
-            "where": self._parse_where_clause(where_clause) if where_clause else None
+            "table": self._name(statement.table_name),
+            # All the table columns when omitted
+            "columns": [self._name(col) for col in statement.columns] if statement.columns else None,
+            "rows": None if statement.select else [[self._literal(value) for value in row] for row in statement.rows],
+            "select": self._plan_select(statement.select) if statement.select else None
         }
-    
-    def _parse_update(self, query: str) -> Dict[str, Any]:
-        # UPDATE table SET column=value WHERE conditions
-        update_pattern = r"UPDATE\s+(\w+)\s+SET\s+(.+?)(?:\s+WHERE\s+(.+?))?"
-        match = re.match(update_pattern, query, re.IGNORECASE)
-        
-        if not match:
-            raise ValueError("Invalid UPDATE syntax")
-        
-        table, set_clause, where_clause = match.groups()
-        
-        # Parse SET clause
-        set_conditions = {}
-        for assignment in set_clause.split(","):
-            col_val = assignment.strip().split("=")
-            if len(col_val) == 2:
-                column = col_val[0].strip()
-                value = col_val[1].strip().strip("'\"")
-                set_conditions[column] = self._convert_value(value)
-        
+
+    def _plan_update(self, statement) -> Dict[str, Any]:
+        # UPDATE table SET column=value[, column=value] WHERE conditions;
+        # values are converted with the column type when executed
         return {
             "type": "UPDATE",
-            "table": table.lower(),
-            "set": set_conditions,
-            "where": self._parse_where_clause(where_clause) if where_clause else None
+            "table": self._name(statement.table_name),
+            "set": {self._name(column): self._literal(value) for column, value in statement.assignments},
+            "where": self._where_conditions(statement.where)
         }
+
+    def _name(self, identifier) -> str:
+        # Table and column names are case-insensitive
+        return identifier.name.lower()
+
+    def _literal(self, expr) -> Any:
+        if not isinstance(expr, sql_ast.LiteralExpr):
+            raise ValueError(f"Unsupported value: {expr}")
+        return expr.value
+
+    def _where_conditions(self, expr) -> List[Dict[str, Any]]:
+        """Flatten a WHERE expression into conditions joined by logical_op.
+
+        The list is in disjunctive normal form: AND binds tighter than OR, as
+        compile_predicate reads it. NOT is pushed down to the predicates
+        and parenthesized ORs inside an AND are distributed.
+        """
+        if expr is None:
+            return []
+        conditions = []
+        for group in self._dnf(expr, False):
+            for condition in group:
+                conditions.append(dict(condition, logical_op="AND"))
+            conditions[-1]["logical_op"] = "OR"
+        conditions[-1]["logical_op"] = None
+        return conditions
+
+    def _dnf(self, expr, negate: bool) -> List[List[Dict[str, Any]]]:
+        """OR of AND groups of simple conditions equivalent to expr (negated when negate)"""
+        if isinstance(expr, sql_ast.GroupingExpr):
+            return self._dnf(expr.expression, negate)
+        if isinstance(expr, sql_ast.UnaryExpr) and expr.operator == TokenType.NOT:
+            return self._dnf(expr.right, not negate)
+        if isinstance(expr, sql_ast.BinaryExpr) and expr.operator in (TokenType.AND, TokenType.OR):
+            left, right = self._dnf(expr.left, negate), self._dnf(expr.right, negate)
+            # De Morgan: NOT (a AND b) = NOT a OR NOT b
+            if (expr.operator == TokenType.OR) != negate:
+                return left + right
+            if len(left) * len(right) > MAX_WHERE_GROUPS:
+                raise ValueError("WHERE clause is too complex")
+            return [l + r for l in left for r in right]
+        return [[self._simple_condition(expr, negate)]]
+
+    def _simple_condition(self, expr, negate: bool) -> Dict[str, Any]:
+        if isinstance(expr, sql_ast.BetweenExpr):
+            column = expr.column
+            operator = "NOT BETWEEN" if negate else "BETWEEN"
+            value = [self._literal(expr.lower), self._literal(expr.upper)]
+        elif isinstance(expr, sql_ast.InExpr):
+            column = expr.column
+            operator = "NOT IN" if negate else "IN"
+            value = [self._literal(v) for v in expr.values]
+        elif isinstance(expr, sql_ast.BinaryExpr) and expr.operator in COMPARISON_OPERATORS:
+            column = expr.left
+            operator = COMPARISON_OPERATORS[expr.operator]
+            if negate:
+                operator = NEGATED_OPERATORS[operator]
+            value = self._literal(expr.right)
+        else:
+            raise ValueError(f"Unsupported condition: {expr}")
+        return {"column": self._name(column), "operator": operator, "value": value}
     
 
-    async def _execute_select(self, parsed_query: Dict[str, Any], user_id: int) -> Dict[str, Any]:
-        """Execute SELECT query"""
+    async def _execute_select(self, parsed_query: Dict[str, Any], user_id: int, query: Optional[str] = None) -> Dict[str, Any]:
+        """Execute SELECT query by pulling the rows through its operator tree"""
         table_name = parsed_query["table"]
         requested_columns = parsed_query["columns"]
-        where_conditions = parsed_query.get("where")
-        order_by = parsed_query.get("order_by")
-        limit = parsed_query.get("limit")
         
         # Get table metadata
         table_metadata = self.catalog.get_table_metadata(table_name, user_id)
@@ -301,9 +268,6 @@ class QueryPlanner:
         if not data_file_path or not os.path.exists(data_file_path):
             raise ValueError(f"Data file not found for table {table_name}")
         
-        # Load table data
-        table_data = await self._load_table_data(data_file_path)
-        
         # Get column names from metadata
         all_columns = [col["name"] for col in table_metadata["columns"]]
         
@@ -322,29 +286,9 @@ class QueryPlanner:
                 else:
                     raise ValueError(f"Column {col} not found in table {table_name}")
         
-        # Apply WHERE conditions if present
-        filtered_data = table_data
-        if where_conditions:
-            filtered_data = await self._apply_where_conditions(
-                table_data, where_conditions, table_metadata, user_id
-            )
-        
-        # Select only requested columns
-        result_data = []
-        for row in filtered_data:
-            selected_row = [row[i] for i in column_indices]
-            result_data.append(selected_row)
-        
-        # Apply ORDER BY (simplified implementation)
-        if order_by:
-            order_column = order_by.strip().lower()
-            if order_column in selected_columns:
-                order_index = selected_columns.index(order_column)
-                result_data.sort(key=lambda x: x[order_index] if x[order_index] is not None else "")
-        
-        # Apply LIMIT
-        if limit:
-            result_data = result_data[:limit]
+        operator = await self._select_operator(parsed_query, table_metadata, column_indices, query)
+        logger.debug("Select plan: %s", " -> ".join(operator.explain()))
+        result_data = list(operator)
         
         # Preparar respuesta con todos los campos requeridos
         return {
@@ -357,10 +301,196 @@ class QueryPlanner:
             "io_operations": 1
         }
 
+    async def _select_operator(
+        self, parsed_query: Dict[str, Any], table_metadata: Dict[str, Any], column_indices: List[int],
+        query: Optional[str] = None
+    ) -> Operator:
+        """Operator tree of a SELECT: Scan/IndexScan -> Filter/BatchFilter -> Sort -> Limit -> Project"""
+        prepared = self._prepared_select(parsed_query, table_metadata, column_indices, query)
+        where_conditions = parsed_query.get("where") or []
+        order_index = prepared["order_index"]
+        
+        operator = await self._access_path(
+            table_metadata, prepared["needed_columns"], where_conditions, prepared["access_plan"])
+        if prepared["mask_of"] is not None and isinstance(operator, Scan):
+            operator = BatchFilter(operator, prepared["mask_of"], self.batch_size)
+        elif where_conditions:
+            # Index lookups return candidates: every condition is checked again
+            operator = Filter(operator, prepared["predicate"])
+        if order_index is not None:
+            operator = Sort(operator, order_index, parsed_query.get("descending", False))
+        if parsed_query.get("limit") is not None:
+            operator = Limit(operator, parsed_query["limit"])
+        return Project(operator, column_indices)
 
-    async def _load_table_data(self, file_path: str) -> List[List]:
-    
-    
+    def _prepared_select(
+        self, parsed_query: Dict[str, Any], table_metadata: Dict[str, Any], column_indices: List[int],
+        query: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Compiled predicates, columns to read and access path of a SELECT on a table.
+
+        Given the statement text, they are kept in the plan cache next to its
+        parsed plan, so a repeated query is not planned again. The scope
+        includes the size class of the table: the access path is chosen
+        again when the table doubles or halves, and after ANALYZE.
+        """
+        version = self.catalog.version
+        scope = (table_metadata["user_id"], table_metadata["name"], tuple(column_indices),
+                 position_count(table_metadata).bit_length())
+        if query is not None:
+            prepared = self.plan_cache.get_prepared(query, version, scope)
+            if prepared is not None:
+                return prepared
+        
+        all_columns = [col["name"] for col in table_metadata["columns"]]
+        where_conditions = parsed_query.get("where") or []
+        order_index = None
+        if parsed_query.get("order_by"):
+            if parsed_query["order_by"] not in all_columns:
+                raise ValueError(f"Column {parsed_query['order_by']} not found in table {table_metadata['name']}")
+            order_index = all_columns.index(parsed_query["order_by"])
+        
+        # Columnar tables only read the columns the query touches
+        needed_columns = set(column_indices)
+        needed_columns.update(all_columns.index(condition["column"]) for condition in where_conditions)
+        if order_index is not None:
+            needed_columns.add(order_index)
+        
+        mask_of = None
+        if self.batch_size > 0 and (parsed_query.get("limit") is None or order_index is not None):
+            # Full scans are filtered a batch at a time; with a LIMIT and no sort
+            # the row Filter stops the scan sooner
+            mask_of = compile_batch_predicate(where_conditions, table_metadata["columns"])
+        prepared = {
+            # Column positions and literal types are resolved here, once
+            "predicate": compile_predicate(where_conditions, table_metadata["columns"]),
+            "mask_of": mask_of,
+            "order_index": order_index,
+            "needed_columns": sorted(needed_columns),
+            "access_plan": self._access_plan(table_metadata, where_conditions),
+        }
+        if query is not None:
+            self.plan_cache.put_prepared(query, version, scope, prepared)
+        return prepared
+
+    async def _access_path(
+        self, table_metadata: Dict[str, Any], column_indices: List[int], conditions: List[Dict[str, Any]],
+        access_plan: Optional[Dict[str, Any]]
+    ) -> Operator:
+        """IndexScan when access_plan is an index plan whose lookups succeed, otherwise a Scan of the table"""
+        positions = self._lookup_positions(table_metadata, access_plan)
+        if positions is None:
+            return Scan(await self._scan_table(table_metadata, column_indices, conditions))
+        table_storage = self._open_table_storage(table_metadata)
+        if isinstance(table_storage, HeapFile):
+            await table_storage.ensure_directory()
+            reader = MappedHeapReader(table_storage, self.storage_manager)
+            return IndexScan(positions, lambda batch: [row for _, _, _, row in reader.rows_at(batch)])
+        # Columnar: solo se leen las filas de las posiciones, buscando en cada archivo de columna
+        return IndexScan(positions, lambda batch: table_storage.read_rows_at(batch, column_indices))
+
+
+    async def _execute_analyze(self, parsed_query: Dict[str, Any], user_id: int) -> Dict[str, Any]:
+        """Execute ANALYZE: rebuild the column statistics of a table in one scan"""
+        table_name = parsed_query["table"]
+        table_metadata = self.catalog.get_table_metadata(table_name, user_id)
+        if not table_metadata:
+            raise ValueError(f"Table {table_name} not found")
+        
+        statistics = build_table_statistics(table_metadata["columns"], await self._scan_table(table_metadata))
+        await self.catalog.set_table_statistics(table_name, user_id, statistics)
+        
+        data = [
+            [name, stats["null_count"], stats["distinct_count"], stats["min"], stats["max"]]
+            for name, stats in statistics["columns"].items()
+        ]
+        return {
+            "columns": ["column", "null_count", "distinct_count", "min", "max"],
+            "data": data,
+            "page": 1,
+            "total_pages": 1,
+            "current_page": 1,
+            "rows_affected": statistics["row_count"],
+            "io_operations": 1
+        }
+
+    def _open_table_storage(self, table_metadata: Dict[str, Any]) -> Optional[TableStorage]:
+        """Return the storage of a table, or None for legacy JSON tables"""
+        return open_table_storage(table_metadata, self.storage_manager)
+
+    async def _get_writable_storage(self, table_metadata: Dict[str, Any]) -> TableStorage:
+        """Return the storage of a table, migrating legacy JSON tables to heap files on first write"""
+        table_storage = self._open_table_storage(table_metadata)
+        if table_storage is not None:
+            return table_storage
+        
+        data_file_path = table_metadata["data_file"]
+        existing_data = []
+        if os.path.exists(data_file_path):
+            existing_data = await self._load_json_table_data(data_file_path)
+        
+        heap_file = HeapFile(data_file_path, table_metadata["columns"], self.storage_manager)
+        await heap_file.write_all(existing_data)
+        await self.catalog.set_table_properties(
+            table_metadata["name"], table_metadata["user_id"],
+            storage_format="heap", row_count=len(existing_data)
+        )
+        return heap_file
+
+    async def _scan_table(
+        self, table_metadata: Dict[str, Any], column_indices: Optional[List[int]] = None,
+        conditions: Optional[List[Dict[str, Any]]] = None
+    ) -> Iterable[List]:
+        """Iterate full-width rows. Columnar tables only read the columns in column_indices.
+
+        Heap tables are read through a shared mmap and decoded lazily; with
+        conditions, pages whose zone map rules them out are skipped. The rows
+        that are returned still have to be filtered by the caller.
+        """
+        table_storage = self._open_table_storage(table_metadata)
+        if isinstance(table_storage, HeapFile):
+            reader = MappedHeapReader(table_storage, self.storage_manager)
+            return reader.iter_rows(self._zone_map_filter(table_storage, table_metadata, conditions))
+        if table_storage is not None:
+            return table_storage.iter_rows(column_indices)
+        return await self._load_json_table_data(table_metadata["data_file"])
+
+    def _zone_map_filter(
+        self, heap_file: HeapFile, table_metadata: Dict[str, Any], conditions: Optional[List[Dict[str, Any]]]
+    ) -> Optional[Callable[[int, int], bool]]:
+        """Page filter for a full scan, or None when the zone map cannot help"""
+        if not conditions or not ZoneMap.usable_conditions(conditions):
+            return None
+        columns = [col["name"] for col in table_metadata["columns"]]
+        zone_conditions = []
+        for condition in conditions:
+            if condition["column"] not in columns or condition["operator"] not in ZONE_OPERATORS:
+                continue
+            column_index = columns.index(condition["column"])
+            column = table_metadata["columns"][column_index]
+            # Los literales se comparan con las zonas ya convertidos, como en el predicado compilado
+            convert = literal_converter(column["data_type"], column.get("date_format"))
+            value = condition["value"]
+            try:
+                if value is not None:
+                    value = [convert(v) for v in value] if condition["operator"] == "BETWEEN" else convert(value)
+            except (TypeError, ValueError):
+                continue
+            zone_conditions.append((column_index, condition["operator"], value))
+        entries = heap_file.zone_map.load()
+        if not zone_conditions or not entries:
+            return None
+        return lambda page_no, slot_count: heap_file.zone_map.page_may_match(
+            entries.get(page_no), slot_count, zone_conditions
+        )
+
+    async def _load_table_data(
+        self, table_metadata: Dict[str, Any], column_indices: Optional[List[int]] = None
+    ) -> List[List]:
+        return list(await self._scan_table(table_metadata, column_indices))
+
+    async def _load_json_table_data(self, file_path: str) -> List[List]:
+        """Load a table stored in the legacy JSON array format"""
         print(f"=== LOADING TABLE DATA ===")
         print(f"File: {file_path}")
         
@@ -395,199 +525,68 @@ class QueryPlanner:
     
     
     
-    async def _apply_where_conditions(
-        self, data: List[List[Any]], conditions: List[Dict[str, Any]], 
-        table_metadata: Dict[str, Any], user_id: int
-    ) -> List[List[Any]]:
-        columns = [col["name"] for col in table_metadata["columns"]]
-        filtered_data = []
+    def _index_positions(self, table_metadata: Dict[str, Any], conditions: List[Dict[str, Any]]) -> Optional[List[int]]:
+        """Candidate row positions of the cheapest index plan for conditions.
 
-        # Intenta usar índices si están disponibles
-        for cond in conditions:
-            col = cond["column"]
-            op = cond["operator"]
-            if col in table_metadata.get("indices", {}) and op in ("=", "BETWEEN"):
-                try:
-                    # Usar índice
-                    index_info = table_metadata["indices"][col]
-                    index_type = index_info["type"]
-                    index_name = f"{table_metadata['user_id']}_{table_metadata['name']}_{col}_{index_info['type'].lower()}"
-                    index = self.index_interface.get_index(index_name)
-                    if not index:
-                        # Cargar el índice si no está en memoria
-                        index_file = index_info["path"]
-                        index = self.index_interface.load_index(index_type, index_name, index_file)
-                
-                    # Buscar filas usando el índice
-                    if op == "=":
-                        row_indices = index.search(cond["value"])
-                        if not isinstance(row_indices, list):
-                            row_indices = [row_indices] if row_indices is not None else []
-                    elif op == "BETWEEN":
-                        start, end = cond["value"]
-                        row_indices = index.range_search(start, end)
-                    else:
-                        row_indices = []
-
-                    # Filtrar data por índices encontrados
-                    filtered_data = [data[i] for i in row_indices if i is not None and i < len(data)]
-                    return filtered_data  # Retorna los datos filtrados por el índice
-                except Exception as e:
-                    # Si falla el índice, imprime un log y continúa con evaluación normal
-                    print(f"Warning: Could not use index for column {col}. Error: {str(e)}")
-                    break  # Salir del bucle y usar evaluación normal
+        None when the scan is cheaper or a lookup fails, and the caller scans
+        the table instead. The candidates still have to be checked against
+        every condition.
+        """
+        return self._lookup_positions(table_metadata, self._access_plan(table_metadata, conditions))
 
-        # Si no hay índice aplicable o falló, usar el método normal
-        for row in data:
-            if await self._evaluate_conditions(row, conditions, columns, table_metadata, user_id):
-                filtered_data.append(row)
+    def _access_plan(self, table_metadata: Dict[str, Any], conditions: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Access path the cost model picks for conditions, weighing a full scan
+        against single- and multi-index plans.
 
-        return filtered_data
-    
+        None when no index can help: no conditions, no indices, or a legacy
+        JSON table, which cannot read a row by position.
+        """
+        if not conditions or not table_metadata.get("indices"):
+            return None
+        table_storage = self._open_table_storage(table_metadata)
+        if table_storage is None:
+            return None
+        page_count = table_storage.page_count if isinstance(table_storage, HeapFile) else None
+        plan = choose_access_path(table_metadata, conditions, page_count)
+        logger.debug("Access path: %s (cost %.1f)", describe_access_path(plan), plan["cost"])
+        return plan
 
+    def _lookup_positions(self, table_metadata: Dict[str, Any], plan: Optional[Dict[str, Any]]) -> Optional[List[int]]:
+        """Row positions of an index plan: the union over its groups of the intersection of their lookups"""
+        if plan is None or plan["type"] == "scan":
+            return None
+        try:
+            positions = set()
+            indices = {}
+            for group in plan["groups"]:
+                group_positions = None
+                for lookup in group:
+                    column = lookup["column"]
+                    if column not in indices:
+                        index_info = table_metadata["indices"][column]
+                        indices[column] = self.index_interface.open_index(index_info["type"], index_info["path"])
+                    found = set(self._index_lookup(table_metadata, indices[column], lookup))
+                    group_positions = found if group_positions is None else group_positions & found
+                    if not group_positions:
+                        break
+                positions |= group_positions
+            return sorted(positions)
+        except (ValueError, TypeError, OSError) as e:
+            # Literal que no se convierte al tipo de la clave, búsqueda que el índice
+            # no soporta o archivos del índice ilegibles: se evalúa con un scan
+            logger.warning("Could not use index plan %s: %s", describe_access_path(plan), e)
+            return None
 
-    def _evaluate_condition(self, row_value: Any, operator: str, condition_value: Any) -> bool:
-        # Añadir logs para debug
-        print(f"DEBUG EVALUATE: {row_value} ({type(row_value)}) {operator} {condition_value} ({type(condition_value)})")
-    
-        if operator == "=":
-            return str(row_value) == str(condition_value)  # Comparación robusta como strings
-        elif operator == "!=":
-            return str(row_value) != str(condition_value)  # Comparación robusta como strings
-        elif operator == "<":
-            # Intentar comparación numérica si es posible
-            try:
-                if isinstance(row_value, (int, float)) and not isinstance(condition_value, (int, float)):
-                    condition_value = float(condition_value)
-                elif not isinstance(row_value, (int, float)) and isinstance(condition_value, (int, float)):
-                    row_value = float(row_value)
-                return row_value < condition_value
-            except (ValueError, TypeError):
-                # Fallback a comparación de strings
-                return str(row_value) < str(condition_value)
-        elif operator == ">":
-            # Mismo enfoque que para "<"
-            try:
-                if isinstance(row_value, (int, float)) and not isinstance(condition_value, (int, float)):
-                    condition_value = float(condition_value)
-                elif not isinstance(row_value, (int, float)) and isinstance(condition_value, (int, float)):
-                    row_value = float(row_value)
-                return row_value > condition_value
-            except (ValueError, TypeError):
-                return str(row_value) > str(condition_value)
-        elif operator == "<=":
-            # Mismo enfoque
-            try:
-                if isinstance(row_value, (int, float)) and not isinstance(condition_value, (int, float)):
-                    condition_value = float(condition_value)
-                elif not isinstance(row_value, (int, float)) and isinstance(condition_value, (int, float)):
-                    row_value = float(row_value)
-                return row_value <= condition_value
-            except (ValueError, TypeError):
-                return str(row_value) <= str(condition_value)
-        elif operator == ">=":
-            # Mismo enfoque
-            try:
-                if isinstance(row_value, (int, float)) and not isinstance(condition_value, (int, float)):
-                    condition_value = float(condition_value)
-                elif not isinstance(row_value, (int, float)) and isinstance(condition_value, (int, float)):
-                    row_value = float(row_value)
-                return row_value >= condition_value
-            except (ValueError, TypeError):
-                return str(row_value) >= str(condition_value)
-        elif operator == "BETWEEN":
-            # Tratamiento especial para BETWEEN
-            try:
-                start, end = condition_value
-                print(f"DEBUG BETWEEN: {start} ({type(start)}) AND {end} ({type(end)})")
-            
-                # Si row_value es numérico, intenta convertir start y end
-                if isinstance(row_value, (int, float)):
-                    try:
-                        start = float(start)
-                        end = float(end)
-                    except (ValueError, TypeError):
-                        # Si la conversión falla, convierte todo a string
-                        row_value = str(row_value)
-                        start = str(start)
-                        end = str(end)
-                else:
-                    # Si row_value no es numérico, convierte todo a string
-                    row_value = str(row_value)
-                    start = str(start)
-                    end = str(end)
-            
-                print(f"DEBUG AFTER CONVERSION: {row_value} ({type(row_value)}) BETWEEN {start} ({type(start)}) AND {end} ({type(end)})")
-                result = start <= row_value <= end
-                print(f"DEBUG RESULT: {result}")
-                return result
-            except Exception as e:
-                print(f"DEBUG ERROR IN BETWEEN: {str(e)}")
-                # Último recurso: intenta como strings
-                try:
-                    start, end = condition_value
-                    return str(start) <= str(row_value) <= str(end)
-                except:
-                    return False
-        else:
-            raise ValueError(f"Unsupported operator: {operator}")
-        
-    
-    async def _evaluate_conditions(
-        self, row: List[Any], conditions: List[Dict[str, Any]], 
-        columns: List[str], table_metadata: Dict[str, Any], user_id: int
-    ) -> bool:
-        
-        if not conditions:
-            return True
-        
-        result = True
-        for i, condition in enumerate(conditions):
-            column_name = condition["column"]
-            
-            if column_name not in columns:
-                raise ValueError(f"Column {column_name} not found")
-            
-            column_index = columns.index(column_name)
-            row_value = row[column_index]
-            condition_value = condition["value"]
-            operator = condition["operator"]
-            
-            # Check if we can use an index
-            if column_name in table_metadata.get("indices", {}):
-                condition_result = await self._evaluate_with_index(
-                    table_metadata, column_name, operator, condition_value, user_id
-                )
-            else:
-                condition_result = self._evaluate_condition(row_value, operator, condition_value)
-            
-            # Handle logical operators
-            if i == 0:
-                result = condition_result
-            else:
-                prev_condition = conditions[i-1]
-                if prev_condition.get("logical_op") == "AND":
-                    result = result and condition_result
-                elif prev_condition.get("logical_op") == "OR":
-                    result = result or condition_result
-        
-        return result
-    
-    
-    
-    async def _evaluate_with_index(
-        self, table_metadata: Dict[str, Any], column_name: str, 
-        operator: str, value: Any, user_id: int
-    ) -> bool:
-        # Use index for evaluation (placeholder implementation)
-        index_info = table_metadata["indices"][column_name]
-        index_type = index_info["type"]
-        
-        # This would interface with your existing index implementations
-        # For now, fall back to regular evaluation
-        return True
-    
-    
+    def _index_lookup(self, table_metadata: Dict[str, Any], index: BaseIndex, lookup: Dict[str, Any]) -> List[int]:
+        """Row positions an index gives for a lookup of the cost model"""
+        column_name = lookup["column"]
+        columns = [col["name"] for col in table_metadata["columns"]]
+        column = table_metadata["columns"][columns.index(column_name)]
+        key_of = lambda value: self._coerce_for_insert(value, column["data_type"], column.get("date_format"))
+        if lookup["operation"] == "range":
+            start, end = lookup["values"]
+            return list(index.range_search(key_of(start), key_of(end)))
+        return [position for value in lookup["values"] for position in index.search(key_of(value)) or []]
 
     async def get_table_data(self, table_name: str, page: int, user_id: int) -> dict:
         table_metadata = self.catalog.get_table_metadata(table_name, user_id)
@@ -598,13 +597,27 @@ class QueryPlanner:
         if not data_file_path or not os.path.exists(data_file_path):
             raise ValueError(f"Data file not found for table {table_name}")
         
-        table_data = await self._load_table_data(data_file_path)
-        
         # Paginate results
         page_size = 50
         start_idx = (page - 1) * page_size
         end_idx = start_idx + page_size
-        paginated_data = table_data[start_idx:end_idx]
+        
+        # Only the bytes of the requested rows are read; totals come from the catalog
+        total_rows = table_metadata.get("row_count", 0)
+        page_rows = total_rows
+        table_storage = self._open_table_storage(table_metadata)
+        if isinstance(table_storage, HeapFile):
+            # Pages cover row positions: deleted rows leave gaps until vacuum
+            page_rows = position_count(table_metadata)
+            await table_storage.ensure_directory()
+            reader = MappedHeapReader(table_storage, self.storage_manager)
+            paginated_data = reader.read_rows(start_idx, page_size)
+        elif table_storage is not None:
+            paginated_data = table_storage.read_rows(start_idx, page_size)
+        else:
+            table_data = await self._load_table_data(table_metadata)
+            paginated_data = table_data[start_idx:end_idx]
+            total_rows = page_rows = len(table_data)
         
         # Convertir columnas a formato correcto
         column_names = [col["name"] for col in table_metadata["columns"]]
@@ -612,24 +625,21 @@ class QueryPlanner:
         return {
             "data": paginated_data,
             "columns": column_names,
-            "total_pages": (len(table_data) + page_size - 1) // page_size,
+            "total_pages": (page_rows + page_size - 1) // page_size,
             "current_page": page,
-            "total_rows": len(table_data),
+            "total_rows": total_rows,
             "page_size": page_size
         }
 
     
     
     async def _execute_insert(self, parsed_query: Dict[str, Any], user_id: int) -> Dict[str, Any]:
-        """Execute INSERT query"""
+        """Execute INSERT query: one or more VALUES rows, or the result of a SELECT.
+
+        All the rows of the statement are appended in one batch, added to the
+        indices in one pass and counted with one catalog update.
+        """
         table_name = parsed_query["table"]
-        columns = parsed_query["columns"]
-        values = parsed_query["values"]
-        
-        print(f"=== EXECUTING INSERT ===")
-        print(f"Table: {table_name}")
-        print(f"Columns: {columns}")
-        print(f"Values: {values}")
         
         # Get table metadata
         table_metadata = self.catalog.get_table_metadata(table_name, user_id)
@@ -641,68 +651,329 @@ class QueryPlanner:
         if not data_file_path:
             raise ValueError(f"Data file path not found for table {table_name}")
         
-        # Load existing table data
-        if os.path.exists(data_file_path):
-            existing_data = await self._load_table_data(data_file_path)
-        else:
-            existing_data = []
-    
         # Get column definitions from metadata
         table_columns = [col["name"].lower() for col in table_metadata["columns"]]
-        column_types = {col["name"].lower(): col["data_type"] for col in table_metadata["columns"]}
-    
-        print(f"Table columns: {table_columns}")
-        print(f"Column types: {column_types}")
+        columns = [col.lower() for col in parsed_query["columns"] or table_columns]
     
         # Validate columns in INSERT
         for col in columns:
-            if col.lower() not in table_columns:
+            if col not in table_columns:
                 raise ValueError(f"Column '{col}' does not exist in table '{table_name}'")
+        
+        if parsed_query.get("select"):
+            select_result = await self._execute_select(parsed_query["select"], user_id)
+            rows = self._rows_for_insert(select_result["data"], columns, table_metadata, convert=self._coerce_for_insert)
+        else:
+            rows = self._rows_for_insert(parsed_query["rows"], columns, table_metadata, convert=self._convert_literal)
+        logger.debug("Rows to insert into %s: %d", table_name, len(rows))
     
-        # Validate number of values matches number of columns
-        if len(values) != len(columns):
-            raise ValueError(f"Number of values ({len(values)}) does not match number of columns ({len(columns)})")
+        # Append only the new rows to the end of the table
+        row_ids = []
+        if rows:
+            table_storage = await self._get_writable_storage(table_metadata)
+            async with self.storage_manager.transaction():
+                row_ids = await table_storage.append_rows(rows)
+                # Con el latch tomado: ni otro escritor ni el vacuum mueven las posiciones
+                self.index_interface.add_index_entries(table_metadata, self.index_interface.index_entries(
+                    table_metadata, rows, table_storage.row_positions(row_ids)))
+                await self.catalog.record_appended_rows(
+                    table_name, user_id, build_table_statistics(table_metadata["columns"], rows)
+                )
     
-        # Convert and validate values according to column types
-        converted_row = []
-        for i, col in enumerate(table_columns):
-            if col in [c.lower() for c in columns]:
-                # Find the value for this column
-                col_index = [c.lower() for c in columns].index(col)
-                value = values[col_index]
-            
-                # Convert value to appropriate type
-                data_type = column_types[col]
+        return {
+            "columns": ["message", "row_id"],
+            "data": [[f"INSERT completed successfully. {len(rows)} row{'' if len(rows) == 1 else 's'} affected.",
+                      row_ids[0] if row_ids else None]],
+            "page": 1,
+            "total_pages": 1,
+            "current_page": 1,
+            "rows_affected": len(rows),
+            "io_operations": 1
+        }
+
+    def _rows_for_insert(
+        self, values_rows: List[List[Any]], columns: List[str], table_metadata: Dict[str, Any],
+        convert: Callable[[Any, str, Optional[str]], Any]
+    ) -> List[List[Any]]:
+        """Table rows from rows of values for columns; the other columns are NULL"""
+        # Posición en la fila de valores de cada columna de la tabla (None si no se da)
+        sources = []
+        for col in table_metadata["columns"]:
+            name = col["name"].lower()
+            sources.append((columns.index(name) if name in columns else None, name, col["data_type"], col.get("date_format")))
+        
+        rows = []
+        for row_number, values in enumerate(values_rows, start=1):
+            # Validate number of values matches number of columns
+            if len(values) != len(columns):
+                raise ValueError(f"Row {row_number}: number of values ({len(values)}) does not match "
+                                 f"number of columns ({len(columns)})")
+            row = []
+            for source, name, data_type, date_format in sources:
+                if source is None:
+                    # Column not provided in INSERT, use default value (NULL)
+                    row.append(None)
+                    continue
+                value = values[source]
                 try:
-                    converted_value = self._convert_value_for_insert(value, data_type)
-                    converted_row.append(converted_value)
+                    row.append(convert(value, data_type, date_format))
                 except Exception as e:
-                    raise ValueError(f"Error converting value '{value}' for column '{col}' (type {data_type}): {str(e)}")
-            else:
-                # Column not provided in INSERT, use default value (NULL or appropriate default)
-                converted_row.append(None)
-    
-        print(f"Converted row: {converted_row}")
-    
-        # Add the new row to existing data
-        existing_data.append(converted_row)
-    
-        # Save updated data back to file
-        await self._save_table_data(data_file_path, existing_data)
-    
-        print(f"=== INSERT COMPLETED ===")
-    
+                    raise ValueError(f"Error converting value '{value}' for column '{name}' (type {data_type}): {str(e)}")
+            rows.append(row)
+        return rows
+
+    def _convert_literal(self, value: Any, data_type: str, date_format: Optional[str] = None) -> Any:
+        """Adapt a literal of the statement to the column type"""
+        if isinstance(value, str) and data_type == 'ARRAY[FLOAT]':
+            # Arrays can also be written as text: '[1.0, 2.5]'
+            return self._convert_value_for_insert(value, data_type, date_format)
+        if isinstance(value, list) and data_type != 'ARRAY[FLOAT]':
+            raise ValueError("array value for a column that is not an array")
+        if isinstance(value, float) and data_type == 'INT' and not value.is_integer():
+            raise ValueError("non-integer value for an INT column")
+        return self._coerce_for_insert(value, data_type, date_format)
+
+    def _coerce_for_insert(self, value: Any, data_type: str, date_format: Optional[str] = None) -> Any:
+        """Adapt a value read from another table to the column type"""
+        if value is None:
+            return None
+        if data_type == 'INT':
+            return int(value)
+        elif data_type == 'FLOAT':
+            return float(value)
+        elif data_type == 'ARRAY[FLOAT]':
+            return [float(x) for x in value]
+        elif data_type == 'DATE':
+            return get_date_parser(date_format).to_iso(str(value))
+        return str(value)
+
+    async def _execute_delete(self, parsed_query: Dict[str, Any], user_id: int) -> Dict[str, Any]:
+        """Execute DELETE: tombstone the matching rows in their pages.
+
+        Only the pages holding those rows are written. Their index entries are
+        left in place (lookups skip deleted rows) until the table is vacuumed.
+        """
+        table_name = parsed_query["table"]
+        table_metadata = self.catalog.get_table_metadata(table_name, user_id)
+        if not table_metadata:
+            raise ValueError(f"Table {table_name} not found")
+        heap_file = await self._get_dml_heap_file(table_metadata, "DELETE")
+        
+        located = await self._locate_rows(table_metadata, heap_file, parsed_query.get("where") or [], user_id)
+        deleted = 0
+        if located:
+            async with self.storage_manager.transaction():
+                deleted = await heap_file.delete_rows([(page_no, slot) for _, page_no, slot, _ in located])
+            await self.catalog.record_tombstones(table_name, user_id, tombstones=deleted, deleted=deleted)
+            self._request_vacuum(table_name, user_id)
+        
+        return {
+            "columns": ["message"],
+            "data": [[f"DELETE completed successfully. {deleted} row{'' if deleted == 1 else 's'} affected."]],
+            "page": 1,
+            "total_pages": 1,
+            "current_page": 1,
+            "rows_affected": deleted,
+            "io_operations": 1
+        }
+
+    async def _execute_update(self, parsed_query: Dict[str, Any], user_id: int) -> Dict[str, Any]:
+        """Execute UPDATE: rewrite the matching rows in their slots when they still fit.
+
+        Rows that outgrow their page are tombstoned and appended at the end of
+        the table. New keys are added to the indices; the old entries stay
+        until vacuum, as lookups re-check every row they return.
+        """
+        table_name = parsed_query["table"]
+        table_metadata = self.catalog.get_table_metadata(table_name, user_id)
+        if not table_metadata:
+            raise ValueError(f"Table {table_name} not found")
+        heap_file = await self._get_dml_heap_file(table_metadata, "UPDATE")
+        
+        columns = [col["name"].lower() for col in table_metadata["columns"]]
+        assignments = []
+        for column, value in parsed_query["set"].items():
+            if column not in columns:
+                raise ValueError(f"Column '{column}' does not exist in table '{table_name}'")
+            col = table_metadata["columns"][columns.index(column)]
+            assignments.append((columns.index(column), self._convert_literal(
+                value, col["data_type"], col.get("date_format"))))
+        
+        located = await self._locate_rows(table_metadata, heap_file, parsed_query.get("where") or [], user_id)
+        updates = []
+        for _, page_no, slot, row in located:
+            new_row = list(row)
+            for column_index, value in assignments:
+                new_row[column_index] = value
+            updates.append((page_no, slot, new_row))
+        
+        if updates:
+            async with self.storage_manager.transaction():
+                moved = await heap_file.update_rows(updates)
+                moved_rows = [updates[i][2] for i in moved]
+                moved_ids = await heap_file.append_rows(moved_rows) if moved_rows else []
+                
+                # Moved rows get entries for every index at their new positions, the
+                # others only for the indexed columns whose value changed
+                index_entries = self.index_interface.index_entries(
+                    table_metadata, moved_rows, heap_file.row_positions(moved_ids))
+                moved_set = set(moved)
+                for column_index, value in assignments:
+                    column = columns[column_index]
+                    if column not in table_metadata.get("indices", {}) or value is None:
+                        continue
+                    index_entries.setdefault(column, []).extend(
+                        (value, position) for i, (position, _, _, row) in enumerate(located)
+                        if i not in moved_set and row[column_index] != value
+                    )
+                self.index_interface.add_index_entries(table_metadata, index_entries)
+                if moved_rows:
+                    await self.catalog.record_tombstones(table_name, user_id, tombstones=len(moved_rows))
+            if moved_rows:
+                self._request_vacuum(table_name, user_id)
+        
         return {
             "columns": ["message"],
-            "data": [["INSERT completed successfully. 1 row affected."]],
+            "data": [[f"UPDATE completed successfully. {len(updates)} row{'' if len(updates) == 1 else 's'} affected."]],
             "page": 1,
             "total_pages": 1,
             "current_page": 1,
-            "rows_affected": 1,
+            "rows_affected": len(updates),
             "io_operations": 1
         }
 
-    def _convert_value_for_insert(self, value: str, data_type: str) -> Any:
+    async def _get_dml_heap_file(self, table_metadata: Dict[str, Any], statement: str) -> HeapFile:
+        table_storage = await self._get_writable_storage(table_metadata)
+        if not isinstance(table_storage, HeapFile):
+            raise ValueError(f"{statement} is only supported on heap tables; columnar tables are append-only")
+        return table_storage
+
+    async def _locate_rows(
+        self, table_metadata: Dict[str, Any], heap_file: HeapFile, conditions: List[Dict[str, Any]], user_id: int
+    ) -> List[Tuple[int, int, int, List[Any]]]:
+        """(position, page, slot, row) of the live rows matching conditions.
+
+        Candidates come from an index when one applies, otherwise from a scan
+        that skips the pages the zone map rules out.
+        """
+        predicate = compile_predicate(conditions, table_metadata["columns"])
+        await heap_file.ensure_directory()
+        reader = MappedHeapReader(heap_file, self.storage_manager)
+        positions = self._index_positions(table_metadata, conditions)
+        if positions is not None:
+            candidates = reader.rows_at(positions)
+        else:
+            candidates = reader.iter_located_rows(self._zone_map_filter(heap_file, table_metadata, conditions))
+        return [located for located in candidates if predicate(located[3])]
+
+    def _request_vacuum(self, table_name: str, user_id: int):
+        if self.catalog.vacuum.needs_vacuum(self.catalog.get_table_metadata(table_name, user_id)):
+            self.catalog.vacuum.request()
+
+    async def bulk_insert(self, table_name: str, file_path: str, user_id: int, has_headers: bool = True) -> Dict[str, Any]:
+        """Append the rows of a CSV or NDJSON file to a table.
+
+        The whole file is converted with the table schema first, into a
+        temporary spill file, so a bad row leaves the table untouched. The rows
+        are then appended in chunks of bulk_commit_rows, each one a transaction
+        that also adds its index entries and catalog counts: the write latch is
+        held and pages stay staged for one chunk at a time.
+
+        The load is therefore not atomic: if a chunk fails after others were
+        committed, BulkInsertError reports how many rows the table kept.
+        """
+        table_metadata = self.catalog.get_table_metadata(table_name, user_id)
+        if not table_metadata:
+            raise ValueError(f"Table {table_name} not found")
+        columns = [ColumnDefinition(**col) for col in table_metadata["columns"]]
+        if has_headers and file_path.lower().endswith('.csv'):
+            self._check_csv_header(file_path, columns)
+        
+        table_storage = await self._get_writable_storage(table_metadata)
+        row_count = 0
+        io_before = self.storage_manager.get_io_operations()
+        started = time.perf_counter()
+        with tempfile.TemporaryFile(dir=self.storage_manager.data_dir) as spill:
+            async for batch in self.file_processor.iter_batches(file_path, columns, has_headers):
+                pickle.dump(batch, spill, protocol=pickle.HIGHEST_PROTOCOL)
+                row_count += len(batch)
+            spill.seek(0)
+            committed = 0
+            for chunk in self._spilled_chunks(spill):
+                try:
+                    async with self.storage_manager.transaction():
+                        row_ids = await table_storage.append_rows(chunk)
+                        self.index_interface.add_index_entries(table_metadata, self.index_interface.index_entries(
+                            table_metadata, chunk, table_storage.row_positions(row_ids)))
+                        await self.catalog.record_appended_rows(
+                            table_name, user_id, build_table_statistics(table_metadata["columns"], chunk))
+                except Exception as e:
+                    if not committed:
+                        raise
+                    logger.error("Bulk insert into %s stopped after %d committed rows", table_name, committed)
+                    raise BulkInsertError(table_name, committed, e) from e
+                committed += len(chunk)
+        elapsed = time.perf_counter() - started
+        
+        rows_per_second = row_count / elapsed if elapsed > 0 else float(row_count)
+        logger.info("Bulk insert into %s: %d rows in %.2fs (%.0f rows/s)", table_name, row_count, elapsed, rows_per_second)
+        return {
+            "table_name": table_name,
+            "rows_inserted": row_count,
+            "rows_per_second": round(rows_per_second, 1),
+            "io_operations": self.storage_manager.get_io_operations() - io_before,
+            "execution_time_ms": elapsed * 1000
+        }
+
+    def _spilled_chunks(self, spill) -> Iterator[List[List[Any]]]:
+        """Rows of the batches pickled in spill, regrouped in chunks of bulk_commit_rows"""
+        chunk = []
+        while True:
+            try:
+                chunk.extend(pickle.load(spill))
+            except EOFError:
+                break
+            while len(chunk) >= self.bulk_commit_rows:
+                yield chunk[:self.bulk_commit_rows]
+                chunk = chunk[self.bulk_commit_rows:]
+        if chunk:
+            yield chunk
+
+    async def arrow_batches(
+        self, table_name: str, user_id: int, query: Optional[str] = None
+    ) -> Tuple[pa.Schema, Iterator[pa.RecordBatch]]:
+        """Schema and record batches of a whole table, or of the result of a SELECT on it.
+
+        A table is streamed from its storage batch by batch; a SELECT result
+        is built first, as for /query.
+        """
+        table_metadata = self.catalog.get_table_metadata(table_name, user_id)
+        if not table_metadata:
+            raise ValueError(f"Table {table_name} not found")
+        column_types = {col["name"]: col for col in table_metadata["columns"]}
+        if query:
+            parsed_query = self._plan(query)
+            if parsed_query["type"] != "SELECT" or parsed_query["table"] != table_name.lower():
+                raise ValueError(f"Only SELECT queries on {table_name} can be exported")
+            result = await self._execute_select(parsed_query, user_id)
+            schema = table_schema([column_types[name] for name in result["columns"]])
+            rows = result["data"]
+        else:
+            schema = table_schema(table_metadata["columns"])
+            rows = await self._scan_table(table_metadata)
+        return schema, record_batches(rows, schema, BATCH_ROWS)
+
+    def _check_csv_header(self, file_path: str, columns: List[ColumnDefinition]):
+        with open(file_path, 'r', encoding='utf-8', newline='') as f:
+            header = next(csv.reader(f), None)
+        if header is None:
+            raise ValueError("CSV file is empty or has no headers")
+        names = [name.strip().lower() for name in header]
+        expected = [col.name.lower() for col in columns]
+        if names != expected:
+            raise ValueError(f"CSV columns {names} do not match table columns {expected}")
+
+    def _convert_value_for_insert(self, value: str, data_type: str, date_format: Optional[str] = None) -> Any:
         """Convert string value to appropriate data type for INSERT"""
         try:
             if value.upper() == 'NULL':
@@ -719,16 +990,14 @@ class QueryPlanner:
                 return str(value)
             elif data_type == 'BOOLEAN':
                 return value.lower() in ('true', '1', 'yes', 'on')
+            elif data_type == 'ARRAY[FLOAT]':
+                return [float(x) for x in value.strip().strip('[]').split(',') if x.strip()]
             elif data_type == 'DATE':
-                from datetime import datetime
-                # Try multiple date formats but return as string for JSON compatibility
-                for fmt in ['%Y-%m-%d', '%d/%m/%Y', '%m/%d/%Y']:
-                    try:
-                        parsed_date = datetime.strptime(value, fmt)
-                        return parsed_date.strftime('%Y-%m-%d')
-                    except ValueError:
-                        continue
-                raise ValueError(f"Cannot parse date: {value}")
+                # Column format first, then the usual ones; returned as string for JSON compatibility
+                try:
+                    return get_date_parser(date_format).to_iso(value)
+                except ValueError:
+                    raise ValueError(f"Cannot parse date: {value}")
             else:
                 raise ValueError(f"Unsupported data type: {data_type}")
         except Exception as e:
@@ -0,0 +1,175 @@
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import numpy as np
+from query.predicates import compile_predicate, literal_converter
+
+# Los enteros se comparan como float64: exactos solo hasta 2**53
+MAX_EXACT_INT = 2 ** 53
+
+MaskFunction = Callable[[List[List[Any]]], np.ndarray]
+
+# Kind of NumPy array each column type is evaluated as
+COLUMN_KINDS = {"INT": "int", "FLOAT": "float", "DATE": "date", "VARCHAR": "text"}
+
+
+class NotVectorizable(Exception):
+    """A batch holds values the NumPy arrays cannot represent exactly"""
+
+
+class ColumnBatch:
+    """Columns of a batch of rows as NumPy arrays plus NULL masks, built on first use"""
+
+    def __init__(self, rows: List[List[Any]], kinds: Dict[int, str]):
+        self.rows = rows
+        self.kinds = kinds
+        self._arrays: Dict[int, Tuple[np.ndarray, np.ndarray]] = {}
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def column(self, i: int) -> Tuple[np.ndarray, np.ndarray]:
+        if i not in self._arrays:
+            self._arrays[i] = self._build(i)
+        return self._arrays[i]
+
+    def _build(self, i: int) -> Tuple[np.ndarray, np.ndarray]:
+        values = [row[i] for row in self.rows]
+        kind = self.kinds[i]
+        try:
+            if kind in ("int", "float"):
+                # None becomes NaN
+                array = np.array(values, dtype=np.float64)
+                nulls = np.isnan(array)
+                if kind == "int" and np.abs(np.where(nulls, 0, array)).max(initial=0) >= MAX_EXACT_INT:
+                    raise NotVectorizable("integer beyond float64 precision")
+                return array, nulls
+            if kind == "date":
+                # None becomes NaT
+                array = np.array(values, dtype="datetime64[D]")
+                return array, np.isnat(array)
+        except (TypeError, ValueError) as e:
+            raise NotVectorizable(str(e))
+        array = np.array(values, dtype=object)
+        nulls = np.equal(array, None)
+        # Los NULL se rellenan para que las comparaciones de orden no fallen; se descartan con nulls
+        return np.where(nulls, "", array), nulls
+
+
+def compile_batch_predicate(conditions: List[Dict[str, Any]], columns: List[Dict[str, Any]]) -> Optional[MaskFunction]:
+    """Compile WHERE conditions into a function of a batch of rows returning a boolean mask.
+
+    Comparisons, BETWEEN and IN are NumPy operations over one column of the
+    batch; AND and OR combine the masks. The result is the same as the row
+    predicate of compile_predicate, which is used instead for batches whose
+    values cannot be put in an array exactly. Returns None when a condition
+    cannot be vectorized at all (ARRAY columns).
+    """
+    row_predicate = compile_predicate(conditions, columns)
+    if not conditions:
+        return None
+    names = [col["name"] for col in columns]
+    kinds: Dict[int, str] = {}
+    groups: List[List[Callable[[ColumnBatch], np.ndarray]]] = []
+    group = []
+    for condition in conditions:
+        i = names.index(condition["column"])
+        column = columns[i]
+        kind = COLUMN_KINDS.get(column["data_type"])
+        test = _compile_mask(i, kind, condition, literal_converter(column["data_type"], column.get("date_format")))
+        if test is None:
+            return None
+        kinds[i] = kind
+        group.append(test)
+        if condition.get("logical_op") != "AND":
+            groups.append(group)
+            group = []
+
+    def mask_of(rows: List[List[Any]]) -> np.ndarray:
+        batch = ColumnBatch(rows, kinds)
+        try:
+            result = None
+            for tests in groups:
+                mask = tests[0](batch)
+                for test in tests[1:]:
+                    mask = mask & test(batch)
+                result = mask if result is None else result | mask
+            return result
+        except NotVectorizable:
+            return np.fromiter((row_predicate(row) for row in rows), dtype=bool, count=len(rows))
+
+    return mask_of
+
+
+def _compile_mask(i: int, kind: Optional[str], condition: Dict[str, Any],
+                  convert: Callable[[Any], Any]) -> Optional[Callable[[ColumnBatch], np.ndarray]]:
+    if kind is None:
+        return None
+    operator, value = condition["operator"], condition["value"]
+    if operator in ("NOT IN", "NOT BETWEEN"):
+        test = _compile_mask(i, kind, dict(condition, operator=operator[len("NOT "):]), convert)
+        if test is None:
+            return None
+
+        def negated(batch: ColumnBatch) -> np.ndarray:
+            # NULL no satisface ni IN ni NOT IN
+            return ~batch.column(i)[1] & ~test(batch)
+        return negated
+
+    if operator in ("=", "!=") and value is None:
+        if operator == "=":
+            return lambda batch: batch.column(i)[1].copy()
+        return lambda batch: ~batch.column(i)[1]
+    if value is None:
+        return lambda batch: np.zeros(len(batch), dtype=bool)
+
+    literal = _array_literal(kind, convert)
+    if literal is None:
+        return None
+    try:
+        if operator == "IN":
+            values = [literal(v) for v in value if v is not None]
+        elif operator == "BETWEEN":
+            low, high = literal(value[0]), literal(value[1])
+        else:
+            operand = literal(value)
+    except NotVectorizable:
+        return None
+
+    if operator == "IN":
+        def test(batch):
+            array, nulls = batch.column(i)
+            return np.isin(array, values) & ~nulls
+    elif operator == "BETWEEN":
+        def test(batch):
+            array, nulls = batch.column(i)
+            return (array >= low) & (array <= high) & ~nulls
+    elif operator == "=":
+        def test(batch):
+            array, nulls = batch.column(i)
+            return (array == operand) & ~nulls
+    elif operator == "!=":
+        def test(batch):
+            array, nulls = batch.column(i)
+            return (array != operand) & ~nulls
+    elif operator in ("<", "<=", ">", ">="):
+        compare = {"<": np.less, "<=": np.less_equal, ">": np.greater, ">=": np.greater_equal}[operator]
+
+        def test(batch):
+            array, nulls = batch.column(i)
+            return compare(array, operand) & ~nulls
+    else:
+        return None
+    return test
+
+
+def _array_literal(kind: str, convert: Callable[[Any], Any]) -> Optional[Callable[[Any], Any]]:
+    """Conversion of a literal to the scalar type of the column arrays"""
+    if kind in ("int", "float"):
+        def number(value):
+            value = convert(value)
+            if kind == "int" and abs(value) >= MAX_EXACT_INT:
+                raise NotVectorizable("literal beyond float64 precision")
+            return float(value)
+        return number
+    if kind == "date":
+        return lambda value: np.datetime64(convert(value), "D")
+    return convert
@@ -0,0 +1,186 @@
+import itertools
+import os
+from typing import Any, Dict, Iterable, Iterator, List
+
+import pyarrow as pa
+import pyarrow.ipc as ipc
+import pyarrow.parquet as pq
+
+from api.schemas import ColumnDefinition, DataType
+
+# Parquet and Arrow IPC (file or stream format) inputs
+PARQUET_EXTENSIONS = ('.parquet',)
+IPC_EXTENSIONS = ('.arrow', '.feather', '.ipc')
+ARROW_EXTENSIONS = PARQUET_EXTENSIONS + IPC_EXTENSIONS
+
+# Arrow type of each column type on export
+ARROW_TYPES = {
+    DataType.INT: pa.int64(),
+    DataType.FLOAT: pa.float64(),
+    DataType.DATE: pa.date32(),
+    DataType.VARCHAR: pa.string(),
+    DataType.ARRAY_FLOAT: pa.list_(pa.float64()),
+}
+
+
+def data_type_for(arrow_type: pa.DataType) -> DataType:
+    """Column type that holds the values of an Arrow type"""
+    if pa.types.is_dictionary(arrow_type):
+        return data_type_for(arrow_type.value_type)
+    if pa.types.is_integer(arrow_type) or pa.types.is_boolean(arrow_type):
+        return DataType.INT
+    if pa.types.is_floating(arrow_type) or pa.types.is_decimal(arrow_type):
+        return DataType.FLOAT
+    if pa.types.is_date(arrow_type) or pa.types.is_timestamp(arrow_type):
+        return DataType.DATE
+    if pa.types.is_string(arrow_type) or pa.types.is_large_string(arrow_type):
+        return DataType.VARCHAR
+    if (pa.types.is_list(arrow_type) or pa.types.is_large_list(arrow_type) or pa.types.is_fixed_size_list(arrow_type)) \
+            and (pa.types.is_integer(arrow_type.value_type) or pa.types.is_floating(arrow_type.value_type)):
+        return DataType.ARRAY_FLOAT
+    raise ValueError(f"Unsupported Arrow type: {arrow_type}")
+
+
+def read_schema(file_path: str) -> pa.Schema:
+    if _is_parquet(file_path):
+        return pq.read_schema(file_path)
+    with pa.memory_map(file_path) as source:
+        return _open_ipc(source).schema
+
+
+def infer_columns(file_path: str) -> List[ColumnDefinition]:
+    """Column definitions taken from the schema of a Parquet or Arrow file"""
+    return [ColumnDefinition(name=field.name.lower(), data_type=data_type_for(field.type))
+            for field in read_schema(file_path)]
+
+
+def iter_arrow_rows(file_path: str, columns: List[ColumnDefinition], batch_size: int) -> Iterator[List[Any]]:
+    """Rows of a Parquet or Arrow file converted column by column, without text parsing.
+
+    File columns are matched to the table columns by name; the others are not read.
+    """
+    fields = {name.lower(): name for name in read_schema(file_path).names}
+    missing = [col.name for col in columns if col.name.lower() not in fields]
+    if missing:
+        raise ValueError(f"Columns {missing} not found in {os.path.basename(file_path)}")
+    names = [fields[col.name.lower()] for col in columns]
+
+    first_row = 1
+    for batch in _iter_record_batches(file_path, names, batch_size):
+        values = [_column_values(batch.column(name), col, i, first_row)
+                  for i, (name, col) in enumerate(zip(names, columns))]
+        yield from (list(row) for row in zip(*values))
+        first_row += batch.num_rows
+
+
+def _is_parquet(file_path: str) -> bool:
+    return os.path.splitext(file_path)[1].lower() in PARQUET_EXTENSIONS
+
+
+def _open_ipc(source):
+    # Formato archivo (con footer) o formato stream
+    try:
+        return ipc.open_file(source)
+    except pa.ArrowInvalid:
+        source.seek(0)
+        return ipc.open_stream(source)
+
+
+def _iter_record_batches(file_path: str, names: List[str], batch_size: int) -> Iterator[pa.RecordBatch]:
+    if _is_parquet(file_path):
+        yield from pq.ParquetFile(file_path).iter_batches(batch_size=batch_size, columns=names)
+        return
+    with pa.memory_map(file_path) as source:
+        reader = _open_ipc(source)
+        if isinstance(reader, ipc.RecordBatchFileReader):
+            batches = (reader.get_batch(i) for i in range(reader.num_record_batches))
+        else:
+            batches = iter(reader)
+        for batch in batches:
+            batch = batch.select(names)
+            for offset in range(0, batch.num_rows, batch_size):
+                yield batch.slice(offset, batch_size)
+
+
+def _column_values(array: pa.Array, column: ColumnDefinition, position: int, first_row: int) -> List[Any]:
+    """Python values of an Arrow column in the form the table stores them"""
+    if pa.types.is_dictionary(array.type):
+        array = array.dictionary_decode()
+    try:
+        if column.data_type == DataType.DATE:
+            # Stored as YYYY-MM-DD text
+            return array.cast(pa.date32(), safe=False).cast(pa.string()).to_pylist()
+        array = array.cast(ARROW_TYPES[column.data_type])
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError) as e:
+        raise ValueError(f"Column {position + 1} ({column.name}): cannot convert {array.type} "
+                         f"to {column.data_type.value}: {str(e)}")
+    values = array.to_pylist()
+    if column.data_type == DataType.VARCHAR and column.size:
+        for row_index, value in enumerate(values):
+            if value is not None and len(value) > column.size:
+                raise ValueError(f"Row {first_row + row_index}, Column {position + 1} ({column.name}): "
+                                 f"String too long: maximum {column.size} characters")
+    return values
+
+
+def table_schema(columns: List[Dict[str, Any]]) -> pa.Schema:
+    """Arrow schema of table columns given as catalog metadata"""
+    return pa.schema([(col["name"], ARROW_TYPES[DataType(col["data_type"])]) for col in columns])
+
+
+def record_batches(rows: Iterable[List[Any]], schema: pa.Schema, batch_size: int) -> Iterator[pa.RecordBatch]:
+    """Group table rows into record batches of at most batch_size rows"""
+    rows = iter(rows)
+    while True:
+        chunk = list(itertools.islice(rows, batch_size))
+        if not chunk:
+            return
+        arrays = []
+        for i, field in enumerate(schema):
+            values = [row[i] for row in chunk]
+            if pa.types.is_date(field.type):
+                arrays.append(pa.array(values, pa.string()).cast(field.type))
+            else:
+                arrays.append(pa.array(values, field.type))
+        yield pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+class _ChunkSink:
+    """Write-only file that hands out what has been written since the last take()"""
+
+    def __init__(self):
+        self.chunks: List[bytes] = []
+        self.closed = False
+
+    def write(self, data) -> int:
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def take(self) -> bytes:
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def write_batches(schema: pa.Schema, batches: Iterable[pa.RecordBatch], file_format: str) -> Iterator[bytes]:
+    """Serialize record batches as an Arrow IPC stream or a Parquet file.
+
+    The bytes are yielded as each batch is written, so the whole result is
+    never held in memory (Parquet writes one row group per batch).
+    """
+    sink = _ChunkSink()
+    output = pa.PythonFile(sink, mode='w')
+    writer = pq.ParquetWriter(output, schema) if file_format == "parquet" else ipc.new_stream(output, schema)
+    with writer:
+        for batch in batches:
+            writer.write_batch(batch)
+            chunk = sink.take()
+            if chunk:
+                yield chunk
+    yield sink.take()
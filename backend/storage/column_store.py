@@ -0,0 +1,336 @@
+import os
+import json
+import shutil
+from array import array
+from datetime import date, datetime
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Set
+from api.schemas import CompressionType, DataType
+
+# Typecodes of the fixed-width column files (little-endian on every supported platform).
+# They can be loaded directly with numpy.fromfile(path, dtype='<i8' / '<f8').
+FIXED_TYPECODES = {
+    DataType.INT: 'q',
+    DataType.FLOAT: 'd',
+    DataType.DATE: 'q',  # days since 1970-01-01
+}
+
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+# Dictionary-encoded VARCHAR columns store uint32 codes into <column>.dict
+DICTIONARY_TYPECODE = 'I'
+# A VARCHAR column is dictionary-encoded when it has at most this many distinct
+# values and each value repeats DICTIONARY_MIN_REPEAT times on average
+DICTIONARY_MAX_VALUES = 65536
+DICTIONARY_MIN_REPEAT = 4
+
+
+def date_to_days(value: Any) -> int:
+    if isinstance(value, datetime):
+        value = value.date()
+    if not isinstance(value, date):
+        value = date.fromisoformat(str(value)[:10])
+    return value.toordinal() - EPOCH_ORDINAL
+
+
+def days_to_date(days: int) -> str:
+    return date.fromordinal(days + EPOCH_ORDINAL).isoformat()
+
+
+class ColumnStore:
+    """Columnar table storage: one directory per table, one file set per column.
+
+    - INT/FLOAT/DATE: ``<column>.col`` with one contiguous 8-byte value per row
+    - VARCHAR: ``<column>.off`` (row start offsets, uint64) + ``<column>.col`` (utf-8 bytes)
+    - ARRAY[FLOAT]: ``<column>.off`` (offsets in floats) + ``<column>.col`` (float64 values)
+    - every column: ``<column>.nul`` with one validity byte per row (0 = NULL)
+
+    With compression enabled, low-cardinality VARCHAR columns are stored as
+    ``<column>.dict`` (JSON list of distinct values) + ``<column>.col`` with one
+    uint32 code per row, which keeps them fixed-width and seekable.
+
+    Readers only open the files of the columns they ask for.
+    """
+
+    def __init__(self, directory: str, columns: List[Dict[str, Any]],
+                 compression: CompressionType = CompressionType.NONE):
+        self.directory = directory
+        self.columns = columns
+        self.column_names = [col["name"] for col in columns]
+        self.data_types = [DataType(col["data_type"]) for col in columns]
+        self.compression = CompressionType(compression)
+        self._dictionaries: Dict[int, List[str]] = {}
+
+    def _path(self, column_index: int, suffix: str) -> str:
+        return os.path.join(self.directory, f"{self.column_names[column_index]}.{suffix}")
+
+    @property
+    def row_count(self) -> int:
+        if not self.columns or not os.path.exists(self._path(0, "nul")):
+            return 0
+        return os.path.getsize(self._path(0, "nul"))
+
+    async def create(self, dictionary_columns: Optional[Set[int]] = None):
+        """Create (or truncate) the column files"""
+        if os.path.isdir(self.directory):
+            shutil.rmtree(self.directory)
+        os.makedirs(self.directory, exist_ok=True)
+        self._dictionaries = {}
+        for i, data_type in enumerate(self.data_types):
+            open(self._path(i, "nul"), 'wb').close()
+            open(self._path(i, "col"), 'wb').close()
+            if dictionary_columns and i in dictionary_columns:
+                self._save_dictionary(i, [])
+            elif data_type not in FIXED_TYPECODES:
+                with open(self._path(i, "off"), 'wb') as f:
+                    f.write(array('Q', [0]).tobytes())
+
+    async def write_all(self, rows: List[List[Any]]) -> List[int]:
+        """Replace the whole content of the table with rows"""
+        await self.create(self._choose_dictionary_columns(rows))
+        return await self.append_rows(rows)
+
+    async def write_batches(self, batches: AsyncIterator[List[List[Any]]]) -> int:
+        """Replace the content of the table with streamed rows, appending one batch at a time.
+
+        Dictionary columns are chosen from the first batch. Returns the number of rows written.
+        """
+        created = False
+        async for rows in batches:
+            if not created:
+                await self.create(self._choose_dictionary_columns(rows))
+                created = True
+            await self.append_rows(rows)
+        if not created:
+            await self.create()
+        return self.row_count
+
+    def _choose_dictionary_columns(self, rows: List[List[Any]]) -> Set[int]:
+        if self.compression == CompressionType.NONE or not rows:
+            return set()
+        chosen = set()
+        for i, data_type in enumerate(self.data_types):
+            if data_type != DataType.VARCHAR:
+                continue
+            distinct = {row[i] for row in rows if row[i] is not None}
+            if len(distinct) <= DICTIONARY_MAX_VALUES and len(distinct) * DICTIONARY_MIN_REPEAT <= len(rows):
+                chosen.add(i)
+        return chosen
+
+    def is_dictionary_encoded(self, column_index: int) -> bool:
+        return os.path.exists(self._path(column_index, "dict"))
+
+    def _dictionary(self, column_index: int) -> List[str]:
+        if column_index not in self._dictionaries:
+            with open(self._path(column_index, "dict"), 'r', encoding='utf-8') as f:
+                self._dictionaries[column_index] = json.load(f)
+        return self._dictionaries[column_index]
+
+    def _save_dictionary(self, column_index: int, values: List[str]):
+        temp_path = self._path(column_index, "dict.tmp")
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(values, f, ensure_ascii=False)
+        os.replace(temp_path, self._path(column_index, "dict"))
+        self._dictionaries[column_index] = values
+
+    def _encode_dictionary(self, column_index: int, values: List[Any]) -> bytes:
+        dictionary = self._dictionary(column_index)
+        codes = {value: code for code, value in enumerate(dictionary)}
+        size = len(dictionary)
+        encoded = array(DICTIONARY_TYPECODE)
+        for value in values:
+            if value is None:
+                encoded.append(0)
+                continue
+            value = str(value)
+            if value not in codes:
+                codes[value] = len(dictionary)
+                dictionary.append(value)
+            encoded.append(codes[value])
+        if len(dictionary) != size:
+            self._save_dictionary(column_index, dictionary)
+        return encoded.tobytes()
+
+    def _decode_dictionary(self, column_index: int, payload: bytes, validity: bytes) -> List[Any]:
+        dictionary = self._dictionary(column_index)
+        codes = array(DICTIONARY_TYPECODE)
+        codes.frombytes(payload)
+        return [dictionary[code] if valid else None for code, valid in zip(codes, validity)]
+
+    async def append_rows(self, rows: List[List[Any]]) -> List[int]:
+        """Append rows to the end of every column file. Returns the row numbers"""
+        if not os.path.isdir(self.directory):
+            await self.create()
+        first_row = self.row_count
+        for i, data_type in enumerate(self.data_types):
+            self._append_column(i, data_type, [row[i] for row in rows])
+        return list(range(first_row, first_row + len(rows)))
+
+    def row_positions(self, row_ids: List[int]) -> List[int]:
+        """Row positions of the ids returned by append_rows: row numbers already are positions"""
+        return list(row_ids)
+
+    def _append_column(self, column_index: int, data_type: DataType, values: List[Any]):
+        validity = bytes(0 if value is None else 1 for value in values)
+
+        if self.is_dictionary_encoded(column_index):
+            payload = self._encode_dictionary(column_index, values)
+            offsets = None
+        elif data_type in FIXED_TYPECODES:
+            if data_type == DataType.DATE:
+                converted = [0 if value is None else date_to_days(value) for value in values]
+            elif data_type == DataType.INT:
+                converted = [0 if value is None else int(value) for value in values]
+            else:
+                converted = [0.0 if value is None else float(value) for value in values]
+            payload = array(FIXED_TYPECODES[data_type], converted).tobytes()
+            offsets = None
+        else:
+            with open(self._path(column_index, "off"), 'rb') as f:
+                f.seek(-8, os.SEEK_END)
+                end = array('Q', f.read(8))[0]
+            if data_type == DataType.VARCHAR:
+                chunks = [b'' if value is None else str(value).encode('utf-8') for value in values]
+                payload = b''.join(chunks)
+                sizes = [len(chunk) for chunk in chunks]
+            else:
+                vectors = [[] if value is None else [float(x) for x in value] for value in values]
+                payload = array('d', [x for vector in vectors for x in vector]).tobytes()
+                sizes = [len(vector) for vector in vectors]
+            offsets = array('Q')
+            for size in sizes:
+                end += size
+                offsets.append(end)
+
+        with open(self._path(column_index, "col"), 'ab') as f:
+            f.write(payload)
+        if offsets is not None:
+            with open(self._path(column_index, "off"), 'ab') as f:
+                f.write(offsets.tobytes())
+        with open(self._path(column_index, "nul"), 'ab') as f:
+            f.write(validity)
+
+    def read_column(self, column_index: int) -> List[Any]:
+        """Read every value of one column, touching only that column's files"""
+        data_type = self.data_types[column_index]
+        with open(self._path(column_index, "nul"), 'rb') as f:
+            validity = f.read()
+        with open(self._path(column_index, "col"), 'rb') as f:
+            payload = f.read()
+
+        if self.is_dictionary_encoded(column_index):
+            return self._decode_dictionary(column_index, payload, validity)
+        if data_type in FIXED_TYPECODES:
+            values = array(FIXED_TYPECODES[data_type])
+            values.frombytes(payload)
+            if data_type == DataType.DATE:
+                return [days_to_date(v) if valid else None for v, valid in zip(values, validity)]
+            return [v if valid else None for v, valid in zip(values.tolist(), validity)]
+
+        offsets = array('Q')
+        with open(self._path(column_index, "off"), 'rb') as f:
+            offsets.frombytes(f.read())
+        if data_type == DataType.VARCHAR:
+            return [
+                payload[offsets[i]:offsets[i + 1]].decode('utf-8') if validity[i] else None
+                for i in range(len(validity))
+            ]
+        floats = array('d')
+        floats.frombytes(payload)
+        return [
+            floats[offsets[i]:offsets[i + 1]].tolist() if validity[i] else None
+            for i in range(len(validity))
+        ]
+
+    def read_column_range(self, column_index: int, start: int, count: int) -> List[Any]:
+        """Read values [start, start + count) of one column by seeking, not scanning"""
+        data_type = self.data_types[column_index]
+        stop = min(start + count, self.row_count)
+        if start >= stop:
+            return []
+        with open(self._path(column_index, "nul"), 'rb') as f:
+            f.seek(start)
+            validity = f.read(stop - start)
+
+        if self.is_dictionary_encoded(column_index):
+            item_size = array(DICTIONARY_TYPECODE).itemsize
+            with open(self._path(column_index, "col"), 'rb') as f:
+                f.seek(start * item_size)
+                payload = f.read((stop - start) * item_size)
+            return self._decode_dictionary(column_index, payload, validity)
+        if data_type in FIXED_TYPECODES:
+            values = array(FIXED_TYPECODES[data_type])
+            with open(self._path(column_index, "col"), 'rb') as f:
+                f.seek(start * values.itemsize)
+                values.frombytes(f.read((stop - start) * values.itemsize))
+            if data_type == DataType.DATE:
+                return [days_to_date(v) if valid else None for v, valid in zip(values, validity)]
+            return [v if valid else None for v, valid in zip(values.tolist(), validity)]
+
+        offsets = array('Q')
+        with open(self._path(column_index, "off"), 'rb') as f:
+            f.seek(start * offsets.itemsize)
+            offsets.frombytes(f.read((stop - start + 1) * offsets.itemsize))
+        item_size = 1 if data_type == DataType.VARCHAR else 8
+        with open(self._path(column_index, "col"), 'rb') as f:
+            f.seek(offsets[0] * item_size)
+            payload = f.read((offsets[-1] - offsets[0]) * item_size)
+
+        values = []
+        for i, valid in enumerate(validity):
+            begin, end = (offsets[i] - offsets[0]) * item_size, (offsets[i + 1] - offsets[0]) * item_size
+            if not valid:
+                values.append(None)
+            elif data_type == DataType.VARCHAR:
+                values.append(payload[begin:end].decode('utf-8'))
+            else:
+                floats = array('d')
+                floats.frombytes(payload[begin:end])
+                values.append(floats.tolist())
+        return values
+
+    def read_rows(self, start: int, count: int) -> List[List[Any]]:
+        """Read full rows [start, start + count) seeking into every column file"""
+        columns = [self.read_column_range(i, start, count) for i in range(len(self.columns))]
+        return [list(row) for row in zip(*columns)]
+
+    def read_rows_at(self, positions: List[int], column_indices: Optional[List[int]] = None) -> List[List[Any]]:
+        """Full-width rows at sorted positions; columns outside column_indices are left as None.
+
+        Each run of consecutive positions is read with one seek per column file.
+        """
+        if column_indices is None:
+            column_indices = list(range(len(self.columns)))
+        row_count = self.row_count
+        runs: List[List[int]] = []
+        for position in positions:
+            if position >= row_count:
+                break
+            if runs and runs[-1][0] + runs[-1][1] == position:
+                runs[-1][1] += 1
+            else:
+                runs.append([position, 1])
+        width = len(self.columns)
+        rows = []
+        for start, count in runs:
+            run_rows = [[None] * width for _ in range(count)]
+            for i in sorted(set(column_indices)):
+                for row, value in zip(run_rows, self.read_column_range(i, start, count)):
+                    row[i] = value
+            rows.extend(run_rows)
+        return rows
+
+    async def read_all(self, column_indices: Optional[List[int]] = None) -> List[List[Any]]:
+        """Return full-width rows; columns outside column_indices are left as None"""
+        return list(self.iter_rows(column_indices))
+
+    def iter_rows(self, column_indices: Optional[List[int]] = None) -> Iterator[List[Any]]:
+        if column_indices is None:
+            column_indices = list(range(len(self.columns)))
+        row_count = self.row_count
+        column_values = {i: self.read_column(i) for i in sorted(set(column_indices))}
+        width = len(self.columns)
+        for row_number in range(row_count):
+            row = [None] * width
+            for i, values in column_values.items():
+                row[i] = values[row_number]
+            yield row
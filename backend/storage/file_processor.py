@@ -1,11 +1,63 @@
+import asyncio
 import csv
+import io
+import itertools
 import os
 import json
+import numpy as np
 import pandas as pd
-from typing import List, Any, Dict
-from datetime import datetime
+from typing import List, Any, AsyncIterator, Dict, Iterable, Iterator, Optional, Tuple
 from api.schemas import ColumnDefinition, DataType
+from storage.arrow_io import ARROW_EXTENSIONS, infer_columns, iter_arrow_rows
+from utils.date_formats import DETECTION_SAMPLE_SIZE, ISO_DATE, detect_date_format, get_date_parser
 import aiofiles
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+# Bytes read from the input file at a time and rows converted per batch
+READ_CHUNK_BYTES = 1024 * 1024
+BATCH_ROWS = 10000
+# Newline-delimited JSON, one row per line
+NDJSON_EXTENSIONS = ('.ndjson', '.jsonl')
+
+
+class RowError(ValueError):
+    """Conversion error tied to a row (or line) number of the input file"""
+
+    def __init__(self, label: str, row_num: int, detail: str):
+        super().__init__(label, row_num, detail)
+        self.label = label
+        self.row_num = row_num
+        self.detail = detail
+
+    def __str__(self) -> str:
+        return f"{self.label} {self.row_num}{self.detail}"
+
+    def shifted(self, lines: int) -> "RowError":
+        return RowError(self.label, self.row_num + lines, self.detail)
+
+
+def convert_chunk(file_path: str, start: int, end: int, file_ext: str,
+                  columns: List[ColumnDefinition]) -> Tuple[List[List[Any]], int]:
+    """Convert the lines in bytes [start, end) of a file. Runs in a worker process.
+
+    Returns the rows and the number of lines of the chunk; row numbers in
+    errors are relative to the start of the chunk.
+    """
+    with open(file_path, 'rb') as f:
+        f.seek(start)
+        text = f.read(end - start).decode('utf-8')
+    line_count = text.count('\n') + (0 if text.endswith('\n') else 1)
+    processor = FileProcessor()
+    lines = io.StringIO(text, newline='')
+    if file_ext == '.csv':
+        rows = list(processor._iter_csv_lines(lines, columns, first_row=1))
+        if len(rows) != line_count:
+            # Solo pasa con saltos de línea dentro de campos entre comillas
+            raise ValueError("Quoted fields with line breaks cannot be split across workers; set INGEST_WORKERS=1")
+    else:
+        rows = list(processor._iter_txt_lines(lines, columns, first_line=1, skip_header=False))
+    return rows, line_count
 
 
 class FileProcessor:
@@ -17,19 +69,89 @@ class FileProcessor:
             DataType.VARCHAR: self._validate_varchar,
             DataType.ARRAY_FLOAT: self._validate_array_float
         }
+        self.ingest_workers = int(os.getenv("INGEST_WORKERS", str(os.cpu_count() or 1)))
+        self.parallel_min_bytes = int(os.getenv("PARALLEL_INGEST_MIN_MB", "32")) * 1024 * 1024
+        self.chunk_bytes = int(os.getenv("INGEST_CHUNK_MB", "8")) * 1024 * 1024
     
     async def process_file(self, file_path: str, columns: List[ColumnDefinition], has_headers: bool = True) -> List[List[Any]]:
+        """Convert the whole file into a list of rows"""
+        rows = []
+        async for batch in self.iter_batches(file_path, columns, has_headers):
+            rows.extend(batch)
+        return rows
+
+    async def iter_batches(self, file_path: str, columns: List[ColumnDefinition], has_headers: bool = True,
+                           batch_size: int = BATCH_ROWS) -> AsyncIterator[List[List[Any]]]:
+        """Stream the converted rows of a file in batches of at most batch_size rows.
+
+        The file is read in chunks and each batch is parsed and converted in a
+        worker thread while the caller writes the previous one, so memory use
+        depends on the batch size and not on the size of the file. Large CSV
+        and TXT files are split at line boundaries and converted by a pool of
+        INGEST_WORKERS processes instead.
+        """
+        self._detect_date_formats(file_path, columns, has_headers)
+        workers = self._parallel_workers(file_path)
+        if workers:
+            async for batch in self._iter_parallel_batches(file_path, columns, has_headers, batch_size, workers):
+                yield batch
+            return
+
+        rows = self._iter_rows(file_path, columns, has_headers)
+        try:
+            while True:
+                batch = await asyncio.to_thread(self._next_batch, rows, batch_size)
+                if not batch:
+                    break
+                yield batch
+        finally:
+            rows.close()
+
+    def infer_columns(self, file_path: str) -> List[ColumnDefinition]:
+        """Column definitions of a file that carries its own schema (Parquet, Arrow)"""
+        if os.path.splitext(file_path)[1].lower() not in ARROW_EXTENSIONS:
+            raise ValueError("Columns must be given for CSV, TXT, DAT and NDJSON files")
+        return infer_columns(file_path)
+
+    def _detect_date_formats(self, file_path: str, columns: List[ColumnDefinition], has_headers: bool):
+        """Set date_format on the DATE columns that have none, from the first rows of the file"""
+        date_columns = [i for i, col in enumerate(columns) if col.data_type == DataType.DATE and not col.date_format]
+        if not date_columns:
+            return
+        sample = self._sample_raw_rows(file_path, columns, has_headers, DETECTION_SAMPLE_SIZE)
+        for i in date_columns:
+            columns[i].date_format = detect_date_format(row[i] for row in sample if len(row) == len(columns))
+
+    def _sample_raw_rows(self, file_path: str, columns: List[ColumnDefinition], has_headers: bool,
+                         count: int) -> List[List[str]]:
+        """First rows of a file as unconverted strings"""
         file_ext = os.path.splitext(file_path)[1].lower()
-        
-        if file_ext == '.csv':
-            return await self._process_csv(file_path, columns, has_headers)
-        elif file_ext == '.txt':
-            return await self._process_txt(file_path, columns, has_headers)
-        elif file_ext == '.dat':
-            return await self._process_dat(file_path, columns)
-        else:
-            raise ValueError(f"Unsupported file type: {file_ext}")
-        
+        with self._open_text(file_path) as f:
+            if file_ext == '.csv':
+                csv_reader = csv.reader(f)
+                if has_headers:
+                    next(csv_reader, None)
+                return list(itertools.islice(csv_reader, count))
+            if file_ext == '.txt':
+                lines = (line.strip() for line in f)
+                lines = itertools.islice((line for line in lines if line), int(has_headers), None)
+                return [[v.strip() for v in line.split(',')] for line in itertools.islice(lines, count)]
+            if file_ext in ('.dat',) + NDJSON_EXTENSIONS:
+                records = self._iter_json_array(f) if file_ext == '.dat' else self._iter_json_lines(f)
+                sample = []
+                try:
+                    for row in itertools.islice(records, count):
+                        values = [row.get(col.name) for col in columns] if isinstance(row, dict) else row
+                        if isinstance(values, list):
+                            sample.append(['' if value is None else str(value) for value in values])
+                except ValueError:
+                    pass  # el error se reporta al convertir
+                return sample
+        return []
+
+    @staticmethod
+    def _next_batch(rows: Iterator[List[Any]], batch_size: int) -> List[List[Any]]:
+        return list(itertools.islice(rows, batch_size))
 
 
     async def _load_table_data(self, file_path: str) -> List[List]:
@@ -70,134 +192,309 @@ class FileProcessor:
     
     
     
-    async def _process_csv(self, file_path: str, columns: List[ColumnDefinition], has_headers: bool = True) -> List[List[Any]]:
-        processed_data = []
-        
-        async with aiofiles.open(file_path, 'r', encoding='utf-8') as f:
-            content = await f.read()
-            
-        csv_reader = csv.reader(content.splitlines())
-        headers = next(csv_reader, None)
-        
-        if not headers:
-            raise ValueError("CSV file is empty or has no headers")
-        
-        for row_num, row in enumerate(csv_reader, start=2):
-            if len(row) != len(columns):
-                raise ValueError(f"Row {row_num}: Expected {len(columns)} columns, got {len(row)}")
-            
+    def _iter_rows(self, file_path: str, columns: List[ColumnDefinition], has_headers: bool = True) -> Iterator[List[Any]]:
+        file_ext = os.path.splitext(file_path)[1].lower()
+
+        if file_ext == '.csv':
+            return self._iter_csv(file_path, columns, has_headers)
+        elif file_ext == '.txt':
+            return self._iter_txt(file_path, columns, has_headers)
+        elif file_ext == '.dat':
+            return self._iter_dat(file_path, columns)
+        elif file_ext in NDJSON_EXTENSIONS:
+            return self._iter_ndjson(file_path, columns)
+        elif file_ext in ARROW_EXTENSIONS:
+            # Typed columns: no text parsing
+            return iter_arrow_rows(file_path, columns, BATCH_ROWS)
+        else:
+            raise ValueError(f"Unsupported file type: {file_ext}")
+
+    def _open_text(self, file_path: str):
+        # newline='' lets the csv module handle line breaks inside quoted fields
+        return open(file_path, 'r', encoding='utf-8', newline='', buffering=READ_CHUNK_BYTES)
+
+    def _iter_csv(self, file_path: str, columns: List[ColumnDefinition], has_headers: bool = True) -> Iterator[List[Any]]:
+        with self._open_text(file_path) as f:
+            if has_headers:
+                headers = next(csv.reader(f), None)
+                if not headers:
+                    raise ValueError("CSV file is empty or has no headers")
+
+            yield from self._iter_csv_lines(f, columns, first_row=2 if has_headers else 1)
+
+    def _iter_csv_lines(self, lines: Iterable[str], columns: List[ColumnDefinition], first_row: int) -> Iterator[List[Any]]:
+        csv_reader = csv.reader(lines)
+        while True:
+            raw_rows = list(itertools.islice(csv_reader, BATCH_ROWS))
+            if not raw_rows:
+                return
+            yield from self._convert_rows(raw_rows, columns, first_row)
+            first_row += len(raw_rows)
+
+    def _convert_rows(self, raw_rows: List[List[str]], columns: List[ColumnDefinition], first_row: int) -> List[List[Any]]:
+        """Convert a batch of parsed rows one column at a time with pandas.
+
+        Values the vectorized parsers reject are checked again one by one with
+        the scalar validators, which either accept them (other date formats,
+        "nan", ...) or raise the usual error; the error reported is the one of
+        the first offending row and column, as with row-by-row conversion.
+        """
+        bad_length = next((i for i, row in enumerate(raw_rows) if len(row) != len(columns)), None)
+        checked = raw_rows if bad_length is None else raw_rows[:bad_length]
+
+        converted = []
+        first_error = None  # (row index, column index, error)
+        if checked:
+            frame = pd.DataFrame(checked, dtype=object)
+            for i, column in enumerate(columns):
+                values, suspects = self._convert_column(frame[i], column)
+                for row_index in suspects:
+                    if first_error is not None and (row_index, i) > first_error[:2]:
+                        break
+                    try:
+                        values[row_index] = self._validate_and_convert(checked[row_index][i], column)
+                    except ValueError as e:
+                        first_error = (row_index, i, e)
+                        break
+                converted.append(values)
+
+        if first_error is not None:
+            row_index, i, e = first_error
+            raise RowError("Row", first_row + row_index, f", Column {i+1} ({columns[i].name}): {str(e)}")
+        if bad_length is not None:
+            raise RowError("Row", first_row + bad_length,
+                           f": Expected {len(columns)} columns, got {len(raw_rows[bad_length])}")
+        return [list(row) for row in zip(*converted)]
+
+    def _convert_column(self, text: pd.Series, column: ColumnDefinition) -> Tuple[List[Any], List[int]]:
+        """Typed values of a column of strings, and the rows the fast path could not convert"""
+        empty = (text.str.strip() == '').to_numpy()
+
+        if column.data_type == DataType.INT:
+            # Hasta 18 dígitos siempre cabe en int64
+            valid = text.str.fullmatch(r'\s*[+-]?\d{1,18}\s*').to_numpy()
+            values = pd.to_numeric(text.where(valid, '0').str.strip()).to_numpy().tolist()
+        elif column.data_type == DataType.FLOAT:
+            numbers = pd.to_numeric(text.where(~empty, '0'), errors='coerce')
+            valid = numbers.notna().to_numpy()
+            values = numbers.to_numpy(dtype=float).tolist()
+        elif column.data_type == DataType.DATE:
+            if column.date_format in (None, ISO_DATE):
+                # ISO dates are stored as written
+                iso = text.str.fullmatch(r'\d{4}-\d{2}-\d{2}')
+                valid = pd.to_datetime(text.where(iso), format=ISO_DATE, errors='coerce').notna().to_numpy()
+                values = text.tolist()
+            else:
+                parsed = pd.to_datetime(text.where(~empty), format=column.date_format, errors='coerce')
+                valid = parsed.notna().to_numpy()
+                values = parsed.dt.strftime(ISO_DATE).tolist()
+        elif column.data_type == DataType.VARCHAR:
+            valid = (text.str.len() <= column.size).to_numpy() if column.size else np.ones(len(text), dtype=bool)
+            values = text.tolist()
+        elif column.data_type == DataType.ARRAY_FLOAT:
+            values, valid = self._convert_array_column(text)
+        else:
+            raise ValueError(f"Unsupported data type: {column.data_type}")
+
+        for row_index in np.flatnonzero(empty):
+            values[row_index] = None
+        return values, np.flatnonzero(~valid & ~empty).tolist()
+
+    def _convert_array_column(self, text: pd.Series) -> Tuple[List[Any], np.ndarray]:
+        bracketed = text.str.startswith('[') & text.str.endswith(']')
+        parts = text.where(~bracketed, text.str[1:-1]).str.split(',').explode().str.strip()
+        parts = parts[parts != '']
+        numbers = pd.to_numeric(parts, errors='coerce')
+        valid = np.ones(len(text), dtype=bool)
+        valid[numbers.index[numbers.isna()].to_numpy(dtype=int)] = False
+        counts = np.bincount(numbers.index.to_numpy(dtype=int), minlength=len(text))
+        flat = numbers.to_numpy(dtype=float)
+        values = [vector.tolist() for vector in np.split(flat, np.cumsum(counts)[:-1])]
+        return values, valid
+
+    def _iter_txt(self, file_path: str, columns: List[ColumnDefinition], has_headers: bool = True) -> Iterator[List[Any]]:
+        with self._open_text(file_path) as f:
+            yield from self._iter_txt_lines(f, columns, first_line=1, skip_header=has_headers)
+
+    def _iter_txt_lines(self, lines: Iterable[str], columns: List[ColumnDefinition], first_line: int,
+                        skip_header: bool) -> Iterator[List[Any]]:
+        for line_num, line in enumerate(lines, start=first_line):
+            line = line.strip()
+
+            if not line:  # Skip empty lines
+                continue
+
+            # Skip first non-empty line if it has headers
+            if skip_header:
+                skip_header = False
+                continue
+
+            # Split by comma (CSV format)
+            values = [v.strip() for v in line.split(',')]
+
+            if len(values) != len(columns):
+                raise RowError("Line", line_num, f": Expected {len(columns)} columns, got {len(values)}")
+
             processed_row = []
-            for i, (value, column) in enumerate(zip(row, columns)):
+            for value, col in zip(values, columns):
                 try:
-                    validated_value = self._validate_and_convert(value, column)
-                    processed_row.append(validated_value)
-                except ValueError as e:
-                    raise ValueError(f"Row {row_num}, Column {i+1} ({column.name}): {str(e)}")
-            
-            processed_data.append(processed_row)
-        
-        return processed_data
-    
-    async def _process_txt(self, file_path: str, columns: List[ColumnDefinition], has_headers: bool = True) -> List[List]:
-        data = []
-        
-        print(f"=== PROCESSING TXT FILE ===")
-        print(f"File: {file_path}")
-        print(f"Has headers: {has_headers}")
-        print(f"Expected columns: {[(col.name, col.data_type) for col in columns]}")
-        
-        # Leer todo el contenido del archivo primero para debug
+                    processed_row.append(self._convert_value(value, col.data_type, col.date_format))
+                except Exception as e:
+                    raise RowError("Line", line_num, f", Column {col.name}: {str(e)}")
+            yield processed_row
+
+    def _parallel_workers(self, file_path: str) -> int:
+        """Worker processes to use for a file, or 0 to convert it in this process"""
+        file_ext = os.path.splitext(file_path)[1].lower()
+        if self.ingest_workers < 2 or file_ext not in ('.csv', '.txt'):
+            return 0
+        if os.path.getsize(file_path) < self.parallel_min_bytes:
+            return 0
+        return self.ingest_workers
+
+    def _data_start(self, file_path: str, has_headers: bool) -> Tuple[int, int]:
+        """Byte offset where the data lines of a file begin and how many lines come before it"""
+        file_ext = os.path.splitext(file_path)[1].lower()
+        with open(file_path, 'rb') as f:
+            if file_ext == '.csv':
+                if not has_headers:
+                    return 0, 0
+                if not f.readline().strip():
+                    raise ValueError("CSV file is empty or has no headers")
+                return f.tell(), 1
+            lines = 0
+            if has_headers:
+                # The header of a TXT file is its first non-empty line
+                for line in iter(f.readline, b''):
+                    lines += 1
+                    if line.strip():
+                        break
+            return f.tell(), lines
+
+    def _split_at_lines(self, file_path: str, start: int) -> List[Tuple[int, int]]:
+        """Byte ranges of about chunk_bytes each that begin and end on line boundaries"""
+        size = os.path.getsize(file_path)
+        ranges = []
+        with open(file_path, 'rb') as f:
+            while start < size:
+                f.seek(min(start + self.chunk_bytes, size))
+                f.readline()
+                end = min(f.tell(), size)
+                ranges.append((start, end))
+                start = end
+        return ranges
+
+    async def _iter_parallel_batches(self, file_path: str, columns: List[ColumnDefinition], has_headers: bool,
+                                     batch_size: int, workers: int) -> AsyncIterator[List[List[Any]]]:
+        """Convert line-aligned chunks of a file in worker processes and yield their rows in file order.
+
+        At most two chunks per worker are in flight, so memory stays bounded;
+        row numbers in errors are shifted by the lines of the chunks before.
+        """
+        file_ext = os.path.splitext(file_path)[1].lower()
+        start, lines_before = self._data_start(file_path, has_headers)
+        ranges = iter(self._split_at_lines(file_path, start))
+        loop = asyncio.get_running_loop()
+        pool = ProcessPoolExecutor(max_workers=workers)
+        pending = deque()
+
+        def submit_next():
+            chunk = next(ranges, None)
+            if chunk is not None:
+                pending.append(loop.run_in_executor(pool, convert_chunk, file_path, chunk[0], chunk[1], file_ext, columns))
+
+        try:
+            for _ in range(workers * 2):
+                submit_next()
+            while pending:
+                try:
+                    rows, line_count = await pending.popleft()
+                except RowError as e:
+                    raise e.shifted(lines_before) from None
+                submit_next()
+                lines_before += line_count
+                for i in range(0, len(rows), batch_size):
+                    yield rows[i:i + batch_size]
+        finally:
+            for future in pending:
+                future.cancel()
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def _iter_dat(self, file_path: str, columns: List[ColumnDefinition]) -> Iterator[List[Any]]:
+        # Assume DAT files hold a JSON array of rows (lists or objects)
         with open(file_path, 'r', encoding='utf-8') as f:
-            all_content = f.read()
-            print(f"File content:\n{all_content}")
-        
-        async with aiofiles.open(file_path, 'r', encoding='utf-8') as f:
-            line_num = 0
-            skip_first_line = has_headers
-            
-            async for line in f:
-                line_num += 1
-                original_line = line
-                line = line.strip()
-                
-                print(f"Line {line_num}: '{line}'")
-                
-                if not line:  # Skip empty lines
-                    print(f"  -> Skipping empty line")
-                    continue
-                
-                # Skip first non-empty line if it has headers
-                if skip_first_line:
-                    print(f"  -> Skipping header line: '{line}'")
-                    skip_first_line = False
-                    continue
-                    
-                # Split by comma (CSV format)
-                values = [v.strip() for v in line.split(',')]
-                print(f"  -> Split values: {values}")
-                
-                # Validate number of columns
-                if len(values) != len(columns):
-                    error_msg = f"Line {line_num}: Expected {len(columns)} columns, got {len(values)}"
-                    print(f"  -> ERROR: {error_msg}")
-                    raise ValueError(error_msg)
-                
-                # Type conversion
-                processed_row = []
-                for i, (value, col) in enumerate(zip(values, columns)):
-                    try:
-                        processed_value = self._convert_value(value, col.data_type)
-                        processed_row.append(processed_value)
-                        print(f"    Column '{col.name}': '{value}' -> {processed_value} ({type(processed_value)})")
-                    except Exception as e:
-                        error_msg = f"Line {line_num}, Column {col.name}: {str(e)}"
-                        print(f"    -> ERROR: {error_msg}")
-                        raise ValueError(error_msg)
-                
-                print(f"  -> Final processed row: {processed_row}")
-                data.append(processed_row)
-    
-        print(f"=== FINAL PROCESSED DATA ===")
-        print(f"Total rows processed: {len(data)}")
-        for i, row in enumerate(data):
-            print(f"  Final row {i}: {row}")
-        print(f"=== END PROCESSING ===")
-        
-        return data
-    
-    async def _process_dat(self, file_path: str, columns: List[ColumnDefinition]) -> List[List[Any]]:
-        # Assume DAT files are JSON format or binary format
-        async with aiofiles.open(file_path, 'r', encoding='utf-8') as f:
+            yield from self._iter_json_rows(self._iter_json_array(f), columns)
+
+    def _iter_ndjson(self, file_path: str, columns: List[ColumnDefinition]) -> Iterator[List[Any]]:
+        # One JSON row (list or object) per line
+        with open(file_path, 'r', encoding='utf-8', buffering=READ_CHUNK_BYTES) as f:
+            yield from self._iter_json_rows(self._iter_json_lines(f), columns)
+
+    def _iter_json_rows(self, records: Iterable[Any], columns: List[ColumnDefinition]) -> Iterator[List[Any]]:
+        first_row = 1
+        raw_rows = []
+        for row_num, row_data in enumerate(records, start=1):
+            if isinstance(row_data, list):
+                values = row_data
+            elif isinstance(row_data, dict):
+                values = [row_data.get(col.name, '') for col in columns]
+            else:
+                yield from self._convert_rows(raw_rows, columns, first_row)
+                raise ValueError(f"Unsupported data format in row {row_num}")
+            # JSON numbers and nulls go through the same validators as text
+            raw_rows.append(['' if value is None else str(value) for value in values])
+            if len(raw_rows) == BATCH_ROWS:
+                yield from self._convert_rows(raw_rows, columns, first_row)
+                first_row += len(raw_rows)
+                raw_rows = []
+        yield from self._convert_rows(raw_rows, columns, first_row)
+
+    def _iter_json_lines(self, f) -> Iterator[Any]:
+        """Yield the JSON value of each non-blank line"""
+        for line_num, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
             try:
-                content = await f.read()
-                data = json.loads(content)
-                
-                processed_data = []
-                for row_num, row_data in enumerate(data, start=1):
-                    if isinstance(row_data, list):
-                        values = row_data
-                    elif isinstance(row_data, dict):
-                        values = [row_data.get(col.name, '') for col in columns]
-                    else:
-                        raise ValueError(f"Unsupported data format in row {row_num}")
-                    
-                    if len(values) != len(columns):
-                        raise ValueError(f"Row {row_num}: Expected {len(columns)} values, got {len(values)}")
-                    
-                    processed_row = []
-                    for i, (value, column) in enumerate(zip(values, columns)):
-                        try:
-                            validated_value = self._validate_and_convert(value, column)
-                            processed_row.append(validated_value)
-                        except ValueError as e:
-                            raise ValueError(f"Row {row_num}, Column {i+1} ({column.name}): {str(e)}")
-                    
-                    processed_data.append(processed_row)
-                
-                return processed_data
-            except json.JSONDecodeError:
+                yield json.loads(line)
+            except json.JSONDecodeError as e:
+                raise RowError("Line", line_num, f": Invalid JSON ({e.msg})")
+
+    def _iter_json_array(self, f) -> Iterator[Any]:
+        """Yield the elements of a top-level JSON array, decoding the file chunk by chunk"""
+        decoder = json.JSONDecoder()
+        buffer = ""
+        position = 0
+        started = False
+        at_eof = False
+        while True:
+            while position < len(buffer) and buffer[position] in " \t\r\n,":
+                position += 1
+            if position < len(buffer):
+                if not started:
+                    if buffer[position] != '[':
+                        raise ValueError("Invalid JSON format in DAT file")
+                    started = True
+                    position += 1
+                    continue
+                if buffer[position] == ']':
+                    return
+                try:
+                    value, end = decoder.raw_decode(buffer, position)
+                    # A number that ends the buffer may continue in the next chunk
+                    if end < len(buffer) or at_eof:
+                        yield value
+                        position = end
+                        continue
+                except json.JSONDecodeError:
+                    if at_eof:
+                        raise ValueError("Invalid JSON format in DAT file")
+            elif at_eof:
                 raise ValueError("Invalid JSON format in DAT file")
-    
+            chunk = f.read(READ_CHUNK_BYTES)
+            at_eof = not chunk
+            buffer = buffer[position:] + chunk
+            position = 0
+
     def _validate_and_convert(self, value: str, column: ColumnDefinition) -> Any:
         if value.strip() == '':
             return None
@@ -222,14 +519,8 @@ class FileProcessor:
     
     def _validate_date(self, value: str, column: ColumnDefinition) -> str:
         try:
-            # Try common date formats
-            for fmt in ['%Y-%m-%d', '%d/%m/%Y', '%m/%d/%Y', '%Y-%m-%d %H:%M:%S']:
-                try:
-                    parsed_date = datetime.strptime(value, fmt)
-                    return parsed_date.strftime('%Y-%m-%d')
-                except ValueError:
-                    continue
-            raise ValueError(f"Invalid date format: {value}")
+            # Detected column format first, then the other common formats
+            return get_date_parser(column.date_format).to_iso(value)
         except ValueError:
             raise ValueError(f"Invalid date: {value}")
     
@@ -249,7 +540,7 @@ class FileProcessor:
         except ValueError:
             raise ValueError(f"Invalid array format: {value}")
     
-    def _convert_value(self, value: str, data_type: str) -> Any:
+    def _convert_value(self, value: str, data_type: str, date_format: Optional[str] = None) -> Any:
         """Convert string value to appropriate data type"""
         try:
             if data_type == 'INT':
@@ -261,14 +552,10 @@ class FileProcessor:
             elif data_type == 'BOOLEAN':
                 return value.lower() in ('true', '1', 'yes', 'on')
             elif data_type == 'DATE':
-                from datetime import datetime
-                # Try multiple date formats
-                for fmt in ['%Y-%m-%d', '%d/%m/%Y', '%m/%d/%Y']:
-                    try:
-                        return datetime.strptime(value, fmt).date()
-                    except ValueError:
-                        continue
-                raise ValueError(f"Cannot parse date: {value}")
+                try:
+                    return get_date_parser(date_format).parse(value).date()
+                except ValueError:
+                    raise ValueError(f"Cannot parse date: {value}")
             else:
                 raise ValueError(f"Unsupported data type: {data_type}")
         except Exception as e:
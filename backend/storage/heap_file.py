@@ -0,0 +1,499 @@
+import os
+import copy
+import struct
+from array import array
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from api.schemas import CompressionType, DataType
+from storage.storage_manager import StorageManager
+from storage.page_codec import COMPRESSION_SLACK, PageCodec
+from storage.zone_map import ZoneMap
+from storage.type_loader import get_type_system
+
+PAGE_SIZE = 4096
+
+# Page header: slot_count, free_end (start of the record area, records grow downwards)
+PAGE_HEADER = struct.Struct('<HH')
+# Slot directory entry: record offset, record length
+SLOT_ENTRY = struct.Struct('<HH')
+# Page directory sidecar (<data file>.pgdir): one uint64 per page holding the
+# number of rows stored before that page, so row N is located with a bisect
+DIRECTORY_TYPECODE = 'Q'
+# Row ids pack (page, slot) into one integer; a page never holds more than 2^16 slots
+RID_SLOT_BITS = 16
+# Deleted slots keep their directory entry with this bit set in the record length
+# (records are shorter than 32 KB), so the slot directory doubles as the page's
+# tombstone bitmap and row positions stay stable until the table is vacuumed
+TOMBSTONE_BIT = 0x8000
+
+
+def encode_rid(page_no: int, slot: int) -> int:
+    """Stable integer row id for the record at (page_no, slot)"""
+    return (page_no << RID_SLOT_BITS) | slot
+
+
+def decode_rid(row_id: int) -> Tuple[int, int]:
+    return row_id >> RID_SLOT_BITS, row_id & ((1 << RID_SLOT_BITS) - 1)
+
+
+class SlottedPage:
+    """Fixed-size slotted page.
+
+    The slot directory grows from the header towards the end of the page and the
+    records grow from the end of the page towards the header.
+    """
+
+    def __init__(self, data: Optional[bytes] = None, page_size: int = PAGE_SIZE):
+        self.page_size = page_size
+        if data and len(data) >= PAGE_HEADER.size:
+            self.data = bytearray(data.ljust(page_size, b'\x00'))
+            self.slot_count, self.free_end = PAGE_HEADER.unpack_from(self.data, 0)
+            if self.free_end == 0:
+                self.free_end = page_size
+        else:
+            self.data = bytearray(page_size)
+            self.slot_count = 0
+            self.free_end = page_size
+        # (used bytes, compressed size) at the last successful PageCodec.fits check
+        self.encoded_hint: Optional[Tuple[int, int]] = None
+
+    @staticmethod
+    def max_record_size(page_size: int = PAGE_SIZE) -> int:
+        return page_size - PAGE_HEADER.size - SLOT_ENTRY.size
+
+    def free_space(self) -> int:
+        return self.free_end - (PAGE_HEADER.size + self.slot_count * SLOT_ENTRY.size)
+
+    def can_fit(self, record: bytes) -> bool:
+        return len(record) + SLOT_ENTRY.size <= self.free_space()
+
+    def used_bytes(self) -> int:
+        return self.page_size - self.free_space()
+
+    def insert(self, record: bytes) -> int:
+        """Store a record and return its slot number"""
+        if not self.can_fit(record):
+            raise ValueError("Record does not fit in page")
+        offset = self.free_end - len(record)
+        self.data[offset:offset + len(record)] = record
+        slot = self.slot_count
+        SLOT_ENTRY.pack_into(self.data, PAGE_HEADER.size + slot * SLOT_ENTRY.size, offset, len(record))
+        self.slot_count += 1
+        self.free_end = offset
+        PAGE_HEADER.pack_into(self.data, 0, self.slot_count, self.free_end)
+        return slot
+
+    def pop(self):
+        """Remove the last inserted record"""
+        self.slot_count -= 1
+        entry = PAGE_HEADER.size + self.slot_count * SLOT_ENTRY.size
+        offset, length = SLOT_ENTRY.unpack_from(self.data, entry)
+        self.data[offset:offset + length] = bytes(length)
+        self.data[entry:entry + SLOT_ENTRY.size] = bytes(SLOT_ENTRY.size)
+        self.free_end = offset + length
+        PAGE_HEADER.pack_into(self.data, 0, self.slot_count, self.free_end)
+
+    def _slot_entry(self, slot: int) -> Tuple[int, int]:
+        if slot >= self.slot_count:
+            raise IndexError(f"Slot {slot} out of range")
+        return SLOT_ENTRY.unpack_from(self.data, PAGE_HEADER.size + slot * SLOT_ENTRY.size)
+
+    def is_deleted(self, slot: int) -> bool:
+        return bool(self._slot_entry(slot)[1] & TOMBSTONE_BIT)
+
+    def deleted_count(self) -> int:
+        return sum(1 for slot in range(self.slot_count) if self.is_deleted(slot))
+
+    def get_record(self, slot: int) -> bytes:
+        offset, length = self._slot_entry(slot)
+        length &= ~TOMBSTONE_BIT
+        return bytes(self.data[offset:offset + length])
+
+    def records(self) -> List[bytes]:
+        """Records of the live slots"""
+        return [record for _, record in self.live_records()]
+
+    def live_records(self) -> List[Tuple[int, bytes]]:
+        return [(slot, self.get_record(slot)) for slot in range(self.slot_count) if not self.is_deleted(slot)]
+
+    def delete(self, slot: int):
+        """Tombstone a slot; its bytes are reclaimed by vacuum"""
+        offset, length = self._slot_entry(slot)
+        SLOT_ENTRY.pack_into(self.data, PAGE_HEADER.size + slot * SLOT_ENTRY.size, offset, length | TOMBSTONE_BIT)
+
+    def replace(self, slot: int, record: bytes) -> bool:
+        """Store a new version of a record in the same slot.
+
+        It overwrites the old bytes when it is not longer, or goes to the free
+        space of the page otherwise. Returns False if the page has no room.
+        """
+        offset, length = self._slot_entry(slot)
+        if len(record) > length:
+            if len(record) > self.free_space():
+                return False
+            offset = self.free_end - len(record)
+            self.free_end = offset
+            PAGE_HEADER.pack_into(self.data, 0, self.slot_count, self.free_end)
+        self.data[offset:offset + len(record)] = record
+        SLOT_ENTRY.pack_into(self.data, PAGE_HEADER.size + slot * SLOT_ENTRY.size, offset, len(record))
+        return True
+
+    def to_bytes(self) -> bytes:
+        return bytes(self.data)
+
+
+class HeapFile:
+    """Table storage made of fixed-size slotted pages.
+
+    Rows are encoded with the RowCodec compiled for the table schema and every page access goes
+    through StorageManager.read_page/write_page, so pages are cached in its
+    BufferCache and scans only read the pages they touch.
+
+    With zlib compression every page_size frame of the file holds a larger
+    logical page in compressed form; the BufferCache keeps the decompressed
+    page, so a hot page is only inflated once.
+    """
+
+    def __init__(self, file_path: str, columns: List[Dict[str, Any]], storage_manager: StorageManager,
+                 page_size: int = PAGE_SIZE, compression: CompressionType = CompressionType.NONE):
+        self.file_path = file_path
+        self.data_types = [DataType(col["data_type"]) for col in columns]
+        self.storage_manager = storage_manager
+        self.page_size = page_size
+        self.codec = PageCodec(page_size) if CompressionType(compression) == CompressionType.ZLIB else None
+        self.logical_page_size = self.codec.logical_size if self.codec else page_size
+        self.zone_map = ZoneMap(file_path, columns)
+        self.type_system = get_type_system()
+        self.row_codec = self.type_system.row_codec(self.data_types)
+        self.max_record_size = SlottedPage.max_record_size(page_size)
+        if self.codec is not None:
+            # Room for the zlib overhead of a page holding a single incompressible record
+            self.max_record_size -= COMPRESSION_SLACK
+
+    @property
+    def page_count(self) -> int:
+        # Includes pages staged by the write-ahead log that are not in the file yet
+        return self.storage_manager.page_count(self.file_path, self.page_size)
+
+    def encode_row(self, row: List[Any]) -> bytes:
+        return self._check_size(self.row_codec.encode(row))
+
+    def encode_rows(self, rows: List[List[Any]]) -> List[bytes]:
+        encode = self.row_codec.encode
+        return [self._check_size(encode(row)) for row in rows]
+
+    def _check_size(self, record: bytes) -> bytes:
+        if len(record) > self.max_record_size:
+            raise ValueError(f"Row too large for a {self.page_size}-byte page ({len(record)} bytes)")
+        return record
+
+    def decode_row(self, record: bytes) -> List[Any]:
+        return self.row_codec.decode(record)
+
+    def decode_rows(self, records) -> List[List[Any]]:
+        return self.row_codec.decode_many(records)
+
+    async def create(self):
+        """Create an empty data file, replacing any previous content"""
+        await self._replace_file([])
+        self.zone_map.write([])
+
+    async def _replace_file(self, pages: List[SlottedPage]):
+        # Written aside and swapped with os.replace: the file is never truncated
+        # under a reader that still maps the old content
+        os.makedirs(os.path.dirname(self.file_path) or ".", exist_ok=True)
+        temp_path = self.file_path + ".tmp"
+        with open(temp_path, 'wb') as f:
+            for page in pages:
+                f.write(self.codec.encode(page.to_bytes()) if self.codec else page.to_bytes())
+        await self.storage_manager.replace_file(temp_path, self.file_path)
+        self._write_directory([page.slot_count for page in pages])
+
+    @property
+    def directory_path(self) -> str:
+        return self.file_path + ".pgdir"
+
+    def _write_directory(self, slot_counts: List[int]):
+        first_rows = array(DIRECTORY_TYPECODE)
+        total = 0
+        for slot_count in slot_counts:
+            first_rows.append(total)
+            total += slot_count
+        temp_path = self.directory_path + ".tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(first_rows.tobytes())
+        os.replace(temp_path, self.directory_path)
+        self.storage_manager.invalidate_file(self.directory_path)
+
+    def _directory_length(self) -> int:
+        if not os.path.exists(self.directory_path):
+            return -1
+        return os.path.getsize(self.directory_path) // array(DIRECTORY_TYPECODE).itemsize
+
+    async def ensure_directory(self):
+        """Rebuild the page directory from the page headers if it is missing or stale"""
+        if self._directory_length() != self.page_count:
+            slot_counts = [(await self.read_page(page_no)).slot_count for page_no in range(self.page_count)]
+            self._write_directory(slot_counts)
+
+    def _directory_tail(self) -> int:
+        """Number of rows stored before the last page"""
+        entry = array(DIRECTORY_TYPECODE)
+        with open(self.directory_path, 'rb') as f:
+            f.seek(-entry.itemsize, os.SEEK_END)
+            entry.frombytes(f.read(entry.itemsize))
+        return entry[0]
+
+    def _append_directory(self, first_rows: List[int]):
+        with open(self.directory_path, 'ab') as f:
+            f.write(array(DIRECTORY_TYPECODE, first_rows).tobytes())
+
+    async def count_rows(self) -> int:
+        """Count row positions (slots, deleted ones included) from the page directory and the last page"""
+        await self.ensure_directory()
+        if not self.page_count:
+            return 0
+        return self._directory_tail() + (await self.read_page(self.page_count - 1)).slot_count
+
+    def new_page(self) -> SlottedPage:
+        return SlottedPage(page_size=self.logical_page_size)
+
+    def try_insert(self, page: SlottedPage, record: bytes) -> Optional[int]:
+        """Insert record into page if it fits (once compressed, for zlib tables). Returns the slot"""
+        if not page.can_fit(record):
+            return None
+        slot = page.insert(record)
+        if self.codec is not None and not self.codec.fits(page):
+            page.pop()
+            return None
+        return slot
+
+    def try_replace(self, page: SlottedPage, slot: int, record: bytes) -> bool:
+        """Replace the record of a slot if the new version fits the page (once compressed, for zlib tables)"""
+        previous = (bytes(page.data), page.free_end, page.encoded_hint)
+        if not page.replace(slot, record):
+            return False
+        if self.codec is not None and not self.codec.fits(page):
+            data, page.free_end, page.encoded_hint = previous
+            page.data[:] = data
+            return False
+        return True
+
+    async def read_page(self, page_no: int) -> SlottedPage:
+        data = await self.storage_manager.read_page(self.file_path, page_no, self.page_size, self.codec)
+        return SlottedPage(data, self.logical_page_size)
+
+    async def write_page(self, page_no: int, page: SlottedPage):
+        await self.storage_manager.write_page(self.file_path, page_no, page.to_bytes(), self.codec)
+
+    async def insert_rows(self, rows: List[List[Any]]) -> List[Tuple[int, int]]:
+        """Append rows, filling the last page first. Returns (page, slot) ids"""
+        if not os.path.exists(self.file_path):
+            # Sin archivo no hay lectores: se crea en su sitio, sin replace_file,
+            # que no puede llamarse desde una transacción
+            os.makedirs(os.path.dirname(self.file_path) or ".", exist_ok=True)
+            open(self.file_path, 'ab').close()
+            self._write_directory([])
+            self.zone_map.write([])
+
+        await self.ensure_directory()
+        await self.ensure_zone_map()
+
+        rids = []
+        new_pages = []
+        page_no = max(self.page_count - 1, 0)
+        if self.page_count:
+            page = await self.read_page(page_no)
+            first_row = self._directory_tail()
+            zone = await self._zone_entry(page_no, page)
+        else:
+            page = self.new_page()
+            first_row = 0
+            new_pages.append(first_row)
+            zone = self.zone_map.new_entry(page_no)
+        zones = [zone]
+        dirty = False
+
+        for row, record in zip(rows, self.encode_rows(rows)):
+            slot = self.try_insert(page, record)
+            if slot is None:
+                await self.write_page(page_no, page)
+                page_no += 1
+                first_row += page.slot_count
+                new_pages.append(first_row)
+                page = self.new_page()
+                zone = self.zone_map.new_entry(page_no)
+                zones.append(zone)
+                slot = page.insert(record)
+            self.zone_map.add_row(zone, row)
+            rids.append((page_no, slot))
+            dirty = True
+
+        if dirty:
+            await self.write_page(page_no, page)
+            self._append_directory(new_pages)
+            self.zone_map.append(zones)
+        return rids
+
+    async def delete_rows(self, rids: List[Tuple[int, int]]) -> int:
+        """Tombstone rows by (page, slot), writing each page once. Returns the rows deleted"""
+        deleted = 0
+        for page_no, slots in self._group_by_page(rids).items():
+            page = await self.read_page(page_no)
+            for slot in slots:
+                if not page.is_deleted(slot):
+                    page.delete(slot)
+                    deleted += 1
+            await self.write_page(page_no, page)
+        # The zone map entries stay valid: they may only be wider than the live rows
+        return deleted
+
+    async def update_rows(self, updates: List[Tuple[int, int, List[Any]]]) -> List[int]:
+        """Store new versions of rows given as (page, slot, row).
+
+        A row stays in its slot when the new version fits its page, and the
+        zone map entry of the page is widened with it. The other rows are
+        tombstoned; their indexes in updates are returned, so the caller
+        appends them.
+        """
+        await self.ensure_zone_map()
+        moved = []
+        zones = []
+        by_page: Dict[int, List[Tuple[int, int]]] = {}
+        for i, (page_no, slot, _) in enumerate(updates):
+            by_page.setdefault(page_no, []).append((slot, i))
+        for page_no, page_updates in sorted(by_page.items()):
+            page = await self.read_page(page_no)
+            zone = await self._zone_entry(page_no, page)
+            for slot, i in page_updates:
+                row = updates[i][2]
+                if self.try_replace(page, slot, self.encode_row(row)):
+                    self.zone_map.widen(zone, row)
+                else:
+                    page.delete(slot)
+                    moved.append(i)
+            await self.write_page(page_no, page)
+            zones.append(zone)
+        if zones:
+            self.zone_map.append(zones)
+        return sorted(moved)
+
+    @staticmethod
+    def _group_by_page(rids: List[Tuple[int, int]]) -> Dict[int, List[int]]:
+        by_page: Dict[int, List[int]] = {}
+        for page_no, slot in sorted(rids):
+            by_page.setdefault(page_no, []).append(slot)
+        return by_page
+
+    async def count_deleted_rows(self) -> int:
+        """Tombstoned slots waiting for vacuum, counted from every page"""
+        total = 0
+        for page_no in range(self.page_count):
+            total += (await self.read_page(page_no)).deleted_count()
+        return total
+
+    async def ensure_zone_map(self):
+        """Build the zone map of files written before zone maps existed"""
+        if not self.zone_map.exists():
+            self.zone_map.write([await self._zone_entry(page_no) for page_no in range(self.page_count)])
+
+    async def _zone_entry(self, page_no: int, page: Optional[SlottedPage] = None) -> Dict[str, Any]:
+        """Current zone map entry of a page, rebuilt from its rows if missing or stale"""
+        if page is None:
+            page = await self.read_page(page_no)
+        entry = self.zone_map.load().get(page_no)
+        if entry is not None and entry["slots"] == page.slot_count:
+            return copy.deepcopy(entry)
+        entry = self.zone_map.new_entry(page_no)
+        for record in page.records():
+            self.zone_map.widen(entry, self.decode_row(record))
+        entry["slots"] = page.slot_count
+        return entry
+
+    async def append_rows(self, rows: List[List[Any]]) -> List[int]:
+        """Append rows and return their integer row ids"""
+        return [encode_rid(page_no, slot) for page_no, slot in await self.insert_rows(rows)]
+
+    def row_positions(self, row_ids: List[int]) -> List[int]:
+        """Row positions (what the indices store) of the ids returned by append_rows.
+
+        Reads the page directory entries of the pages holding them, so it must
+        run before another writer can touch the table (inside the transaction).
+        """
+        rids = [decode_rid(row_id) for row_id in row_ids]
+        if not rids:
+            return []
+        first_page = min(page_no for page_no, _ in rids)
+        last_page = max(page_no for page_no, _ in rids)
+        first_rows = array(DIRECTORY_TYPECODE)
+        with open(self.directory_path, 'rb') as f:
+            f.seek(first_page * first_rows.itemsize)
+            first_rows.frombytes(f.read((last_page - first_page + 1) * first_rows.itemsize))
+        return [first_rows[page_no - first_page] + slot for page_no, slot in rids]
+
+    async def write_all(self, rows: List[List[Any]]) -> List[Tuple[int, int]]:
+        """Replace the whole content of the file with rows"""
+        rids = []
+        pages = [self.new_page()]
+        zones = [self.zone_map.new_entry(0)]
+        for row, record in zip(rows, self.encode_rows(rows)):
+            slot = self.try_insert(pages[-1], record)
+            if slot is None:
+                pages.append(self.new_page())
+                zones.append(self.zone_map.new_entry(len(pages) - 1))
+                slot = pages[-1].insert(record)
+            self.zone_map.add_row(zones[-1], row)
+            rids.append((len(pages) - 1, slot))
+        await self._replace_file(pages if rids else [])
+        self.zone_map.write(zones if rids else [])
+        return rids
+
+    async def write_batches(self, batches: AsyncIterator[List[List[Any]]]) -> int:
+        """Replace the whole content of the file with streamed rows.
+
+        Pages are written out as soon as they are full, so only the page being
+        filled is kept in memory. Returns the number of rows written.
+        """
+        os.makedirs(os.path.dirname(self.file_path) or ".", exist_ok=True)
+        temp_path = self.file_path + ".tmp"
+        slot_counts = array('H')
+        row_count = 0
+        with self.zone_map.rewrite() as write_zone:
+            try:
+                with open(temp_path, 'wb') as f:
+                    page = self.new_page()
+                    zone = self.zone_map.new_entry(0)
+                    async for rows in batches:
+                        for row, record in zip(rows, self.encode_rows(rows)):
+                            if self.try_insert(page, record) is None:
+                                f.write(self.codec.encode(page.to_bytes()) if self.codec else page.to_bytes())
+                                slot_counts.append(page.slot_count)
+                                write_zone(zone)
+                                page = self.new_page()
+                                zone = self.zone_map.new_entry(len(slot_counts))
+                                page.insert(record)
+                            self.zone_map.add_row(zone, row)
+                            row_count += 1
+                    if page.slot_count:
+                        f.write(self.codec.encode(page.to_bytes()) if self.codec else page.to_bytes())
+                        slot_counts.append(page.slot_count)
+                        write_zone(zone)
+            except BaseException:
+                os.remove(temp_path)
+                raise
+            await self.storage_manager.replace_file(temp_path, self.file_path)
+            self._write_directory(slot_counts)
+        return row_count
+
+    async def read_page_rows(self, page_no: int) -> List[List[Any]]:
+        page = await self.read_page(page_no)
+        return self.decode_rows(page.records())
+
+    async def scan(self) -> AsyncIterator[List[Any]]:
+        """Yield every live row, one page at a time"""
+        for page_no in range(self.page_count):
+            for row in await self.read_page_rows(page_no):
+                yield row
+
+    async def read_all(self, column_indices: Optional[List[int]] = None) -> List[List[Any]]:
+        # Rows are stored whole, so every column is decoded regardless of column_indices
+        return [row async for row in self.scan()]
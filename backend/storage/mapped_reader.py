@@ -0,0 +1,153 @@
+from bisect import bisect_right
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Tuple
+from storage.heap_file import HeapFile, PAGE_HEADER, SLOT_ENTRY, DIRECTORY_TYPECODE, TOMBSTONE_BIT
+from storage.storage_manager import StorageManager
+
+
+class MappedHeapReader:
+    """Zero-copy reader over a heap file mapped with mmap.
+
+    Records are handed to the row decoder as memoryview slices of the shared
+    mapping, and rows are only decoded when the consumer pulls them, so
+    concurrent readers of a table share the OS page cache instead of each
+    parsing the whole file. Pages staged by the write-ahead log and not yet
+    checkpointed are read from memory instead of the mapping.
+    """
+
+    def __init__(self, heap_file: HeapFile, storage_manager: StorageManager):
+        self.heap_file = heap_file
+        self.storage_manager = storage_manager
+        self.page_size = heap_file.page_size
+        mapped = storage_manager.map_file(heap_file.file_path)
+        self.view: Optional[memoryview] = memoryview(mapped) if mapped is not None else None
+        self.staged_pages = storage_manager.staged_pages(heap_file.file_path)
+        self.page_count = storage_manager.page_count(heap_file.file_path, self.page_size)
+
+    def _page_buffer(self, page_no: int) -> Tuple[memoryview, int]:
+        """Buffer holding a page and the offset of the page inside it"""
+        staged = self.staged_pages.get(page_no)
+        codec = self.heap_file.codec
+        if codec is not None:
+            # Compressed frames are inflated once and kept in the buffer cache
+            base = page_no * self.page_size
+            frame = staged if staged is not None else self.view[base:base + self.page_size]
+            return memoryview(self.storage_manager.decode_page(self.heap_file.file_path, page_no, frame, codec)), 0
+        if staged is not None:
+            return memoryview(staged), 0
+        return self.view, page_no * self.page_size
+
+    def _page_slot_count(self, page_no: int) -> int:
+        buffer, base = self._page_buffer(page_no)
+        return PAGE_HEADER.unpack_from(buffer, base)[0]
+
+    def _page_records(self, page_no: int, first_slot: int = 0, last_slot: Optional[int] = None) -> Iterator[memoryview]:
+        return (record for _, record in self._page_slots(page_no, first_slot, last_slot))
+
+    def _page_slots(self, page_no: int, first_slot: int = 0,
+                    last_slot: Optional[int] = None) -> Iterator[Tuple[int, memoryview]]:
+        """(slot, record) of the live slots of a page; tombstoned slots are skipped"""
+        buffer, base = self._page_buffer(page_no)
+        slot_count = PAGE_HEADER.unpack_from(buffer, base)[0]
+        if last_slot is None or last_slot > slot_count:
+            last_slot = slot_count
+        self.storage_manager.io_operations += 1
+        for slot in range(first_slot, last_slot):
+            offset, length = SLOT_ENTRY.unpack_from(buffer, base + PAGE_HEADER.size + slot * SLOT_ENTRY.size)
+            if length & TOMBSTONE_BIT:
+                continue
+            yield slot, buffer[base + offset:base + offset + length]
+
+    def iter_rows(self, page_filter: Optional[Callable[[int, int], bool]] = None) -> Iterator[List[Any]]:
+        """Lazily decode every row of the table.
+
+        page_filter(page_no, slot_count) can reject whole pages (zone maps)
+        before any of their records is decoded.
+        """
+        decode_row = self.heap_file.decode_row
+        self.pages_skipped = 0
+        for page_no in range(self.page_count):
+            if page_filter is not None and not page_filter(page_no, self._page_slot_count(page_no)):
+                self.pages_skipped += 1
+                continue
+            for record in self._page_records(page_no):
+                yield decode_row(record)
+
+    def iter_located_rows(
+        self, page_filter: Optional[Callable[[int, int], bool]] = None
+    ) -> Iterator[Tuple[int, int, int, List[Any]]]:
+        """Like iter_rows, yielding (position, page, slot, row) for the rows DML has to locate"""
+        decode_row = self.heap_file.decode_row
+        position = 0
+        for page_no in range(self.page_count):
+            slot_count = self._page_slot_count(page_no)
+            if page_filter is None or page_filter(page_no, slot_count):
+                for slot, record in self._page_slots(page_no):
+                    yield position + slot, page_no, slot, decode_row(record)
+            position += slot_count
+
+    def rows_at(self, positions: Iterable[int]) -> List[Tuple[int, int, int, List[Any]]]:
+        """Live rows at the given row positions (from an index) as (position, page, slot, row).
+
+        Each position is located with a bisect over the page directory, so only
+        the pages holding those rows are read.
+        """
+        directory = self._directory()
+        if directory is None:
+            raise ValueError(f"Page directory of {self.heap_file.file_path} is missing")
+        decode_row = self.heap_file.decode_row
+        rows = []
+        for position in sorted(set(positions)):
+            page_no = bisect_right(directory, position, 0, self.page_count) - 1
+            if page_no < 0:
+                continue
+            slot = position - directory[page_no]
+            for found, record in self._page_slots(page_no, slot, slot + 1):
+                rows.append((position, page_no, found, decode_row(record)))
+        return rows
+
+    def row_count(self) -> int:
+        """Count row positions (deleted slots included) reading only the page headers"""
+        return sum(self._page_slot_count(page_no) for page_no in range(self.page_count))
+
+    def _directory(self) -> Optional[memoryview]:
+        mapped = self.storage_manager.map_file(self.heap_file.directory_path)
+        if mapped is None:
+            return None
+        directory = memoryview(mapped).cast(DIRECTORY_TYPECODE)
+        return directory if len(directory) >= self.page_count else None
+
+    def read_rows(self, start: int, count: int) -> List[List[Any]]:
+        """Decode the live rows at positions [start, start + count).
+
+        The first page is found with a bisect over the page directory, so only
+        the pages holding the requested rows are touched. Deleted rows keep
+        their positions until vacuum, so the range may hold fewer rows.
+        """
+        directory = self._directory()
+        if directory is None:
+            return self._read_rows_by_headers(start, count)
+
+        rows = []
+        end = start + count
+        page_no = max(bisect_right(directory, start, 0, self.page_count) - 1, 0)
+        while page_no < self.page_count and directory[page_no] < end:
+            first_row = directory[page_no]
+            rows.extend(self.heap_file.decode_rows(
+                self._page_records(page_no, max(start - first_row, 0), end - first_row)))
+            page_no += 1
+        return rows
+
+    def _read_rows_by_headers(self, start: int, count: int) -> List[List[Any]]:
+        # Fallback for files without a page directory: skip pages by their slot count
+        rows = []
+        end = start + count
+        position = 0
+        for page_no in range(self.page_count):
+            if position >= end:
+                break
+            slot_count = self._page_slot_count(page_no)
+            if position + slot_count > start:
+                rows.extend(self.heap_file.decode_rows(
+                    self._page_records(page_no, max(start - position, 0), end - position)))
+            position += slot_count
+        return rows
@@ -0,0 +1,55 @@
+import struct
+import zlib
+
+# Cabecera del frame comprimido: longitud de los datos zlib que le siguen
+FRAME_HEADER = struct.Struct('<H')
+# Un frame de 4 KB guarda una página lógica de hasta 8 veces su tamaño
+LOGICAL_PAGES_PER_FRAME = 8
+COMPRESSION_LEVEL = 6
+# Upper bound of what deflate can add on top of the bytes appended to a page
+COMPRESSION_SLACK = 64
+
+
+class PageCodec:
+    """zlib codec for heap pages.
+
+    A logical slotted page of frame_size * LOGICAL_PAGES_PER_FRAME bytes is
+    stored compressed inside one fixed-size frame, so page numbers, row ids
+    and file offsets keep working exactly as for uncompressed files. Pages
+    are filled while their compressed image still fits in the frame.
+    """
+
+    def __init__(self, frame_size: int):
+        self.frame_size = frame_size
+        self.logical_size = frame_size * LOGICAL_PAGES_PER_FRAME
+        self.capacity = frame_size - FRAME_HEADER.size
+
+    def encode(self, page: bytes) -> bytes:
+        compressed = zlib.compress(page, COMPRESSION_LEVEL)
+        if len(compressed) > self.capacity:
+            raise ValueError(f"Compressed page ({len(compressed)} bytes) does not fit in a {self.frame_size}-byte frame")
+        return (FRAME_HEADER.pack(len(compressed)) + compressed).ljust(self.frame_size, b'\x00')
+
+    def decode(self, frame: bytes) -> bytes:
+        length = FRAME_HEADER.unpack_from(frame, 0)[0] if len(frame) >= FRAME_HEADER.size else 0
+        if length == 0:
+            return bytes(self.logical_size)
+        return zlib.decompress(frame[FRAME_HEADER.size:FRAME_HEADER.size + length])
+
+    def fits(self, page) -> bool:
+        """True if the slotted page still compresses into one frame.
+
+        Compression is only re-run when the bytes added since the last check
+        could have used up the remaining room, so filling a page costs a few
+        compressions instead of one per record.
+        """
+        used = page.used_bytes()
+        if page.encoded_hint is not None:
+            checked_used, checked_size = page.encoded_hint
+            if used - checked_used + COMPRESSION_SLACK <= self.capacity - checked_size:
+                return True
+        size = len(zlib.compress(page.data, COMPRESSION_LEVEL))
+        if size > self.capacity:
+            return False
+        page.encoded_hint = (used, size)
+        return True
@@ -1,13 +1,31 @@
 import os
+import hashlib
+import mmap
 import shutil
-from typing import List, Dict, Any, Optional
+from typing import AsyncIterator, List, Dict, Any, Optional, Set, Tuple
 from datetime import datetime
 from fastapi import UploadFile, HTTPException
 from collections import OrderedDict
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
 import asyncio
 import aiofiles
 from api.schemas import FileInfo, FileUploadResponse
 from utils.metrics import MetricsService
+from storage.wal import WriteAheadLog, Checkpointer
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+class Transaction:
+    """Write set of one DML statement: the pages it staged and their previous versions"""
+    def __init__(self, txn_id: int):
+        self.txn_id = txn_id
+        self.undo: Dict[Tuple[str, int], Optional[bytes]] = {}
+
+_current_transaction: ContextVar[Optional[Transaction]] = ContextVar("current_transaction", default=None)
+# Set while the current task runs inside StorageManager.exclusive()
+_in_exclusive: ContextVar[bool] = ContextVar("in_exclusive", default=False)
 
 class BufferCache:
     def __init__(self, size: int = 1000):
@@ -34,6 +52,14 @@ class BufferCache:
             # Remove least recently used
             self.cache.popitem(last=False)
     
+    def remove(self, key: str):
+        self.cache.pop(key, None)
+    
+    def invalidate(self, prefix: str):
+        """Drop every cached entry whose key starts with prefix"""
+        for key in [k for k in self.cache if k.startswith(prefix)]:
+            del self.cache[key]
+    
     def get_hit_ratio(self) -> float:
         total = self.hits + self.misses
         return self.hits / total if total > 0 else 0.0
@@ -42,13 +68,206 @@ class StorageManager:
     def __init__(self):
         self.data_dir = os.getenv("DATA_DIR", "../data")
         self.max_file_size = int(os.getenv("MAX_FILE_SIZE_MB", "100")) * 1024 * 1024
+        self.upload_chunk_size = int(os.getenv("UPLOAD_CHUNK_KB", "1024")) * 1024
         self.buffer_cache = BufferCache(int(os.getenv("BUFFER_CACHE_SIZE", "1000")))
         self.io_operations = 0
         self.metrics = MetricsService()
-        self.allowed_extensions = {'.csv', '.txt', '.dat'}
+        self.allowed_extensions = {'.csv', '.txt', '.dat', '.parquet', '.arrow', '.feather'}
+        # Shared read-only mappings, one per data file, reused by every reader
+        self.mapped_files: Dict[str, mmap.mmap] = {}
+        # Write-ahead log (created by initialize). While it is enabled, pages written
+        # by DML stay staged here until the checkpointer copies them to the data files
+        self.wal: Optional[WriteAheadLog] = None
+        self.checkpointer: Optional[Checkpointer] = None
+        self.dirty_pages: Dict[str, Dict[int, bytes]] = {}
+        self.flushing_pages: Dict[str, Dict[int, bytes]] = {}
+        self._write_latch: Optional[asyncio.Lock] = None
+        self._checkpoint_lock: Optional[asyncio.Lock] = None
     
     async def initialize(self):
         os.makedirs(self.data_dir, exist_ok=True)
+        if os.getenv("WAL_ENABLED", "true").lower() == "true" and self.wal is None:
+            self.wal = WriteAheadLog(
+                os.getenv("WAL_FILE", os.path.join(self.data_dir, "wal.log")),
+                commit_delay=float(os.getenv("WAL_COMMIT_DELAY_MS", "2")) / 1000
+            )
+            self.wal.open()
+            self.checkpointer = Checkpointer(
+                self,
+                interval=float(os.getenv("CHECKPOINT_INTERVAL_SECONDS", "30")),
+                max_log_bytes=int(os.getenv("WAL_CHECKPOINT_MB", "16")) * 1024 * 1024
+            )
+            self._write_latch = asyncio.Lock()
+            self._checkpoint_lock = asyncio.Lock()
+    
+    async def recover(self) -> Set[str]:
+        """Replay the committed writes left in the log by an unclean shutdown.
+
+        Returns the data files that were touched, so the catalog can refresh them.
+        """
+        if self.wal is None:
+            return set()
+        touched = self.wal.replay()
+        await self.wal.truncate(self.wal.last_lsn)
+        for file_path in touched:
+            self.invalidate_file(file_path)
+        if touched:
+            logger.info("WAL recovery: replayed writes into %d file(s)", len(touched))
+        return touched
+    
+    def start_checkpointer(self):
+        if self.checkpointer is not None:
+            self.checkpointer.start()
+    
+    async def shutdown(self):
+        """Stop the checkpointer and leave every committed page in the data files"""
+        if self.checkpointer is not None:
+            await self.checkpointer.stop()
+        await self.checkpoint()
+    
+    @asynccontextmanager
+    async def transaction(self):
+        """Group the page writes of one statement.
+
+        Writers are serialized while they build their pages; the commit record
+        is then awaited outside the latch, so statements that finish close
+        together share a single log fsync.
+        """
+        if self.wal is None:
+            yield None
+            return
+        async with self._write_latch:
+            transaction = Transaction(self.wal.begin())
+            token = _current_transaction.set(transaction)
+            try:
+                yield transaction
+            except BaseException:
+                self._rollback(transaction)
+                raise
+            finally:
+                _current_transaction.reset(token)
+            commit_lsn = self.wal.log_commit(transaction.txn_id)
+        await self.wal.wait_durable(commit_lsn)
+        if self.wal.size > self.checkpointer.max_log_bytes:
+            self.checkpointer.request()
+    
+    def _rollback(self, transaction: Transaction):
+        # Restore the staged version each page had before the statement started
+        for (file_path, page_number), previous in transaction.undo.items():
+            pages = self.dirty_pages.setdefault(file_path, {})
+            self.buffer_cache.remove(f"{file_path}:{page_number}")
+            if previous is None:
+                pages.pop(page_number, None)
+            else:
+                pages[page_number] = previous
+    
+    def _stage_page(self, file_path: str, page_number: int, data: bytes):
+        pages = self.dirty_pages.setdefault(file_path, {})
+        transaction = _current_transaction.get()
+        if transaction is None:
+            # Write outside a statement: log it as its own transaction
+            txn_id = self.wal.begin()
+            self.wal.log_write(txn_id, file_path, page_number * len(data), data)
+            self.wal.log_commit(txn_id)
+        else:
+            transaction.undo.setdefault((file_path, page_number), pages.get(page_number))
+            self.wal.log_write(transaction.txn_id, file_path, page_number * len(data), data)
+        pages[page_number] = data
+    
+    def staged_pages(self, file_path: str) -> Dict[int, bytes]:
+        """Pages of a file that are newer in memory than in the data file"""
+        return {**self.flushing_pages.get(file_path, {}), **self.dirty_pages.get(file_path, {})}
+    
+    def _staged_page(self, file_path: str, page_number: int) -> Optional[bytes]:
+        for pages in (self.dirty_pages, self.flushing_pages):
+            data = pages.get(file_path, {}).get(page_number)
+            if data is not None:
+                return data
+        return None
+    
+    def page_count(self, file_path: str, page_size: int) -> int:
+        """Number of pages of a file, counting staged pages past its end"""
+        count = os.path.getsize(file_path) // page_size if os.path.exists(file_path) else 0
+        for pages in (self.dirty_pages.get(file_path), self.flushing_pages.get(file_path)):
+            if pages:
+                count = max(count, max(pages) + 1)
+        return count
+    
+    async def checkpoint(self):
+        """Copy staged pages to their data files, fsync them and truncate the log"""
+        if self.wal is None:
+            return
+        async with self._checkpoint_lock:
+            # With the latch held no statement is half-staged: the snapshot is consistent
+            async with self._write_latch:
+                checkpoint_lsn = self._take_staged_pages()
+            await self._flush_staged_pages(checkpoint_lsn)
+    
+    def _take_staged_pages(self) -> int:
+        self.flushing_pages, self.dirty_pages = self.dirty_pages, {}
+        return self.wal.last_lsn
+    
+    async def _flush_staged_pages(self, checkpoint_lsn: int):
+        # WAL rule: the log reaches disk before the pages it describes
+        await self.wal.wait_durable(checkpoint_lsn)
+        written = await asyncio.to_thread(self._write_staged_pages, self.flushing_pages)
+        self.flushing_pages = {}
+        await self.wal.truncate(checkpoint_lsn)
+        self.io_operations += written
+    
+    @asynccontextmanager
+    async def exclusive(self):
+        """Keep writers and the checkpointer out while data files are rewritten or removed.
+
+        Staged pages are checkpointed first, so no log record refers to the
+        old files. The locks are taken in the checkpoint order and
+        replace_file does not take the checkpoint lock again inside, so this
+        must not be entered from a transaction.
+        """
+        if self.wal is None:
+            yield
+            return
+        async with self._checkpoint_lock:
+            async with self._write_latch:
+                await self._flush_staged_pages(self._take_staged_pages())
+                token = _in_exclusive.set(True)
+                try:
+                    yield
+                finally:
+                    _in_exclusive.reset(token)
+    
+    def _write_staged_pages(self, staged: Dict[str, Dict[int, bytes]]) -> int:
+        written = 0
+        for file_path, pages in staged.items():
+            if not pages or not os.path.exists(file_path):
+                continue
+            fd = os.open(file_path, os.O_RDWR)
+            try:
+                for page_number in sorted(pages):
+                    data = pages[page_number]
+                    os.pwrite(fd, data, page_number * len(data))
+                    written += 1
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+        return written
+    
+    async def replace_file(self, temp_path: str, file_path: str):
+        """Swap a rewritten data file in place of the old one.
+
+        Runs inside exclusive(): staged pages are checkpointed and the log is
+        truncated first, so a replay after a crash cannot apply writes logged
+        for the old file to the new one. Must not be called from a transaction.
+        """
+        if _current_transaction.get() is not None:
+            raise RuntimeError(f"replace_file({file_path}) called inside a transaction")
+        if self.wal is None or _in_exclusive.get():
+            os.replace(temp_path, file_path)
+            self.invalidate_file(file_path)
+            return
+        async with self.exclusive():
+            os.replace(temp_path, file_path)
+            self.invalidate_file(file_path)
     
     async def upload_file(self, file: UploadFile, user_id: int) -> FileUploadResponse:
         # Validate file
@@ -59,11 +278,6 @@ class StorageManager:
         if file_ext not in self.allowed_extensions:
             raise HTTPException(status_code=400, detail="Invalid file type")
         
-        # Check file size
-        content = await file.read()
-        if len(content) > self.max_file_size:
-            raise HTTPException(status_code=400, detail="File too large")
-        
         # Create user directory
         user_dir = os.path.join(self.data_dir, str(user_id))
         os.makedirs(user_dir, exist_ok=True)
@@ -74,17 +288,53 @@ class StorageManager:
             raise HTTPException(status_code=400, detail="File already exists")
         
         # Save file
-        async with aiofiles.open(file_path, 'wb') as f:
-            await f.write(content)
-        
-        self.io_operations += 1
-        await self.metrics.record_io_operation()
+        size, sha256 = await self.save_upload(file, file_path)
         
         return FileUploadResponse(
             filename=file.filename,
-            message="File uploaded successfully"
+            message="File uploaded successfully",
+            size=size,
+            sha256=sha256
         )
     
+    async def save_upload(self, file: UploadFile, file_path: str) -> Tuple[int, str]:
+        """Copy an upload to file_path in fixed-size chunks. Returns (size, sha256)"""
+        async def chunks():
+            while True:
+                chunk = await file.read(self.upload_chunk_size)
+                if not chunk:
+                    return
+                yield chunk
+        
+        return await self.save_stream(chunks(), file_path)
+    
+    async def save_stream(self, chunks: AsyncIterator[bytes], file_path: str) -> Tuple[int, str]:
+        """Write a stream of byte chunks (an upload or a request body) to file_path.
+
+        The size limit is checked as the bytes arrive and the content hash is
+        computed on the fly, so the content is never held in memory. The file
+        only appears at file_path once it is complete. Returns (size, sha256).
+        """
+        temp_path = file_path + ".part"
+        digest = hashlib.sha256()
+        size = 0
+        try:
+            async with aiofiles.open(temp_path, 'wb') as f:
+                async for chunk in chunks:
+                    size += len(chunk)
+                    if size > self.max_file_size:
+                        raise HTTPException(status_code=400, detail="File too large")
+                    digest.update(chunk)
+                    await f.write(chunk)
+                    self.io_operations += 1
+                    await self.metrics.record_io_operation()
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        os.replace(temp_path, file_path)
+        return size, digest.hexdigest()
+    
     async def list_user_files(self, user_id: int) -> List[FileInfo]:
         user_dir = os.path.join(self.data_dir, str(user_id))
         files = []
@@ -112,7 +362,12 @@ class StorageManager:
         os.remove(file_path)
         return {"message": f"File {filename} deleted successfully"}
     
-    async def read_page(self, file_path: str, page_number: int, page_size: int = 4096) -> bytes:
+    async def read_page(self, file_path: str, page_number: int, page_size: int = 4096, codec=None) -> bytes:
+        """Read one page through the buffer cache.
+
+        With a codec the page is stored encoded on disk (and in the WAL) and the
+        cache keeps the decoded page, so hot pages are only decoded once.
+        """
         cache_key = f"{file_path}:{page_number}"
         
         # Check cache first
@@ -120,6 +375,11 @@ class StorageManager:
         if cached_data is not None:
             return cached_data
         
+        # Staged pages are newer than the data file and are never evicted
+        staged = self._staged_page(file_path, page_number)
+        if staged is not None:
+            return self._cache_page(cache_key, staged, codec)
+        
         # Read from disk
         offset = page_number * page_size
         try:
@@ -131,27 +391,70 @@ class StorageManager:
             await self.metrics.record_io_operation()
             
             # Cache the data
-            self.buffer_cache.put(cache_key, data)
-            
-            return data
+            return self._cache_page(cache_key, data, codec)
         except Exception:
             return b''
     
-    async def write_page(self, file_path: str, page_number: int, data: bytes):
-        page_size = len(data)
+    def decode_page(self, file_path: str, page_number: int, data: bytes, codec) -> bytes:
+        """Decoded version of a page read without read_page (e.g. from a mapping)"""
+        cache_key = f"{file_path}:{page_number}"
+        cached_data = self.buffer_cache.get(cache_key)
+        if cached_data is not None:
+            return cached_data
+        return self._cache_page(cache_key, data, codec)
+    
+    def _cache_page(self, cache_key: str, data: bytes, codec=None) -> bytes:
+        if codec is not None and data:
+            data = codec.decode(data)
+        self.buffer_cache.put(cache_key, data)
+        return data
+    
+    async def write_page(self, file_path: str, page_number: int, data: bytes, codec=None):
+        # The cache keeps the page as given; disk and WAL get the encoded frame
+        cache_key = f"{file_path}:{page_number}"
+        frame = codec.encode(data) if codec is not None else data
+        if self.wal is not None:
+            self._stage_page(file_path, page_number, frame)
+            self.buffer_cache.put(cache_key, data)
+            return
+        
+        page_size = len(frame)
         offset = page_number * page_size
         
         async with aiofiles.open(file_path, 'r+b') as f:
             await f.seek(offset)
-            await f.write(data)
+            await f.write(frame)
         
         # Update cache
-        cache_key = f"{file_path}:{page_number}"
         self.buffer_cache.put(cache_key, data)
         
         self.io_operations += 1
         await self.metrics.record_io_operation()
     
+    def map_file(self, file_path: str) -> Optional[mmap.mmap]:
+        """Return a shared read-only mapping of a data file (None if it is empty).
+
+        The mapping is rebuilt when the file has grown. Files are only ever
+        appended to or replaced with os.replace, so an old mapping stays valid
+        for readers that still hold it.
+        """
+        size = os.path.getsize(file_path) if os.path.exists(file_path) else 0
+        if size == 0:
+            return None
+        mapped = self.mapped_files.get(file_path)
+        if mapped is None or len(mapped) != size:
+            with open(file_path, 'rb') as f:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self.mapped_files[file_path] = mapped
+        return mapped
+    
+    def invalidate_file(self, file_path: str):
+        """Forget cached pages and mappings of a file that was rewritten or removed"""
+        self.buffer_cache.invalidate(f"{file_path}:")
+        self.mapped_files.pop(file_path, None)
+        self.dirty_pages.pop(file_path, None)
+        self.flushing_pages.pop(file_path, None)
+    
     def get_cache_hit_ratio(self) -> float:
         return self.buffer_cache.get_hit_ratio()
     
@@ -0,0 +1,55 @@
+import os
+import shutil
+from typing import Any, Dict, List, Optional, Union
+from api.schemas import CompressionType, StorageFormat
+from storage.storage_manager import StorageManager
+from storage.heap_file import HeapFile
+from storage.column_store import ColumnStore
+
+TableStorage = Union[HeapFile, ColumnStore]
+
+DATA_FILE_EXTENSIONS = {
+    StorageFormat.HEAP: ".dat",
+    StorageFormat.COLUMNAR: ".cols",
+}
+
+
+def data_file_name(table_key: str, storage_format: StorageFormat) -> str:
+    return f"{table_key}{DATA_FILE_EXTENSIONS[StorageFormat(storage_format)]}"
+
+
+def create_table_storage(storage_format: StorageFormat, data_file: str, columns: List[Dict[str, Any]],
+                         storage_manager: StorageManager,
+                         compression: CompressionType = CompressionType.NONE) -> TableStorage:
+    """Build the storage object for a table in the given format"""
+    if StorageFormat(storage_format) == StorageFormat.COLUMNAR:
+        return ColumnStore(data_file, columns, compression)
+    return HeapFile(data_file, columns, storage_manager, compression=compression)
+
+
+def open_table_storage(table_metadata: Dict[str, Any], storage_manager: StorageManager) -> Optional[TableStorage]:
+    """Return the storage of a table, or None for tables in the legacy JSON format"""
+    storage_format = table_metadata.get("storage_format")
+    if storage_format is None:
+        return None
+    return create_table_storage(storage_format, table_metadata["data_file"], table_metadata["columns"], storage_manager,
+                                table_metadata.get("compression", CompressionType.NONE))
+
+
+def position_count(table_metadata: Dict[str, Any]) -> int:
+    """Row positions in use: live rows plus deleted rows that were not vacuumed yet.
+
+    Appended rows take the positions from here on, which is what the indices store.
+    """
+    return table_metadata["row_count"] + table_metadata.get("dead_rows", 0)
+
+
+def remove_table_storage(data_file: str):
+    if os.path.isdir(data_file):
+        shutil.rmtree(data_file)
+    elif os.path.exists(data_file):
+        os.remove(data_file)
+    # Sidecar files kept next to heap files
+    for suffix in (".pgdir", ".zmap"):
+        if os.path.exists(data_file + suffix):
+            os.remove(data_file + suffix)
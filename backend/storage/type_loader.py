@@ -0,0 +1,27 @@
+import os
+import importlib.util
+
+# El paquete backend/types queda oculto por el modulo "types" de la libreria
+# estandar, asi que "from types.type_system import TypeSystem" nunca resuelve.
+# Lo cargamos por ruta, igual que IndexInterface carga las implementaciones de indices.
+_TYPE_SYSTEM_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "types", "type_system.py"
+)
+
+_type_system_module = None
+
+
+def load_type_system_module():
+    """Load backend/types/type_system.py once and return the module"""
+    global _type_system_module
+    if _type_system_module is None:
+        spec = importlib.util.spec_from_file_location("type_system", _TYPE_SYSTEM_PATH)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        _type_system_module = module
+    return _type_system_module
+
+
+def get_type_system():
+    """Return a TypeSystem instance"""
+    return load_type_system_module().TypeSystem()
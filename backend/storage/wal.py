@@ -0,0 +1,234 @@
+import asyncio
+import os
+import struct
+import zlib
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Cabecera de cada registro: crc32 | lsn | txn | kind | len(path) | offset | len(data)
+# El crc cubre todo lo que sigue a la cabecera (incluidos path y data)
+RECORD_HEADER = struct.Struct('<IQQBHQI')
+
+RECORD_WRITE = 1   # image of a byte range of a data file
+RECORD_COMMIT = 2  # every write of the transaction is durable from here on
+
+LogRecord = Tuple[int, int, int, str, int, bytes]  # lsn, txn, kind, path, offset, data
+
+
+def encode_record(lsn: int, txn: int, kind: int, file_path: str, offset: int, data: bytes) -> bytes:
+    path = file_path.encode('utf-8')
+    body = RECORD_HEADER.pack(0, lsn, txn, kind, len(path), offset, len(data))[4:] + path + data
+    return struct.pack('<I', zlib.crc32(body)) + body
+
+
+class WriteAheadLog:
+    """Redo log shared by every table of the database.
+
+    DML statements log the page images they produce and only then stage the
+    pages in memory; the data files are written later by the checkpointer.
+    Statements that commit while a flush is being prepared share the same
+    fsync (group commit), so concurrent writers pay one disk sync per batch
+    instead of one per statement.
+    """
+
+    def __init__(self, path: str, commit_delay: float = 0.002):
+        self.path = path
+        self.commit_delay = commit_delay
+        self.last_lsn = 0
+        self.durable_lsn = 0
+        self.size = 0
+        self.fsync_count = 0
+        self._next_txn = 1
+        self._buffer: List[bytes] = []
+        self._waiters: List[Tuple[int, asyncio.Future]] = []
+        self._flush_task: Optional[asyncio.Task] = None
+        self._io_lock: Optional[asyncio.Lock] = None
+
+    def open(self):
+        """Create the log file if needed and continue numbering after its last record"""
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        if not os.path.exists(self.path):
+            open(self.path, 'wb').close()
+        for lsn, txn, _, _, _, _ in self.read_records():
+            self.last_lsn = max(self.last_lsn, lsn)
+            self._next_txn = max(self._next_txn, txn + 1)
+        self.durable_lsn = self.last_lsn
+        self.size = os.path.getsize(self.path)
+
+    def begin(self) -> int:
+        txn = self._next_txn
+        self._next_txn += 1
+        return txn
+
+    def log_write(self, txn: int, file_path: str, offset: int, data: bytes) -> int:
+        return self._append(txn, RECORD_WRITE, file_path, offset, data)
+
+    def log_commit(self, txn: int) -> int:
+        return self._append(txn, RECORD_COMMIT, "", 0, b'')
+
+    def _append(self, txn: int, kind: int, file_path: str, offset: int, data: bytes) -> int:
+        # Solo se encola en memoria: el registro llega a disco en el próximo flush
+        self.last_lsn += 1
+        record = encode_record(self.last_lsn, txn, kind, file_path, offset, data)
+        self._buffer.append(record)
+        self.size += len(record)
+        return self.last_lsn
+
+    async def wait_durable(self, lsn: int):
+        """Wait until every record up to lsn has been written and fsynced"""
+        if lsn <= self.durable_lsn:
+            return
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.append((lsn, future))
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_loop())
+        await future
+
+    async def flush(self):
+        await self.wait_durable(self.last_lsn)
+
+    def _lock(self) -> asyncio.Lock:
+        if self._io_lock is None:
+            self._io_lock = asyncio.Lock()
+        return self._io_lock
+
+    async def _flush_loop(self):
+        while self._waiters:
+            # Leave a short window for other statements to join this group
+            await asyncio.sleep(self.commit_delay)
+            async with self._lock():
+                batch, self._buffer = self._buffer, []
+                batch_lsn = self.last_lsn
+                try:
+                    if batch:
+                        await asyncio.to_thread(self._write_and_sync, b''.join(batch))
+                except Exception as e:
+                    waiters, self._waiters = self._waiters, []
+                    for _, future in waiters:
+                        if not future.done():
+                            future.set_exception(e)
+                    return
+            self.durable_lsn = batch_lsn
+            pending = []
+            for lsn, future in self._waiters:
+                if lsn <= batch_lsn:
+                    if not future.done():
+                        future.set_result(None)
+                else:
+                    pending.append((lsn, future))
+            self._waiters = pending
+
+    def _write_and_sync(self, data: bytes):
+        with open(self.path, 'ab') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        self.fsync_count += 1
+
+    def read_records(self) -> Iterator[LogRecord]:
+        """Yield the records of the log file, stopping at a torn or corrupt tail"""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'rb') as f:
+            content = f.read()
+        position = 0
+        while position + RECORD_HEADER.size <= len(content):
+            crc, lsn, txn, kind, path_len, offset, data_len = RECORD_HEADER.unpack_from(content, position)
+            end = position + RECORD_HEADER.size + path_len + data_len
+            if end > len(content) or zlib.crc32(content[position + 4:end]) != crc:
+                break
+            path_start = position + RECORD_HEADER.size
+            file_path = content[path_start:path_start + path_len].decode('utf-8')
+            yield lsn, txn, kind, file_path, offset, content[path_start + path_len:end]
+            position = end
+
+    def replay(self) -> Set[str]:
+        """Apply the writes of committed transactions to the data files.
+
+        Writes are full images, so replaying a record that already reached
+        the data file leaves it unchanged. Returns the paths that were touched.
+        """
+        records = list(self.read_records())
+        committed = {txn for _, txn, kind, _, _, _ in records if kind == RECORD_COMMIT}
+        touched: Set[str] = set()
+        handles: Dict[str, int] = {}
+        try:
+            for _, txn, kind, file_path, offset, data in records:
+                if kind != RECORD_WRITE or txn not in committed:
+                    continue
+                if file_path not in handles:
+                    if not os.path.exists(file_path):
+                        # The table was dropped after the write was logged
+                        continue
+                    handles[file_path] = os.open(file_path, os.O_RDWR)
+                os.pwrite(handles[file_path], data, offset)
+                touched.add(file_path)
+            for fd in handles.values():
+                os.fsync(fd)
+        finally:
+            for fd in handles.values():
+                os.close(fd)
+        return touched
+
+    async def truncate(self, upto_lsn: int):
+        """Drop the records up to upto_lsn, whose pages are already in the data files"""
+        async with self._lock():
+            kept = [record for record in self.read_records() if record[0] > upto_lsn]
+            temp_path = self.path + ".tmp"
+            with open(temp_path, 'wb') as f:
+                for record in kept:
+                    f.write(encode_record(*record))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, self.path)
+            self.size = os.path.getsize(self.path) + sum(len(record) for record in self._buffer)
+
+
+class Checkpointer:
+    """Background task that moves staged pages from memory to the data files.
+
+    Runs every interval seconds, or earlier when the log grows past
+    max_log_bytes, and truncates the log once the pages are synced.
+    """
+
+    def __init__(self, storage_manager, interval: float = 30.0, max_log_bytes: int = 16 * 1024 * 1024):
+        self.storage_manager = storage_manager
+        self.interval = interval
+        self.max_log_bytes = max_log_bytes
+        self.checkpoints = 0
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+
+    def start(self):
+        if self._task is None:
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def request(self):
+        """Ask for an early checkpoint (called when the log gets too large)"""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.storage_manager.checkpoint()
+                self.checkpoints += 1
+            except Exception:
+                logger.exception("Checkpoint failed")
@@ -0,0 +1,196 @@
+import base64
+import hashlib
+import json
+import os
+from contextlib import contextmanager
+from datetime import date, datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from api.schemas import DataType
+
+# Bloom filter por página: BLOOM_BITS bits y BLOOM_HASHES posiciones por valor
+BLOOM_BITS = 2048
+BLOOM_HASHES = 3
+NUMERIC_TYPES = {DataType.INT, DataType.FLOAT}
+ZONED_TYPES = {DataType.INT, DataType.FLOAT, DataType.DATE, DataType.VARCHAR}
+
+# Parsed sidecars, reused while the file on disk does not change
+_loaded: Dict[str, Tuple[Tuple[int, int], Dict[int, Dict[str, Any]]]] = {}
+
+
+def _bloom_positions(value: Any) -> List[int]:
+    # Text of the stored value, so a bloom miss means no row can match
+    digest = hashlib.blake2b(str(value).encode('utf-8'), digest_size=4 * BLOOM_HASHES).digest()
+    return [int.from_bytes(digest[i * 4:(i + 1) * 4], 'little') % BLOOM_BITS for i in range(BLOOM_HASHES)]
+
+
+def _normalize(value: Any, data_type: DataType) -> Any:
+    """Value as the heap file returns it after decoding"""
+    if data_type == DataType.INT:
+        return int(value)
+    if data_type == DataType.FLOAT:
+        return float(value)
+    if data_type == DataType.DATE:
+        if isinstance(value, (date, datetime)):
+            return value.strftime('%Y-%m-%d')
+        return str(value)[:10]
+    return str(value)
+
+
+class ZoneMap:
+    """Per-page min/max of every column of a heap file, plus optional bloom filters.
+
+    Kept in ``<data file>.zmap`` as JSON lines, one line per page version; the
+    last line of a page wins. Each entry remembers the slot count of the page
+    it describes, and is only trusted while the page still has that many
+    slots, so a stale entry can never hide matching rows.
+    """
+
+    def __init__(self, file_path: str, columns: List[Dict[str, Any]]):
+        self.path = file_path + ".zmap"
+        self.data_types = [DataType(col["data_type"]) for col in columns]
+        self.bloom_columns = [i for i, col in enumerate(columns) if col.get("bloom_filter")]
+
+    def exists(self) -> bool:
+        return os.path.exists(self.path)
+
+    def load(self) -> Dict[int, Dict[str, Any]]:
+        if not self.exists():
+            return {}
+        stat = os.stat(self.path)
+        signature = (stat.st_size, stat.st_mtime_ns)
+        cached = _loaded.get(self.path)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+        entries = {}
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    entries[entry["page"]] = entry
+        _loaded[self.path] = (signature, entries)
+        return entries
+
+    def new_entry(self, page_no: int) -> Dict[str, Any]:
+        width = len(self.data_types)
+        return {"page": page_no, "slots": 0, "min": [None] * width, "max": [None] * width, "bloom": {}}
+
+    def add_row(self, entry: Dict[str, Any], row: List[Any]):
+        """Count a row stored in a new slot of the page and widen the entry with it"""
+        entry["slots"] += 1
+        self.widen(entry, row)
+
+    def widen(self, entry: Dict[str, Any], row: List[Any]):
+        """Widen the entry of a page so it covers a row stored in it"""
+        for i, data_type in enumerate(self.data_types):
+            value = row[i]
+            if value is None or data_type not in ZONED_TYPES:
+                continue
+            value = _normalize(value, data_type)
+            if entry["min"][i] is None or value < entry["min"][i]:
+                entry["min"][i] = value
+            if entry["max"][i] is None or value > entry["max"][i]:
+                entry["max"][i] = value
+            if i in self.bloom_columns:
+                bits = bytearray(base64.b64decode(entry["bloom"].get(str(i), "")) or bytes(BLOOM_BITS // 8))
+                for position in _bloom_positions(value):
+                    bits[position // 8] |= 1 << (position % 8)
+                entry["bloom"][str(i)] = base64.b64encode(bytes(bits)).decode('ascii')
+
+    def append(self, entries: List[Dict[str, Any]]):
+        """Store new versions of some page entries"""
+        with open(self.path, 'a', encoding='utf-8') as f:
+            for entry in entries:
+                f.write(json.dumps(entry) + "\n")
+        # Demasiadas versiones viejas: reescribir quedándose con la última de cada página
+        if os.path.getsize(self.path) > 4096 and len(self.load()) * 2 + 16 < self._line_count():
+            self.write(list(self.load().values()))
+
+    def _line_count(self) -> int:
+        with open(self.path, 'rb') as f:
+            return sum(1 for _ in f)
+
+    def write(self, entries: List[Dict[str, Any]]):
+        with self.rewrite() as write_entry:
+            for entry in sorted(entries, key=lambda e: e["page"]):
+                write_entry(entry)
+
+    @contextmanager
+    def rewrite(self) -> Iterator[Callable[[Dict[str, Any]], None]]:
+        """Write a new zone map entry by entry; it replaces the current one when the block succeeds"""
+        temp_path = self.path + ".tmp"
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                yield lambda entry: f.write(json.dumps(entry) + "\n")
+        except BaseException:
+            os.remove(temp_path)
+            raise
+        os.replace(temp_path, self.path)
+        _loaded.pop(self.path, None)
+
+    def remove(self):
+        if self.exists():
+            os.remove(self.path)
+        _loaded.pop(self.path, None)
+
+    @staticmethod
+    def usable_conditions(conditions: List[Dict[str, Any]]) -> bool:
+        # Only conjunctions can discard a page because one predicate fails
+        return all(condition.get("logical_op") in (None, "AND") for condition in conditions)
+
+    def page_may_match(self, entry: Optional[Dict[str, Any]], slot_count: int,
+                       conditions: List[Tuple[int, str, Any]]) -> bool:
+        """False only when no row of the page can satisfy every (column, operator, value)"""
+        if entry is None or entry["slots"] != slot_count:
+            return True
+        for column_index, operator, value in conditions:
+            if not self._condition_may_match(entry, column_index, operator, value):
+                return False
+        return True
+
+    def _condition_may_match(self, entry: Dict[str, Any], column_index: int, operator: str, value: Any) -> bool:
+        data_type = self.data_types[column_index]
+        # "= NULL" matches the NULL rows, which the zones do not track
+        if data_type not in ZONED_TYPES or value is None or str(value) == "None" or operator == "!=":
+            return True
+        low, high = entry["min"][column_index], entry["max"][column_index]
+        if low is None:
+            # Solo NULLs en la página: ninguna comparación puede ser verdadera
+            return False
+
+        if operator == "=":
+            bloom = entry["bloom"].get(str(column_index))
+            if bloom is not None:
+                bits = base64.b64decode(bloom)
+                try:
+                    # Hashed as the stored value: 5.0 against an INT column is 5
+                    positions = _bloom_positions(_normalize(value, data_type))
+                except (TypeError, ValueError):
+                    positions = []
+                if not all(bits[p // 8] & (1 << (p % 8)) for p in positions):
+                    return False
+        try:
+            if operator == "BETWEEN":
+                start, end = value
+                start, end = self._comparable(start, data_type), self._comparable(end, data_type)
+                return not (end < low or start > high)
+            value = self._comparable(value, data_type)
+        except (TypeError, ValueError):
+            return True
+        if operator == "=":
+            return low <= value <= high
+        if operator == "<":
+            return low < value
+        if operator == "<=":
+            return low <= value
+        if operator == ">":
+            return high > value
+        if operator == ">=":
+            return high >= value
+        return True
+
+    @staticmethod
+    def _comparable(value: Any, data_type: DataType) -> Any:
+        # Values arrive converted to the column type (query.predicates.literal_converter)
+        if data_type in NUMERIC_TYPES:
+            return float(value)
+        return str(value)
@@ -1,9 +1,22 @@
 import json
 import struct
-from typing import Any, Union, List, Dict, Optional, Tuple
+from array import array
+from itertools import accumulate
+from typing import Any, Callable, Union, List, Dict, Optional, Tuple
 from datetime import datetime, date
 from enum import Enum
 from api.schemas import DataType
+from utils.date_formats import ISO_DATE, ISO_DATETIME, get_date_parser
+
+# Dates reach the serializer normalized to ISO text
+STORED_DATE_PARSER = get_date_parser(ISO_DATE, (ISO_DATE, ISO_DATETIME))
+
+# First byte of a RowCodec record. serialize_row records start with a NULL
+# marker (0 or 1), so both formats can live in the same file
+ROW_FORMAT = 2
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+# Fixed-width slot of each type in a RowCodec record (DATE: days since 1970-01-01)
+FIXED_FORMATS = {DataType.INT: 'q', DataType.FLOAT: 'd', DataType.DATE: 'i'}
 
 class TypeSystem:
     """Enhanced type system for data serialization and validation"""
@@ -50,7 +63,44 @@ class TypeSystem:
             raise ValueError(f"No deserializer for type {data_type}")
         
         return deserializer(data[1:])
-    
+
+    def serialize_row(self, row: List[Any], data_types: List[DataType]) -> bytes:
+        """Serialize a full row as the concatenation of its serialized values"""
+        if len(row) != len(data_types):
+            raise ValueError(f"Expected {len(data_types)} values, got {len(row)}")
+        return b''.join(self.serialize_value(value, data_type) for value, data_type in zip(row, data_types))
+
+    def deserialize_row(self, data: bytes, data_types: List[DataType]) -> List[Any]:
+        """Deserialize a row written by serialize_row"""
+        row = []
+        offset = 0
+        for data_type in data_types:
+            size = 1 + self._encoded_size(data, offset, data_type)
+            row.append(self.deserialize_value(data[offset:offset + size], data_type))
+            offset += size
+        return row
+
+    def row_codec(self, data_types: List[DataType]) -> 'RowCodec':
+        """Compiled codec of a table schema, shared by every table with the same column types"""
+        key = tuple(DataType(data_type) for data_type in data_types)
+        codec = _row_codecs.get(key)
+        if codec is None:
+            codec = _row_codecs[key] = RowCodec(list(key), self)
+        return codec
+
+    def _encoded_size(self, data: bytes, offset: int, data_type: DataType) -> int:
+        """Size of the serialized payload starting at offset (NULL marker excluded)"""
+        if data[offset:offset + 1] == b'\x00':
+            return 0
+        payload = offset + 1
+        if data_type in (DataType.INT, DataType.FLOAT, DataType.DATE):
+            return 8
+        elif data_type == DataType.VARCHAR:
+            return 4 + struct.unpack_from('<I', data, payload)[0]
+        elif data_type == DataType.ARRAY_FLOAT:
+            return 4 + struct.unpack_from('<I', data, payload)[0] * 8
+        raise ValueError(f"No deserializer for type {data_type}")
+
     def _serialize_int(self, value: int) -> bytes:
         return struct.pack('<q', int(value))  # 8-byte signed integer
     
@@ -65,14 +115,8 @@ class TypeSystem:
     
     def _serialize_date(self, value: Union[str, date, datetime]) -> bytes:
         if isinstance(value, str):
-            # Parse string to date
-            try:
-                dt = datetime.strptime(value, '%Y-%m-%d')
-            except ValueError:
-                try:
-                    dt = datetime.strptime(value, '%Y-%m-%d %H:%M:%S')
-                except ValueError:
-                    raise ValueError(f"Invalid date format: {value}")
+            # Parse string to date (stored dates are ISO: fast path first)
+            dt = STORED_DATE_PARSER.parse(value)
         elif isinstance(value, datetime):
             dt = value
         elif isinstance(value, date):
@@ -96,7 +140,7 @@ class TypeSystem:
     
     def _deserialize_varchar(self, data: bytes) -> str:
         length = struct.unpack('<I', data[:4])[0]
-        return data[4:4+length].decode('utf-8')
+        return str(data[4:4+length], 'utf-8')  # also accepts memoryview slices
     
     def _serialize_array_float(self, value: Union[List[float], str]) -> bytes:
         if isinstance(value, str):
@@ -149,20 +193,19 @@ class TypeSystem:
         else:
             return -1
     
-    def convert_for_comparison(self, value1: Any, value2: Any, data_type: DataType) -> Tuple[Any, Any]:
-        """Convert values to comparable types"""
+    def convert_for_comparison(self, value1: Any, value2: Any, data_type: DataType,
+                               date_format: Optional[str] = None) -> Tuple[Any, Any]:
+        """Convert values to comparable types. date_format is the detected format of a DATE column"""
         if data_type == DataType.INT:
             return int(value1), int(value2)
         elif data_type == DataType.FLOAT:
             return float(value1), float(value2)
         elif data_type == DataType.DATE:
             # Convert to datetime objects for comparison
+            parser = get_date_parser(date_format)
             def parse_date(val):
                 if isinstance(val, str):
-                    try:
-                        return datetime.strptime(val, '%Y-%m-%d')
-                    except ValueError:
-                        return datetime.strptime(val, '%Y-%m-%d %H:%M:%S')
+                    return parser.parse(val)
                 return val
             return parse_date(value1), parse_date(value2)
         elif data_type == DataType.VARCHAR:
@@ -207,3 +250,142 @@ class TypeSystem:
                 return str(value)
         else:
             return str(value)
+
+
+def _date_to_days(value: Union[str, date, datetime]) -> int:
+    if isinstance(value, str):
+        value = STORED_DATE_PARSER.parse(value)
+    elif not isinstance(value, date):
+        raise ValueError(f"Cannot serialize date from type {type(value)}")
+    return value.toordinal() - EPOCH_ORDINAL
+
+
+def _days_to_date(days: int) -> str:
+    return date.fromordinal(days + EPOCH_ORDINAL).isoformat()
+
+
+def _encode_varchar(value: Any) -> bytes:
+    return str(value).encode('utf-8')
+
+
+def _decode_varchar(data) -> str:
+    return str(data, 'utf-8')
+
+
+def _encode_array_float(value: Union[List[float], str]) -> bytes:
+    if isinstance(value, str):
+        value = value.strip().strip('[]')
+        value = [x for x in value.split(',') if x.strip()]
+    elif not isinstance(value, (list, tuple)):
+        raise ValueError(f"Cannot serialize array from type {type(value)}")
+    return array('d', [float(x) for x in value]).tobytes()
+
+
+def _decode_array_float(data) -> List[float]:
+    values = array('d')
+    values.frombytes(data)
+    return values.tolist()
+
+
+_FIXED_ENCODERS: Dict[DataType, Callable[[Any], Any]] = {
+    DataType.INT: int, DataType.FLOAT: float, DataType.DATE: _date_to_days,
+}
+_FIXED_DECODERS: Dict[DataType, Optional[Callable[[Any], Any]]] = {
+    DataType.INT: None, DataType.FLOAT: None, DataType.DATE: _days_to_date,
+}
+_VARIABLE_CODERS = {
+    DataType.VARCHAR: (_encode_varchar, _decode_varchar),
+    DataType.ARRAY_FLOAT: (_encode_array_float, _decode_array_float),
+}
+
+_row_codecs: Dict[Tuple[DataType, ...], 'RowCodec'] = {}
+
+
+class RowCodec:
+    """Row format compiled once per table schema.
+
+    A record is one struct.Struct header followed by the variable-length bytes:
+
+    - format byte (ROW_FORMAT) and a null bitmap, one bit per column
+    - one fixed-width slot per INT/FLOAT/DATE column (0 when NULL)
+    - one uint32 end offset per VARCHAR/ARRAY[FLOAT] column, relative to the
+      end of the header; the value runs from the previous end to its own
+
+    so a row is packed and unpacked with a single struct call. Records in
+    the older serialize_row format are still decoded.
+    """
+
+    def __init__(self, data_types: List[DataType], type_system: TypeSystem):
+        self.data_types = data_types
+        self.type_system = type_system
+        self.width = len(data_types)
+        self.bitmap_size = (self.width + 7) // 8
+        self.fixed = [(i, _FIXED_ENCODERS[t], _FIXED_DECODERS[t]) for i, t in enumerate(data_types) if t in FIXED_FORMATS]
+        self.variable = [(i,) + _VARIABLE_CODERS[t] for i, t in enumerate(data_types) if t in _VARIABLE_CODERS]
+        if len(self.fixed) + len(self.variable) != self.width:
+            unsupported = [t for t in data_types if t not in FIXED_FORMATS and t not in _VARIABLE_CODERS]
+            raise ValueError(f"No serializer for type {unsupported[0]}")
+        self.header = struct.Struct(
+            f"<B{self.bitmap_size}s" + "".join(FIXED_FORMATS[data_types[i]] for i, _, _ in self.fixed)
+            + "I" * len(self.variable)
+        )
+        self._fixed_count = len(self.fixed)
+
+    def encode(self, row: List[Any]) -> bytes:
+        if len(row) != self.width:
+            raise ValueError(f"Expected {self.width} values, got {len(row)}")
+        null_bits = 0
+        for i, value in enumerate(row):
+            if value is None:
+                null_bits |= 1 << i
+        fixed = [0 if row[i] is None else encode(row[i]) for i, encode, _ in self.fixed]
+        chunks = [b'' if row[i] is None else encode(row[i]) for i, encode, _ in self.variable]
+        return self.header.pack(
+            ROW_FORMAT, null_bits.to_bytes(self.bitmap_size, 'little'), *fixed, *accumulate(map(len, chunks))
+        ) + b''.join(chunks)
+
+    def decode(self, record) -> List[Any]:
+        """Decode a record (bytes or a memoryview slice of a page)"""
+        if record[0] != ROW_FORMAT:
+            return self.type_system.deserialize_row(record, self.data_types)
+        header = self.header.unpack_from(record, 0)
+        null_bits = int.from_bytes(header[1], 'little')
+        row = [None] * self.width
+        for (i, _, decode), value in zip(self.fixed, header[2:]):
+            if not null_bits >> i & 1:
+                row[i] = decode(value) if decode is not None else value
+        base = start = self.header.size
+        for (i, _, decode), end in zip(self.variable, header[2 + self._fixed_count:]):
+            end += base
+            if not null_bits >> i & 1:
+                row[i] = decode(record[start:end])
+            start = end
+        return row
+
+    def decode_many(self, records) -> List[List[Any]]:
+        """Decode a batch of records.
+
+        When the schema has only fixed-width columns every record is exactly
+        one header, so the batch is joined and unpacked with iter_unpack.
+        Records with NULLs or in the older format take the per-row path.
+        """
+        records = list(records)
+        decode = self.decode
+        if self.variable or not records:
+            return [decode(record) for record in records]
+        buffer = b''.join(records)
+        if len(buffer) != self.header.size * len(records):
+            return [decode(record) for record in records]
+        no_nulls = bytes(self.bitmap_size)
+        decoders = [decoder for _, _, decoder in self.fixed]
+        plain = not any(decoders)
+        rows = []
+        for record, header in zip(records, self.header.iter_unpack(buffer)):
+            if header[0] != ROW_FORMAT or header[1] != no_nulls:
+                rows.append(decode(record))
+            elif plain:
+                rows.append(list(header[2:]))
+            else:
+                rows.append([value if decoder is None else decoder(value)
+                             for decoder, value in zip(decoders, header[2:])])
+        return rows
@@ -0,0 +1,116 @@
+import re
+from datetime import date, datetime
+from functools import lru_cache
+from typing import Callable, Iterable, List, Optional, Sequence
+
+ISO_DATE = '%Y-%m-%d'
+ISO_DATETIME = '%Y-%m-%d %H:%M:%S'
+# Formatos aceptados para columnas DATE, en orden de preferencia
+DATE_FORMATS = (ISO_DATE, '%d/%m/%Y', '%m/%d/%Y', ISO_DATETIME)
+# Values inspected per column when detecting its format
+DETECTION_SAMPLE_SIZE = 1000
+
+_TEMPLATE_FIELDS = {
+    'Y': ('year', r'\d{4}'),
+    'm': ('month', r'\d{2}'),
+    'd': ('day', r'\d{2}'),
+    'H': ('hour', r'\d{2}'),
+    'M': ('minute', r'\d{2}'),
+    'S': ('second', r'\d{2}'),
+}
+
+
+def _compile_template(date_format: str) -> Optional[Callable[[str], datetime]]:
+    """Regex-based parser for formats made only of %Y %m %d %H %M %S and literal text.
+
+    It only takes zero-padded fields, which is what almost every file holds;
+    anything else is left to strptime.
+    """
+    pattern = ''
+    fields = []
+    for token in re.split(r'(%.)', date_format):
+        if token.startswith('%'):
+            if token[1:] not in _TEMPLATE_FIELDS:
+                return None
+            name, regex = _TEMPLATE_FIELDS[token[1:]]
+            pattern += f'({regex})'
+            fields.append(name)
+        else:
+            pattern += re.escape(token)
+    matcher = re.compile(pattern).fullmatch
+
+    def parse(value: str) -> datetime:
+        match = matcher(value)
+        if match is None:
+            raise ValueError(f"{value!r} does not match {date_format}")
+        return datetime(**{name: int(group) for name, group in zip(fields, match.groups())})
+
+    return parse
+
+
+def _parse_iso_date(value: str) -> datetime:
+    # fromisoformat also takes forms strptime rejects (20240105, 2024-W01-1): check the shape first
+    if len(value) != 10 or value[4] != '-' or value[7] != '-':
+        raise ValueError(f"{value!r} is not YYYY-MM-DD")
+    return datetime.combine(date.fromisoformat(value), datetime.min.time())
+
+
+class DateParser:
+    """Parses dates with the format detected for a column, falling back to the other formats.
+
+    The detected format is tried first with a precompiled parser; strptime
+    only runs for values that do not match it.
+    """
+
+    def __init__(self, date_format: Optional[str] = None, formats: Sequence[str] = DATE_FORMATS):
+        self.date_format = date_format or formats[0]
+        self.formats = [self.date_format] + [fmt for fmt in formats if fmt != self.date_format]
+        self._fast_parse = _parse_iso_date if self.date_format == ISO_DATE else _compile_template(self.date_format)
+
+    def parse(self, value: str) -> datetime:
+        if self._fast_parse is not None:
+            try:
+                return self._fast_parse(value)
+            except ValueError:
+                pass
+        for fmt in self.formats:
+            try:
+                return datetime.strptime(value, fmt)
+            except ValueError:
+                continue
+        raise ValueError(f"Invalid date format: {value}")
+
+    def to_iso(self, value: str) -> str:
+        """Normalize a date to the YYYY-MM-DD text stored in tables"""
+        return self.parse(value).date().isoformat()
+
+
+@lru_cache(maxsize=64)
+def get_date_parser(date_format: Optional[str] = None, formats: Sequence[str] = DATE_FORMATS) -> DateParser:
+    return DateParser(date_format, tuple(formats))
+
+
+def detect_date_format(values: Iterable[str], formats: Sequence[str] = DATE_FORMATS) -> Optional[str]:
+    """Format that parses the most sampled values; earlier formats win ties. None without values"""
+    sample: List[str] = []
+    for value in values:
+        if value is not None and str(value).strip():
+            sample.append(str(value))
+            if len(sample) == DETECTION_SAMPLE_SIZE:
+                break
+    if not sample:
+        return None
+    best_format, best_count = None, 0
+    for fmt in formats:
+        count = 0
+        for value in sample:
+            try:
+                datetime.strptime(value, fmt)
+                count += 1
+            except ValueError:
+                pass
+        if count > best_count:
+            best_format, best_count = fmt, count
+        if count == len(sample):
+            break
+    return best_format
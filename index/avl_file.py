@@ -119,6 +119,39 @@ class AVLFile:
             f.write(record_json + "\n")
         return pos
 
+    def _append_many_to_data_file(self, records: list) -> list[int]:
+        positions = []
+        with open(self.data_file, "a", encoding="utf-8") as f:
+            for record_data in records:
+                positions.append(f.tell())
+                f.write(json.dumps(record_data) + "\n")
+        return positions
+
+    def _read_many_from_data_file(self, positions: list) -> list[dict]:
+        records = []
+        with open(self.data_file, "r", encoding="utf-8") as f:
+            for position in positions:
+                f.seek(position)
+                line = f.readline()
+                if line:
+                    records.append(json.loads(line.strip()))
+        return records
+
+    def insert_many(self, records: list) -> int:
+        """Inserta en lote pares (clave, registro) y guarda el indice una sola vez.
+
+        Una clave que ya existe pasa a apuntar a su nuevo registro.
+        """
+        positions = self._append_many_to_data_file([record_data for _, record_data in records])
+        for (key, _), position in zip(records, positions):
+            node = self._search_node(self.root, key)
+            if node:
+                node.position = position
+            else:
+                self.root = self._insert_node(self.root, key, position)
+        self._save_index()
+        return len(records)
+
     def search(self, key) -> dict | None:
         node = self._search_node(self.root, key)
         if node:
@@ -167,12 +200,7 @@ class AVLFile:
     def range_search(self, start_key, end_key) -> list[dict]:
         results_positions = []
         self._range_search(self.root, start_key, end_key, results_positions)
-        records = []
-        for pos in results_positions:
-            record = self._read_from_data_file(pos)
-            if record:
-                records.append(record)
-        return records
+        return self._read_many_from_data_file(results_positions)
 
     def _range_search(self, node, start_key, end_key, positions_list):
         if not node:
@@ -34,6 +34,14 @@ class BPlusTreeLeaf(BPlusTreeNode):
         self.keys.insert(idx, key)
         self.positions.insert(idx, position)
 
+    def __getstate__(self):
+        # Los enlaces entre hojas se reconstruyen al cargar; pickle los recorreria
+        # recursivamente y excede el limite de recursion con muchas hojas
+        state = self.__dict__.copy()
+        state["next_leaf"] = None
+        state["prev_leaf"] = None
+        return state
+
     def delete(self, key):
         try:
             idx = self.keys.index(key)
@@ -85,12 +93,26 @@ class BPlusTreeFile:
                     print(f"Warning: el 'order' ({self.order}) al inicializar B+ Tree File difiere del 'order' ({persisted_order}) en el archivo de indice '{self.index_file}', se usara el 'order' del archivo de indice")
                     self.order = persisted_order
                 self.root = persisted_root
+                self._link_leaves()
             except Exception as e:
                 print(f"Error: no se pudo cargar el archivo de indice B+ Tree '{self.index_file}'. Error: {e}.")
                 self.root = BPlusTreeLeaf()
         else:
             self.root = BPlusTreeLeaf()
 
+    def _link_leaves(self):
+        leaves = []
+        pending = [self.root]
+        while pending:
+            node = pending.pop()
+            if node.is_leaf():
+                leaves.append(node)
+            else:
+                pending.extend(reversed(node.children))
+        for left, right in zip(leaves, leaves[1:]):
+            left.next_leaf = right
+            right.prev_leaf = left
+
     def _append_to_data_file(self, record_data: dict) -> int:
         record_json = json.dumps(record_data)
         with open(self.data_file, "a", encoding="utf-8") as f:
@@ -98,6 +120,24 @@ class BPlusTreeFile:
             f.write(record_json + "\n")
         return pos
 
+    def _append_many_to_data_file(self, records: list) -> list[int]:
+        positions = []
+        with open(self.data_file, "a", encoding="utf-8") as f:
+            for record_data in records:
+                positions.append(f.tell())
+                f.write(json.dumps(record_data) + "\n")
+        return positions
+
+    def _read_many_from_data_file(self, positions: list) -> list[dict]:
+        records = []
+        with open(self.data_file, "r", encoding="utf-8") as f:
+            for position in positions:
+                f.seek(position)
+                line = f.readline()
+                if line:
+                    records.append(json.loads(line.strip()))
+        return records
+
     def _read_from_data_file(self, position: int) -> dict | None:
         try:
             with open(self.data_file, "r", encoding="utf-8") as f:
@@ -149,6 +189,26 @@ class BPlusTreeFile:
             self._split_node(leaf)
         self._save_index()
 
+    def insert_many(self, records: list) -> int:
+        """Inserta en lote pares (clave, registro) y guarda el indice una sola vez.
+
+        Una clave que ya existe pasa a apuntar a su nuevo registro.
+        """
+        if self.root is None:
+            self.root = BPlusTreeLeaf()
+        positions = self._append_many_to_data_file([record_data for _, record_data in records])
+        for (key, _), position in zip(records, positions):
+            leaf = self._find_leaf(key)
+            idx = bisect_left(leaf.keys, key)
+            if idx < len(leaf.keys) and leaf.keys[idx] == key:
+                leaf.positions[idx] = position
+                continue
+            leaf.insert(key, position)
+            if leaf.is_full(self.order):
+                self._split_node(leaf)
+        self._save_index()
+        return len(records)
+
     def _split_node(self, node):
         mid_idx = self.order // 2
 
@@ -317,21 +377,19 @@ class BPlusTreeFile:
         del parent.children[parent_key_idx_between_nodes + 1]
 
     def range_search(self, start_key, end_key) -> list[dict]:
-        results = []
         if self.root is None or (self.root.is_leaf() and not self.root.keys):
-            return results
+            return []
 
+        positions = []
         leaf = self._find_leaf(start_key)
         while leaf:
             for i, key_in_leaf in enumerate(leaf.keys):
                 if key_in_leaf > end_key:
-                    return results
+                    return self._read_many_from_data_file(positions)
                 if key_in_leaf >= start_key:
-                    record = self._read_from_data_file(leaf.positions[i])
-                    if record:
-                        results.append(record)
+                    positions.append(leaf.positions[i])
             leaf = leaf.next_leaf
-        return results
+        return self._read_many_from_data_file(positions)
 
     def compact_data_file(self):
         print(f"Iniciando compactacion para '{self.data_file}' y su indice B+ Tree '{self.index_file}'...")
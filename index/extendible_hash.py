@@ -107,6 +107,14 @@ class DynamicHashFile:
             f.write(record_json + "\n")
         return pos
 
+    def _append_many_to_data_file(self, records: list) -> list[int]:
+        positions = []
+        with open(self.data_file, "a", encoding="utf-8") as f:
+            for record_data in records:
+                positions.append(f.tell())
+                f.write(json.dumps(record_data) + "\n")
+        return positions
+
     def _read_from_data_file(self, position: int) -> dict | None:
         try:
             with open(self.data_file, "r", encoding="utf-8") as f:
@@ -132,16 +140,27 @@ class DynamicHashFile:
             return
 
         position = self._append_to_data_file(record_data)
-
-        key_to_insert = key
-        pos_to_insert = position
-
+        self._insert_position(key, position)
+        self._save_index()
+
+    def insert_many(self, records: list) -> int:
+        """Inserta en lote pares (clave, registro) y guarda el indice una sola vez.
+
+        Una clave que ya existe pasa a apuntar a su nuevo registro.
+        """
+        positions = self._append_many_to_data_file([record_data for _, record_data in records])
+        for (key, _), position in zip(records, positions):
+            if not self._get_bucket_from_key(key).update_position(key, position):
+                self._insert_position(key, position)
+        self._save_index()
+        return len(records)
+
+    def _insert_position(self, key_to_insert, pos_to_insert):
         while True:
             bucket_for_key = self._get_bucket_from_key(key_to_insert)
 
             if not bucket_for_key.is_full():
                 bucket_for_key.insert(key_to_insert, pos_to_insert)
-                self._save_index()
                 return
 
             if bucket_for_key.local_depth == self.global_depth:
@@ -152,9 +171,10 @@ class DynamicHashFile:
 
     def _double_directory(self):
         new_directory = {}
+        # Las claves del directorio son prefijos del hash: el bit nuevo va al final
         for dir_hash_prefix, bucket_ptr in self.directory.items():
-            new_directory["0" + dir_hash_prefix] = bucket_ptr
-            new_directory["1" + dir_hash_prefix] = bucket_ptr
+            new_directory[dir_hash_prefix + "0"] = bucket_ptr
+            new_directory[dir_hash_prefix + "1"] = bucket_ptr
         self.global_depth += 1
         self.directory = new_directory
 
@@ -11,6 +11,34 @@ ISAM_DATA_FILE = "isam_data.jsonl"
 ISAM_INDEX_FILE = "isam_index.pkl"
 ISAM_META_FILE = "isam_meta.pkl"
 
+
+class MaxKey:
+    """Clave centinela mayor que cualquier otra (numeros, textos, fechas)"""
+
+    def __lt__(self, other):
+        return False
+
+    def __le__(self, other):
+        return isinstance(other, MaxKey)
+
+    def __gt__(self, other):
+        return not isinstance(other, MaxKey)
+
+    def __ge__(self, other):
+        return True
+
+    def __eq__(self, other):
+        return isinstance(other, MaxKey)
+
+    def __hash__(self):
+        return hash(MaxKey)
+
+    def __repr__(self):
+        return "MaxKey"
+
+
+MAX_KEY = MaxKey()
+
 class ISAMPage:
     def __init__(self):
         self.entries = []
@@ -89,6 +117,24 @@ class ISAMFile:
             f.write(record_json + "\n")
         return pos
 
+    def _append_many_to_data_file(self, records: list) -> list[int]:
+        positions = []
+        with open(self.data_file, "a", encoding="utf-8") as f:
+            for record_data in records:
+                positions.append(f.tell())
+                f.write(json.dumps(record_data) + "\n")
+        return positions
+
+    def _read_many_from_data_file(self, positions: list) -> list[dict]:
+        records = []
+        with open(self.data_file, "r", encoding="utf-8") as f:
+            for position in positions:
+                f.seek(position)
+                line = f.readline()
+                if line:
+                    records.append(json.loads(line.strip()))
+        return records
+
     def _read_from_data_file(self, position: int) -> dict | None:
         try:
             with open(self.data_file, "r", encoding="utf-8") as f:
@@ -127,10 +173,10 @@ class ISAMFile:
             self.data_pages = [ISAMDataPage()]
             self.overflow_pages = []
             l1_page = ISAMIndexPage()
-            l1_page.entries.append((float('inf'), 0))
+            l1_page.entries.append((MAX_KEY, 0))
             self.index_pages = [l1_page]
             root_page = ISAMIndexPage()
-            root_page.entries.append((float('inf'), 0))
+            root_page.entries.append((MAX_KEY, 0))
             self.index_pages.append(root_page)
             self.root_ptr = 1
 
@@ -180,36 +226,63 @@ class ISAMFile:
             return
 
         position = self._append_to_data_file(record_data)
+        self._insert_position(key, position)
+        self._save_all()
+
+    def insert_many(self, records: list) -> int:
+        """Inserta en lote pares (clave, registro) y guarda el indice una sola vez.
+
+        Una clave que ya existe pasa a apuntar a su nuevo registro.
+        """
+        positions = self._append_many_to_data_file([record_data for _, record_data in records])
+        for (key, _), position in zip(records, positions):
+            if not self._update_position(key, position):
+                self._insert_position(key, position)
+        self._save_all()
+        return len(records)
+
+    def _insert_position(self, key, position):
         data_ptr = self._find_data_page_ptr(key)
         data_page = self._get_page(data_ptr, 'data')
 
         if not data_page.is_full(self.data_bf):
             data_page.insert(key, position)
-            print(f"Clave {key} insertada en DataPage {data_ptr}")
-        else:
-            print(f"DataPage {data_ptr} llena, usando overflow para {key}")
-            ov_ptr = data_page.overflow_ptr
-            if ov_ptr is None:
-                op = ISAMOverflowPage()
+            return
+        ov_ptr = data_page.overflow_ptr
+        if ov_ptr is None:
+            op = ISAMOverflowPage()
+            op.insert(key, position)
+            data_page.overflow_ptr = self._add_page(op, 'overflow')
+            return
+        while True:
+            op = self._get_page(ov_ptr, 'overflow')
+            if not op.is_full(self.data_bf):
                 op.insert(key, position)
-                new_ov_ptr = self._add_page(op, 'overflow')
-                data_page.overflow_ptr = new_ov_ptr
-            else:
-                while True:
-                    op = self._get_page(ov_ptr, 'overflow')
-                    if not op.is_full(self.data_bf):
-                        op.insert(key, position)
-                        break
-                    elif op.next_overflow_ptr is None:
-                        new_op = ISAMOverflowPage()
-                        new_op.insert(key, position)
-                        new_ov_ptr = self._add_page(new_op, 'overflow')
-                        op.next_overflow_ptr = new_ov_ptr
-                        break
-                    else:
-                        ov_ptr = op.next_overflow_ptr
+                return
+            if op.next_overflow_ptr is None:
+                new_op = ISAMOverflowPage()
+                new_op.insert(key, position)
+                op.next_overflow_ptr = self._add_page(new_op, 'overflow')
+                return
+            ov_ptr = op.next_overflow_ptr
 
-        self._save_all()
+    def _update_position(self, key, new_position) -> bool:
+        for page in self._chain_pages(self._find_data_page_ptr(key)):
+            for i, (k, _) in enumerate(page.entries):
+                if k == key:
+                    page.entries[i] = (k, new_position)
+                    return True
+        return False
+
+    def _chain_pages(self, data_ptr):
+        """Pagina de datos y sus paginas de overflow, en orden"""
+        page = self._get_page(data_ptr, 'data')
+        yield page
+        ov_ptr = page.overflow_ptr
+        while ov_ptr is not None:
+            page = self._get_page(ov_ptr, 'overflow')
+            yield page
+            ov_ptr = page.next_overflow_ptr
 
     def search(self, key) -> dict | None:
         try:
@@ -234,6 +307,24 @@ class ISAMFile:
 
         return None
 
+    def range_search(self, start_key, end_key) -> list[dict]:
+        """Registros con clave entre start_key y end_key, en orden de clave.
+
+        Solo se recorren las paginas de datos (y su overflow) que cubren el rango.
+        """
+        try:
+            first_ptr = self._find_data_page_ptr(start_key)
+            last_ptr = self._find_data_page_ptr(end_key)
+        except RuntimeError:
+            print("Error buscando la pagina, es posible que el indice este vacio o dañado")
+            return []
+
+        entries = []
+        for data_ptr in range(first_ptr, last_ptr + 1):
+            for page in self._chain_pages(data_ptr):
+                entries.extend(entry for entry in page.entries if start_key <= entry[0] <= end_key)
+        return self._read_many_from_data_file([position for _, position in sorted(entries)])
+
     def delete(self, key):
         data_ptr = self._find_data_page_ptr(key)
         data_page = self._get_page(data_ptr, 'data')
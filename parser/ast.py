@@ -95,16 +95,30 @@ class ColumnDef:
 class Stmt:
     pass
 
+class OrderBy:
+    def __init__(self, column, descending=False):
+        self.column = column
+        self.descending = descending
+    
+    def __str__(self):
+        return f"{self.column} DESC" if self.descending else str(self.column)
+
 class SelectStmt(Stmt):
-    def __init__(self, columns, table_name, where=None):
+    def __init__(self, columns, table_name, where=None, order_by=None, limit=None):
         self.columns = columns
         self.table_name = table_name
         self.where = where
+        self.order_by = order_by
+        self.limit = limit
     
     def __str__(self):
         result = f"SELECT {', '.join(str(c) for c in self.columns)} FROM {self.table_name}"
         if self.where:
             result += f" WHERE {self.where}"
+        if self.order_by:
+            result += f" ORDER BY {self.order_by}"
+        if self.limit is not None:
+            result += f" LIMIT {self.limit}"
         return result
 
 class CreateTableStmt(Stmt):
@@ -124,15 +138,33 @@ class DropTableStmt(Stmt):
         return f"DROP TABLE {self.table_name}"
 
 class InsertStmt(Stmt):
-    def __init__(self, table_name, columns, values):
+    def __init__(self, table_name, columns, values, rows=None, select=None):
         self.table_name = table_name
         self.columns = columns
+        # values is the first row; rows holds every row of VALUES (a, b), (c, d)
         self.values = values
+        self.rows = rows if rows is not None else ([values] if values is not None else [])
+        self.select = select
     
     def __str__(self):
         cols = f"({', '.join(str(c) for c in self.columns)})" if self.columns else ""
-        vals = ', '.join(str(v) for v in self.values)
-        return f"INSERT INTO {self.table_name}{cols} VALUES ({vals})"
+        if self.select is not None:
+            return f"INSERT INTO {self.table_name}{cols} {self.select}"
+        rows = ', '.join(f"({', '.join(str(v) for v in row)})" for row in self.rows)
+        return f"INSERT INTO {self.table_name}{cols} VALUES {rows}"
+
+class UpdateStmt(Stmt):
+    def __init__(self, table_name, assignments, where=None):
+        self.table_name = table_name
+        # List of (Identifier, value) pairs
+        self.assignments = assignments
+        self.where = where
+    
+    def __str__(self):
+        result = f"UPDATE {self.table_name} SET {', '.join(f'{c} = {v}' for c, v in self.assignments)}"
+        if self.where:
+            result += f" WHERE {self.where}"
+        return result
 
 class DeleteStmt(Stmt):
     def __init__(self, table_name, where=None):
@@ -157,6 +189,13 @@ class CreateIndexStmt(Stmt):
         cols = ', '.join(str(c) for c in self.columns)
         return f"CREATE INDEX {self.index_name} ON {self.table_name}{type_clause} ({cols})"
 
+class AnalyzeStmt(Stmt):
+    def __init__(self, table_name):
+        self.table_name = table_name
+    
+    def __str__(self):
+        return f"ANALYZE {self.table_name}"
+
 class DropIndexStmt(Stmt):
     def __init__(self, index_name):
         self.index_name = index_name
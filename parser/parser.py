@@ -4,6 +4,14 @@ from .ast import *
 class ParserError(Exception):
     pass
 
+# Keywords that can still name a column or table: types, index types and sort directions
+NON_RESERVED = {
+    TokenType.INT, TokenType.FLOAT, TokenType.VARCHAR, TokenType.BOOLEAN, TokenType.DATE, TokenType.ARRAY,
+    TokenType.KEY, TokenType.PRIMARY, TokenType.AVL, TokenType.ISAM, TokenType.HASH, TokenType.BTREE,
+    TokenType.RTREE, TokenType.GIN, TokenType.IVF, TokenType.ISH, TokenType.ASC, TokenType.DESC,
+    TokenType.ANALYZE,
+}
+
 class Parser:
     def __init__(self, tokens):
         self.tokens = tokens
@@ -19,6 +27,14 @@ class Parser:
             
         return statements
     
+    def parse_statement(self):
+        """Parse exactly one statement; the trailing ';' is optional."""
+        statement = self.statement()
+        self.match(TokenType.SEMICOLON)
+        if not self.is_at_end():
+            raise ParserError(f"Unexpected '{self.peek().lexeme}' after statement at line {self.peek().line}")
+        return statement
+    
     def statement(self):
         """Parse a single SQL statement."""
         if self.match(TokenType.SELECT):
@@ -45,6 +61,11 @@ class Parser:
             return self.insert_statement()
         elif self.match(TokenType.DELETE):
             return self.delete_statement()
+        elif self.match(TokenType.UPDATE):
+            return self.update_statement()
+        elif self.match(TokenType.ANALYZE):
+            self.match(TokenType.TABLE)
+            return AnalyzeStmt(self.identifier())
         else:
             raise ParserError(f"Expected statement at line {self.peek().line}")
     
@@ -57,8 +78,23 @@ class Parser:
         where_clause = None
         if self.match(TokenType.WHERE):
             where_clause = self.condition()
+        
+        order_by = None
+        if self.match(TokenType.ORDER):
+            self.consume(TokenType.BY, "Expect 'BY' after 'ORDER'.")
+            column = self.identifier()
+            descending = self.match(TokenType.DESC)
+            if not descending:
+                self.match(TokenType.ASC)
+            order_by = OrderBy(column, descending)
+        
+        limit = None
+        if self.match(TokenType.LIMIT):
+            limit = self.consume(TokenType.NUMBER, "Expect number after 'LIMIT'.").literal
+            if not isinstance(limit, int) or limit < 0:
+                raise ParserError(f"LIMIT must be a non-negative integer at line {self.previous().line}")
             
-        return SelectStmt(columns, table_name, where_clause)
+        return SelectStmt(columns, table_name, where_clause, order_by, limit)
     
     def select_list(self):
         if self.match(TokenType.ASTERISK):
@@ -181,12 +217,37 @@ class Parser:
             columns = self.column_list()
             self.consume(TokenType.RPAREN, "Expect ')' after column list.")
             
-        self.consume(TokenType.VALUES, "Expect 'VALUES' after table name or column list.")
-        self.consume(TokenType.LPAREN, "Expect '(' after 'VALUES'.")
-        values = self.value_list()
-        self.consume(TokenType.RPAREN, "Expect ')' after values.")
+        if self.match(TokenType.SELECT):
+            return InsertStmt(table_name, columns, None, [], self.select_statement())
         
-        return InsertStmt(table_name, columns, values)
+        self.consume(TokenType.VALUES, "Expect 'VALUES' or 'SELECT' after table name or column list.")
+        rows = []
+        while True:
+            self.consume(TokenType.LPAREN, "Expect '(' before row values.")
+            rows.append(self.value_list())
+            self.consume(TokenType.RPAREN, "Expect ')' after values.")
+            if not self.match(TokenType.COMMA):
+                break
+        
+        return InsertStmt(table_name, columns, rows[0], rows)
+    
+    def update_statement(self):
+        table_name = self.identifier()
+        self.consume(TokenType.SET, "Expect 'SET' after table name.")
+        
+        assignments = []
+        while True:
+            column = self.identifier()
+            self.consume(TokenType.EQUALS, "Expect '=' after column name.")
+            assignments.append((column, self.value()))
+            if not self.match(TokenType.COMMA):
+                break
+        
+        where_clause = None
+        if self.match(TokenType.WHERE):
+            where_clause = self.condition()
+            
+        return UpdateStmt(table_name, assignments, where_clause)
         
     def delete_statement(self):
         self.consume(TokenType.FROM, "Expect 'FROM' after DELETE.")
@@ -225,6 +286,16 @@ class Parser:
             return LiteralExpr(True)
         elif self.match(TokenType.FALSE):
             return LiteralExpr(False)
+        elif self.match(TokenType.NULL):
+            return LiteralExpr(None)
+        elif self.match(TokenType.LBRACKET):  # Array values: [1.0, 2.5]
+            items = []
+            if not self.check(TokenType.RBRACKET):
+                items.append(self.consume(TokenType.NUMBER, "Expect number in array").literal)
+                while self.match(TokenType.COMMA):
+                    items.append(self.consume(TokenType.NUMBER, "Expect number in array").literal)
+            self.consume(TokenType.RBRACKET, "Expect ']' after array values")
+            return LiteralExpr(items)
         elif self.match(TokenType.LPAREN):  # For coordinate values
             x = self.consume(TokenType.NUMBER, "Expect number for X coordinate").literal
             self.consume(TokenType.COMMA, "Expect ',' between X and Y coordinates")
@@ -330,5 +401,7 @@ class Parser:
         raise ParserError(f"{message} at line {self.peek().line}")
     
     def identifier(self):
+        if self.peek().type in NON_RESERVED:
+            return Identifier(self.advance().lexeme)
         token = self.consume(TokenType.IDENTIFIER, "Expect identifier.")
         return Identifier(token.lexeme)
\ No newline at end of file
@@ -30,6 +30,15 @@ class TokenType(Enum):
     AND = auto()
     OR = auto()
     NOT = auto()
+    UPDATE = auto()
+    SET = auto()
+    ORDER = auto()
+    BY = auto()
+    ASC = auto()
+    DESC = auto()
+    LIMIT = auto()
+    ANALYZE = auto()
+    NULL = auto()
     
     # Index types
     AVL = auto()
@@ -83,6 +92,7 @@ class Scanner:
         self.start = 0
         self.current = 0
         self.line = 1
+        self.errors = []
         
         self.keywords = {
             "select": TokenType.SELECT,
@@ -113,6 +123,15 @@ class Scanner:
             "and": TokenType.AND,
             "or": TokenType.OR,
             "not": TokenType.NOT,
+            "update": TokenType.UPDATE,
+            "set": TokenType.SET,
+            "order": TokenType.ORDER,
+            "by": TokenType.BY,
+            "asc": TokenType.ASC,
+            "desc": TokenType.DESC,
+            "limit": TokenType.LIMIT,
+            "analyze": TokenType.ANALYZE,
+            "null": TokenType.NULL,
             
             # Index types
             "avl": TokenType.AVL,
@@ -152,6 +171,8 @@ class Scanner:
             self.add_token(TokenType.ASTERISK)
         elif c == '=':
             self.add_token(TokenType.EQUALS)
+        elif c == '!' and self.match('='):
+            self.add_token(TokenType.NOT_EQUALS)
         elif c == '<':
             if self.match('='):
                 self.add_token(TokenType.LESS_EQUALS)
@@ -171,15 +192,19 @@ class Scanner:
             self.line += 1
         elif c == '"' or c == "'":
             self.string(c)
-        elif self.is_digit(c):
+        elif self.is_digit(c) or (c == '-' and self.is_digit(self.peek())):
             self.number()
         elif self.is_alpha(c):
             self.identifier()
         else:
-            # Error handling can be added here
-            print(f"Unexpected character: {c} at line {self.line}")
+            self.error(f"Unexpected character: {c} at line {self.line}")
     
     # Helper methods
+    def error(self, message):
+        # Se sigue escaneando; quien use los tokens decide si los errores son fatales
+        print(message)
+        self.errors.append(message)
+    
     def is_at_end(self):
         return self.current >= len(self.source)
     
@@ -231,26 +256,31 @@ class Scanner:
             while self.is_digit(self.peek()):
                 self.advance()
                 
-        value = float(self.source[self.start:self.current])
-        if value.is_integer():
-            value = int(value)
+        text = self.source[self.start:self.current]
+        # Integers are kept exact: float() loses precision past 2**53
+        value = float(text) if '.' in text else int(text)
         self.add_token(TokenType.NUMBER, value)
     
     def string(self, quote):
-        while self.peek() != quote and not self.is_at_end():
-            if self.peek() == '\n':
+        while not self.is_at_end():
+            if self.peek() == quote:
+                # A doubled quote is an escaped quote inside the string
+                if self.peek_next() != quote:
+                    break
+                self.advance()
+            elif self.peek() == '\n':
                 self.line += 1
             self.advance()
             
         if self.is_at_end():
-            print(f"Unterminated string at line {self.line}")
+            self.error(f"Unterminated string at line {self.line}")
             return
             
         # Consume closing quote
         self.advance()
         
         # Get string value without quotes
-        value = self.source[self.start+1:self.current-1]
+        value = self.source[self.start+1:self.current-1].replace(quote * 2, quote)
         self.add_token(TokenType.STRING, value)
     
     def add_token(self, token_type, literal=None):
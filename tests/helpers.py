@@ -0,0 +1,37 @@
+import os
+import sys
+from typing import List
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+from api.schemas import ColumnDefinition, CreateTableRequest
+from catalog.metadata_catalog import MetadataCatalog
+from query.query_planner import QueryPlanner
+from storage.storage_manager import StorageManager
+
+
+async def open_catalog(data_dir: str):
+    """StorageManager and MetadataCatalog keeping all their files in data_dir"""
+    storage_manager = StorageManager()
+    storage_manager.data_dir = data_dir
+    await storage_manager.initialize()
+    catalog = MetadataCatalog(storage_manager)
+    catalog.catalog_file = os.path.join(data_dir, "catalog.json")
+    catalog.data_dir = data_dir
+    await catalog.initialize()
+    return storage_manager, catalog
+
+
+async def create_table(data_dir: str, csv_text: str, columns: List[ColumnDefinition], table_name: str = "people",
+                       **options):
+    """Create table_name for user 1 from csv_text; returns (storage_manager, catalog, planner).
+
+    options are passed on to CreateTableRequest (storage_format, compression...).
+    """
+    storage_manager, catalog = await open_catalog(data_dir)
+    source = os.path.join(data_dir, f"{table_name}.csv")
+    with open(source, 'w', encoding='utf-8') as f:
+        f.write(csv_text)
+    await catalog.create_table(CreateTableRequest(
+        table_name=table_name, file_name=source, columns=columns, **options
+    ), 1)
+    return storage_manager, catalog, QueryPlanner(catalog, storage_manager)
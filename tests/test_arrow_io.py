@@ -0,0 +1,87 @@
+import asyncio
+import datetime
+import os
+import sys
+import tempfile
+import unittest
+
+import pyarrow as pa
+import pyarrow.ipc as ipc
+import pyarrow.parquet as pq
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+from api.schemas import ColumnDefinition, CreateTableRequest, DataType
+from helpers import open_catalog
+from query.query_planner import QueryPlanner
+from storage.arrow_io import infer_columns, iter_arrow_rows, write_batches
+
+TABLE = pa.table({
+    "ID": pa.array(range(50), pa.int32()),
+    "name": pa.array([f"n{i % 3}" for i in range(50)]).dictionary_encode(),
+    "born": pa.array([datetime.date(2024, 1, 1 + i % 28) if i % 10 else None for i in range(50)]),
+    "seen": pa.array([datetime.datetime(2024, 5, 1, i % 24) for i in range(50)]),
+    "vector": pa.array([[float(i), 1.0] for i in range(50)], pa.list_(pa.float32())),
+})
+
+
+class ArrowIOTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.parquet_path = os.path.join(self.tmp_dir.name, "people.parquet")
+        pq.write_table(TABLE, self.parquet_path, row_group_size=16)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_schema_mapping_and_rows(self):
+        ipc_path = os.path.join(self.tmp_dir.name, "people.arrow")
+        with ipc.new_file(ipc_path, TABLE.schema) as writer:
+            writer.write_table(TABLE)
+
+        columns = infer_columns(self.parquet_path)
+
+        self.assertEqual([(col.name, col.data_type) for col in columns], [
+            ("id", DataType.INT), ("name", DataType.VARCHAR), ("born", DataType.DATE),
+            ("seen", DataType.DATE), ("vector", DataType.ARRAY_FLOAT),
+        ])
+        for path in (self.parquet_path, ipc_path):
+            rows = list(iter_arrow_rows(path, columns, batch_size=7))
+            self.assertEqual(len(rows), 50)
+            self.assertEqual(rows[0], [0, "n0", None, "2024-05-01", [0.0, 1.0]])
+            self.assertEqual(rows[11], [11, "n2", "2024-01-12", "2024-05-01", [11.0, 1.0]])
+
+    def test_conversion_errors(self):
+        columns = [ColumnDefinition(name="name", data_type="INT")]
+        with self.assertRaisesRegex(ValueError, r"Column 1 \(name\): cannot convert"):
+            list(iter_arrow_rows(self.parquet_path, columns, batch_size=100))
+
+        columns = [ColumnDefinition(name="name", data_type="VARCHAR", size=1)]
+        with self.assertRaisesRegex(ValueError, r"^Row 1, Column 1 \(name\): String too long"):
+            list(iter_arrow_rows(self.parquet_path, columns, batch_size=100))
+
+    def test_import_and_export(self):
+        async def run():
+            storage_manager, catalog = await open_catalog(self.tmp_dir.name)
+            await catalog.create_table(CreateTableRequest(
+                table_name="people", file_name=self.parquet_path, columns=[]
+            ), 1)
+            planner = QueryPlanner(catalog, storage_manager)
+            table = await planner.arrow_batches("people", 1)
+            selected = await planner.arrow_batches("people", 1, "SELECT id, born FROM people WHERE id < 5")
+            return table, selected
+
+        (schema, batches), (selected_schema, selected_batches) = asyncio.run(run())
+        parquet = pa.BufferReader(b"".join(write_batches(schema, batches, "parquet")))
+        stream = b"".join(write_batches(selected_schema, selected_batches, "arrow"))
+
+        exported = pq.read_table(parquet)
+        self.assertEqual(exported.schema.field("born").type, pa.date32())
+        self.assertEqual(exported.column("id").to_pylist(), list(range(50)))
+        self.assertEqual(exported.column("born").to_pylist(), TABLE.column("born").to_pylist())
+        result = ipc.open_stream(stream).read_all()
+        self.assertEqual(result.column_names, ["id", "born"])
+        self.assertEqual(result.column("id").to_pylist(), [0, 1, 2, 3, 4])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,168 @@
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+from api.schemas import ColumnDefinition
+from helpers import create_table
+from query.query_planner import BulkInsertError
+
+
+class BulkInsertTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def write_file(self, name, content):
+        path = os.path.join(self.tmp_dir.name, name)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        return path
+
+    async def create_table(self):
+        storage_manager, catalog, planner = await create_table(self.tmp_dir.name, "id,name,born\n" + "".join(
+            f"{i},n{i % 7},2024-01-{1 + i % 28:02d}\n" for i in range(300)
+        ), [
+            ColumnDefinition(name="id", data_type="INT", index_type="BTREE"),
+            ColumnDefinition(name="name", data_type="VARCHAR", size=10, index_type="HASH"),
+            ColumnDefinition(name="born", data_type="DATE"),
+        ])
+        return catalog, planner
+
+    def test_csv_and_ndjson_append_with_indices(self):
+        csv_path = self.write_file("more.csv", "id,name,born\n" + "".join(
+            f"{i},n{i % 7},2024-02-01\n" for i in range(300, 500)
+        ))
+        ndjson_path = self.write_file("more.ndjson", "\n".join(
+            json.dumps({"id": i, "name": "late", "born": None} if i % 2 else [i, "late", "2024-03-01"])
+            for i in range(500, 520)
+        ) + "\n")
+
+        async def run():
+            catalog, planner = await self.create_table()
+            first = await planner.bulk_insert("people", csv_path, 1)
+            second = await planner.bulk_insert("people", ndjson_path, 1)
+            metadata = catalog.get_table_metadata("people", 1)
+            rows = list(await planner._scan_table(metadata))
+            indices = metadata["indices"]
+            id_index = planner.index_interface.open_index("BTREE", indices["id"]["path"])
+            name_index = planner.index_interface.open_index("HASH", indices["name"]["path"])
+            return first, second, metadata, rows, id_index, name_index
+
+        first, second, metadata, rows, id_index, name_index = asyncio.run(run())
+
+        self.assertEqual(first["rows_inserted"], 200)
+        self.assertEqual(second["rows_inserted"], 20)
+        self.assertGreater(first["io_operations"], 0)
+        self.assertEqual(metadata["row_count"], 520)
+        self.assertEqual(metadata["statistics"]["row_count"], 520)
+        self.assertEqual(metadata["statistics"]["columns"]["born"]["null_count"], 10)
+        self.assertEqual([row[0] for row in rows], list(range(520)))
+        # Index entries are row positions, covering the initial load and both appends
+        self.assertEqual(id_index.search(450), [450])
+        self.assertEqual(id_index.range_search(298, 301), [298, 299, 300, 301])
+        self.assertEqual(sorted(name_index.search("late")), list(range(500, 520)))
+        self.assertEqual(len(name_index.search("n3")), len([i for i in range(500) if i % 7 == 3]))
+
+    def test_commits_in_chunks(self):
+        path = self.write_file("more.csv", "id,name,born\n" + "".join(
+            f"{i},n{i % 7},2024-02-01\n" for i in range(300, 500)
+        ))
+
+        async def run():
+            catalog, planner = await self.create_table()
+            planner.bulk_commit_rows = 64
+            transactions = []
+            transaction = planner.storage_manager.transaction
+
+            def counted_transaction():
+                transactions.append(catalog.get_table_metadata("people", 1)["row_count"])
+                return transaction()
+
+            planner.storage_manager.transaction = counted_transaction
+            result = await planner.bulk_insert("people", path, 1)
+            metadata = catalog.get_table_metadata("people", 1)
+            id_index = planner.index_interface.open_index("BTREE", metadata["indices"]["id"]["path"])
+            return result, transactions, metadata, id_index.range_search(360, 365)
+
+        result, transactions, metadata, found = asyncio.run(run())
+
+        self.assertEqual(result["rows_inserted"], 200)
+        # Each chunk is committed with its catalog counts
+        self.assertEqual(transactions, [300, 364, 428, 492])
+        self.assertEqual(metadata["row_count"], 500)
+        self.assertEqual(found, list(range(360, 366)))
+
+    def test_failed_chunk_reports_committed_rows(self):
+        path = self.write_file("more.csv", "id,name,born\n" + "".join(
+            f"{i},n{i % 7},2024-02-01\n" for i in range(300, 500)
+        ))
+
+        async def run():
+            catalog, planner = await self.create_table()
+            planner.bulk_commit_rows = 64
+            add_index_entries = planner.index_interface.add_index_entries
+            calls = []
+
+            def failing_add_index_entries(table_metadata, entries):
+                calls.append(len(calls))
+                if len(calls) == 3:
+                    raise OSError("disk full")
+                return add_index_entries(table_metadata, entries)
+
+            planner.index_interface.add_index_entries = failing_add_index_entries
+            with self.assertRaises(BulkInsertError) as raised:
+                await planner.bulk_insert("people", path, 1)
+            metadata = catalog.get_table_metadata("people", 1)
+            return raised.exception, metadata, list(await planner._scan_table(metadata))
+
+        error, metadata, rows = asyncio.run(run())
+
+        # The first two chunks stay committed and the error says so
+        self.assertEqual(error.rows_committed, 128)
+        self.assertIn("after 128 rows were committed: disk full", str(error))
+        self.assertEqual(metadata["row_count"], 428)
+        self.assertEqual([row[0] for row in rows], list(range(428)))
+
+    def test_csv_without_headers(self):
+        path = self.write_file("more.csv", "300,a,2024-02-01\n301,b,2024-02-02\n")
+
+        async def run():
+            catalog, planner = await self.create_table()
+            result = await planner.bulk_insert("people", path, 1, has_headers=False)
+            metadata = catalog.get_table_metadata("people", 1)
+            return result, list(await planner._scan_table(metadata))
+
+        result, rows = asyncio.run(run())
+
+        self.assertEqual(result["rows_inserted"], 2)
+        self.assertEqual(rows[-2:], [[300, "a", "2024-02-01"], [301, "b", "2024-02-02"]])
+
+    def test_invalid_row_rolls_back(self):
+        bad_path = self.write_file("bad.csv", "id,name,born\n" + "".join(
+            f"{i},n,2024-02-01\n" for i in range(300, 320)
+        ) + "x,n,2024-02-01\n")
+        other_header = self.write_file("other.csv", "id,title,born\n1,a,2024-01-01\n")
+
+        async def run():
+            catalog, planner = await self.create_table()
+            with self.assertRaisesRegex(ValueError, r"Row 22, Column 1 \(id\)"):
+                await planner.bulk_insert("people", bad_path, 1)
+            with self.assertRaisesRegex(ValueError, "do not match table columns"):
+                await planner.bulk_insert("people", other_header, 1)
+            metadata = catalog.get_table_metadata("people", 1)
+            return metadata, list(await planner._scan_table(metadata))
+
+        metadata, rows = asyncio.run(run())
+
+        self.assertEqual(metadata["row_count"], 300)
+        self.assertEqual(len(rows), 300)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+import asyncio
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+from storage.column_store import ColumnStore
+
+COLUMNS = [
+    {"name": "id", "data_type": "INT"},
+    {"name": "name", "data_type": "VARCHAR"},
+    {"name": "score", "data_type": "FLOAT"},
+    {"name": "born", "data_type": "DATE"},
+    {"name": "vector", "data_type": "ARRAY[FLOAT]"},
+]
+
+
+class ColumnStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.store = ColumnStore(os.path.join(self.tmp_dir.name, "table.cols"), COLUMNS)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_round_trip(self):
+        rows = [
+            [1, "ana", 1.5, "2024-01-15", [1.0, 2.0]],
+            [None, None, None, None, None],
+            [3, "", -2.0, "1969-12-31", []],
+        ]
+        asyncio.run(self.store.write_all(rows))
+
+        self.assertEqual(self.store.row_count, 3)
+        self.assertEqual(asyncio.run(self.store.read_all()), rows)
+
+    def test_append_and_projection(self):
+        asyncio.run(self.store.write_all([[1, "a", 1.0, "2024-01-01", [1.0]]]))
+        row_ids = asyncio.run(self.store.append_rows([[2, "b", 2.0, "2024-01-02", [2.0]]]))
+
+        self.assertEqual(row_ids, [1])
+        self.assertEqual(
+            asyncio.run(self.store.read_all([0, 1])),
+            [[1, "a", None, None, None], [2, "b", None, None, None]]
+        )
+
+    def test_read_rows(self):
+        rows = [[i, f"n{i}", float(i), "2024-01-01", [float(i)]] for i in range(20)]
+        asyncio.run(self.store.write_all(rows))
+
+        self.assertEqual(self.store.read_rows(5, 3), rows[5:8])
+        self.assertEqual(self.store.read_rows(18, 10), rows[18:])
+        self.assertEqual(self.store.read_rows(40, 10), [])
+
+    def test_read_rows_at(self):
+        rows = [[i, f"n{i}", float(i), "2024-01-01", [float(i)]] for i in range(20)]
+        asyncio.run(self.store.write_all(rows))
+
+        self.assertEqual(self.store.read_rows_at([2, 3, 4, 9, 19, 25]), [rows[i] for i in (2, 3, 4, 9, 19)])
+        self.assertEqual(self.store.read_rows_at([7], [0, 1]), [[7, "n7", None, None, None]])
+
+    def test_fixed_width_layout(self):
+        asyncio.run(self.store.write_all([[i, "x", 0.0, "2024-01-01", []] for i in range(10)]))
+
+        self.assertEqual(os.path.getsize(os.path.join(self.store.directory, "id.col")), 10 * 8)
+
+    def test_dictionary_encoding(self):
+        store = ColumnStore(os.path.join(self.tmp_dir.name, "dict.cols"), COLUMNS, "zlib")
+        rows = [[i, ["lima", "cusco", None][i % 3], 0.0, "2024-01-01", []] for i in range(30)]
+        asyncio.run(store.write_all(rows))
+        asyncio.run(store.append_rows([[30, "puno", 0.0, "2024-01-01", []]]))
+
+        self.assertTrue(store.is_dictionary_encoded(1))
+        self.assertFalse(os.path.exists(os.path.join(store.directory, "name.off")))
+        self.assertEqual(os.path.getsize(os.path.join(store.directory, "name.col")), 31 * 4)
+        self.assertEqual(store.read_column(1), [row[1] for row in rows] + ["puno"])
+        self.assertEqual(store.read_rows(29, 5)[1][1], "puno")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+import asyncio
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+from api.schemas import ColumnDefinition
+from catalog.table_statistics import build_table_statistics
+from helpers import create_table
+from query.cost_model import choose_access_path, describe_access_path
+
+COLUMNS = [
+    {"name": "id", "data_type": "INT"},
+    {"name": "name", "data_type": "VARCHAR"},
+    {"name": "score", "data_type": "INT"},
+    {"name": "bio", "data_type": "VARCHAR"},
+]
+METADATA = {
+    "columns": COLUMNS,
+    "indices": {"id": {"type": "BTREE"}, "name": {"type": "HASH"}, "score": {"type": "ISAM"}, "bio": {"type": "GIN"}},
+    "statistics": build_table_statistics(
+        COLUMNS, ([i, f"n{i}", i % 10, f"bio {i}"] for i in range(20000))),
+}
+PAGE_COUNT = 200
+
+
+def condition(column, operator, value, logical_op=None):
+    return {"column": column, "operator": operator, "value": value, "logical_op": logical_op}
+
+
+def describe(*conditions):
+    return describe_access_path(choose_access_path(METADATA, list(conditions), PAGE_COUNT))
+
+
+class CostModelTest(unittest.TestCase):
+    def test_index_kinds(self):
+        self.assertEqual(describe(condition("name", "=", "n5")), "index HASH(name)")
+        self.assertEqual(describe(condition("name", "IN", ["n5", "n6"])), "index HASH(name)")
+        self.assertEqual(describe(condition("id", "BETWEEN", [10, 40])), "index BTREE(id)")
+        # One-sided comparisons make a range together with the opposite bound
+        self.assertEqual(describe(condition("id", ">=", 10, "AND"), condition("id", "<", 40)), "index BTREE(id)")
+        self.assertEqual(describe(condition("id", ">=", 10)), "full scan")
+        # Hash indices cannot answer ranges, GIN answers no WHERE operator
+        self.assertEqual(describe(condition("name", "BETWEEN", ["n1", "n2"])), "full scan")
+        self.assertEqual(describe(condition("bio", "=", "bio 5")), "full scan")
+
+    def test_selectivity_decides(self):
+        # Most of the table: reading it in order beats fetching by position
+        self.assertEqual(describe(condition("id", "BETWEEN", [100, 15000])), "full scan")
+        self.assertEqual(describe(condition("score", "=", 3)), "full scan")
+        # The most selective index drives the plan, the others are left to the filter
+        self.assertEqual(describe(condition("score", "=", 3, "AND"), condition("name", "=", "n13")), "index HASH(name)")
+        # Every OR group needs an index of its own
+        self.assertEqual(describe(condition("id", "=", 7, "OR"), condition("name", "=", "n9")),
+                         "index BTREE(id) OR HASH(name)")
+        self.assertEqual(describe(condition("id", "=", 7, "OR"), condition("bio", "=", "bio 9")), "full scan")
+        # Without rows to read the scan costs nothing
+        self.assertEqual(choose_access_path(dict(METADATA, statistics=None), [condition("id", "=", 7)], 0)["type"], "scan")
+
+    def test_multi_index_plans(self):
+        async def run():
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                storage_manager, catalog, planner = await create_table(
+                    tmp_dir, "id,name,score\n" + "".join(f"{i},n{i},{i % 10}\n" for i in range(3000)), [
+                        ColumnDefinition(name="id", data_type="INT", index_type="BTREE"),
+                        ColumnDefinition(name="name", data_type="VARCHAR", size=20, index_type="HASH"),
+                        ColumnDefinition(name="score", data_type="INT", index_type="ISAM"),
+                    ])
+                metadata = catalog.get_table_metadata("people", 1)
+                page_count = planner._open_table_storage(metadata).page_count
+                results = []
+                for query in ("SELECT id FROM people WHERE id = 42 OR name = 'n77' OR id IN (5, 6)",
+                              "SELECT id FROM people WHERE score BETWEEN 3 AND 3 AND id > 100 AND id < 110"):
+                    plan = choose_access_path(metadata, planner._plan(query)["where"], page_count)
+                    results.append((plan["type"], (await planner.execute_query(query, 1))["data"]))
+                # A key that does not convert to the column type: the caller scans instead
+                results.append(planner._index_positions(metadata, [condition("id", "IN", ["7", "x"])]))
+                return results
+
+        (union_type, union_rows), (range_type, range_rows), bad_key = asyncio.run(run())
+
+        self.assertEqual(union_type, "index")
+        self.assertEqual(union_rows, [[5], [6], [42], [77]])
+        # The id range is intersected with the ISAM range on score
+        self.assertEqual(range_type, "index")
+        self.assertEqual(range_rows, [[103]])
+        self.assertIsNone(bad_key)
+
+
+if __name__ == '__main__':
+    unittest.main()
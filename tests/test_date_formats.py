@@ -0,0 +1,47 @@
+import asyncio
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+from api.schemas import ColumnDefinition
+from storage.file_processor import FileProcessor
+from utils.date_formats import ISO_DATE, DateParser, detect_date_format
+
+
+class DateFormatTest(unittest.TestCase):
+    def test_detection(self):
+        self.assertEqual(detect_date_format(["2024-01-05", "2023-12-31"]), ISO_DATE)
+        # 31/01 only parses day-first, 01/31 only month-first
+        self.assertEqual(detect_date_format(["05/01/2024", "31/01/2024"]), '%d/%m/%Y')
+        self.assertEqual(detect_date_format(["05/01/2024", "01/31/2024", ""]), '%m/%d/%Y')
+        self.assertIsNone(detect_date_format(["", None]))
+
+    def test_parser_fast_path_and_fallback(self):
+        parser = DateParser('%m/%d/%Y')
+
+        self.assertEqual(parser.to_iso("05/01/2024"), "2024-05-01")
+        self.assertEqual(parser.to_iso("5/1/2024"), "2024-05-01")
+        self.assertEqual(parser.to_iso("2024-02-29"), "2024-02-29")
+        with self.assertRaisesRegex(ValueError, "Invalid date format"):
+            parser.parse("13/13/2024")
+        # fromisoformat would take these, strptime('%Y-%m-%d') does not
+        with self.assertRaises(ValueError):
+            DateParser(ISO_DATE, (ISO_DATE,)).parse("20240105")
+
+    def test_format_detected_on_load(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "events.csv")
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write("id,day\n1,05/01/2024\n2,12/25/2024\n3,\n")
+            columns = [ColumnDefinition(name="id", data_type="INT"), ColumnDefinition(name="day", data_type="DATE")]
+
+            rows = asyncio.run(FileProcessor().process_file(path, columns))
+
+        self.assertEqual(columns[1].date_format, '%m/%d/%Y')
+        self.assertEqual(rows, [[1, "2024-05-01"], [2, "2024-12-25"], [3, None]])
+
+
+if __name__ == '__main__':
+    unittest.main()
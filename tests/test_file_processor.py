@@ -0,0 +1,166 @@
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+from api.schemas import ColumnDefinition
+from storage import file_processor
+from storage.file_processor import FileProcessor
+from storage.heap_file import HeapFile
+from storage.mapped_reader import MappedHeapReader
+from storage.storage_manager import StorageManager
+
+COLUMNS = [
+    ColumnDefinition(name="id", data_type="INT"),
+    ColumnDefinition(name="name", data_type="VARCHAR", size=10),
+    ColumnDefinition(name="born", data_type="DATE"),
+]
+
+
+async def collect(batches):
+    return [batch async for batch in batches]
+
+
+class FileProcessorTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.processor = FileProcessor()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def write_file(self, name, content):
+        path = os.path.join(self.tmp_dir.name, name)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        return path
+
+    def test_csv_batches(self):
+        path = self.write_file("people.csv", "id,name,born\n" + "".join(
+            f'{i},"n,{i % 10}",2024-01-{1 + i % 28:02d}\n' for i in range(2500)
+        ))
+
+        batches = asyncio.run(collect(self.processor.iter_batches(path, COLUMNS, batch_size=1000)))
+
+        self.assertEqual([len(batch) for batch in batches], [1000, 1000, 500])
+        self.assertEqual(batches[2][-1], [2499, "n,9", "2024-01-08"])
+
+    def test_csv_without_headers(self):
+        columns = [ColumnDefinition(name="id", data_type="INT"), ColumnDefinition(name="born", data_type="DATE")]
+        path = self.write_file("people.csv", "".join(f"{i},{1 + i % 28:02d}/01/2024\n" for i in range(3000)))
+
+        sequential = asyncio.run(self.processor.process_file(path, columns, has_headers=False))
+        parallel = asyncio.run(collect(self.parallel_processor().iter_batches(path, columns, has_headers=False)))
+
+        # The first line is data, also for the date format detection sample
+        self.assertEqual(sequential[0], [0, "2024-01-01"])
+        self.assertEqual(len(sequential), 3000)
+        self.assertEqual([row for batch in parallel for row in batch], sequential)
+        with self.assertRaisesRegex(ValueError, r"^Row 2, Column 1 \(id\)"):
+            asyncio.run(self.processor.process_file(
+                self.write_file("bad.csv", "1,01/01/2024\nx,01/01/2024\n"), columns, has_headers=False))
+
+    def test_error_reports_row_number(self):
+        path = self.write_file("people.csv", "id,name,born\n" + "".join(
+            f"{i},n,2024-01-01\n" for i in range(30)
+        ) + "x,n,2024-01-01\n")
+
+        with self.assertRaisesRegex(ValueError, r"Row 32, Column 1 \(id\)"):
+            asyncio.run(collect(self.processor.iter_batches(path, COLUMNS, batch_size=10)))
+
+    def test_vectorized_conversion(self):
+        columns = COLUMNS + [ColumnDefinition(name="score", data_type="FLOAT"),
+                             ColumnDefinition(name="vector", data_type="ARRAY[FLOAT]")]
+        raw_rows = [
+            [" 7 ", "ana", "2024-03-01", "1e3", "[1, 2.5]"],
+            ["", "", "15/03/2024", "nan", ""],
+            ["-2", "b", "2024-02-29", " 0.5 ", "3,4"],
+        ]
+
+        rows = self.processor._convert_rows(raw_rows, columns, first_row=2)
+
+        self.assertEqual(rows[0], [7, "ana", "2024-03-01", 1000.0, [1.0, 2.5]])
+        self.assertEqual(rows[1][:3] + rows[1][4:], [None, None, "2024-03-15", None])
+        self.assertEqual(rows[2], [-2, "b", "2024-02-29", 0.5, [3.0, 4.0]])
+
+    def test_vectorized_reports_first_offending_value(self):
+        raw_rows = [
+            ["1", "ok", "2024-01-01"],
+            ["2", "much too long", "2024-01-01"],
+            ["x", "ok", "2023-02-29"],
+        ]
+
+        with self.assertRaisesRegex(ValueError, r"^Row 3, Column 2 \(name\): String too long"):
+            self.processor._convert_rows(raw_rows, COLUMNS, first_row=2)
+        with self.assertRaisesRegex(ValueError, r"^Row 4, Column 1 \(id\): Invalid integer: x"):
+            self.processor._convert_rows([raw_rows[0], raw_rows[2]], COLUMNS, first_row=3)
+
+    def test_dat_array_across_chunks(self):
+        rows = [[i, f"n{i}", "2024-02-01"] if i % 2 else {"id": i, "name": None, "born": "2024-02-01"}
+                for i in range(200)]
+        path = self.write_file("people.dat", json.dumps(rows, indent=1))
+        original_chunk = file_processor.READ_CHUNK_BYTES
+        file_processor.READ_CHUNK_BYTES = 7
+        try:
+            processed = asyncio.run(self.processor.process_file(path, COLUMNS))
+        finally:
+            file_processor.READ_CHUNK_BYTES = original_chunk
+
+        self.assertEqual(len(processed), 200)
+        self.assertEqual(processed[0], [0, None, "2024-02-01"])
+        self.assertEqual(processed[199], [199, "n199", "2024-02-01"])
+
+    def parallel_processor(self):
+        processor = FileProcessor()
+        processor.ingest_workers = 2
+        processor.parallel_min_bytes = 0
+        processor.chunk_bytes = 1000
+        return processor
+
+    def test_parallel_matches_sequential(self):
+        path = self.write_file("people.csv", "id,name,born\n" + "".join(
+            f"{i},n{i % 10},2024-01-{1 + i % 28:02d}\n" for i in range(5000)
+        ))
+        self.processor.ingest_workers = 1
+
+        sequential = asyncio.run(self.processor.process_file(path, COLUMNS))
+        parallel = asyncio.run(collect(self.parallel_processor().iter_batches(path, COLUMNS, batch_size=300)))
+
+        self.assertTrue(all(len(batch) <= 300 for batch in parallel))
+        self.assertEqual([row for batch in parallel for row in batch], sequential)
+
+    def test_parallel_error_row_numbers(self):
+        csv_path = self.write_file("people.csv", "id,name,born\n" + "".join(
+            f"{i},n,2024-01-01\n" for i in range(4000)
+        ) + "1,n,2024-01-01,extra\n")
+        txt_path = self.write_file("people.txt", "id,name,born\n\n" + "".join(
+            f"{i},n,2024-01-01\n\n" for i in range(2000)
+        ) + "1,n,soon\n")
+
+        with self.assertRaisesRegex(ValueError, r"^Row 4002: Expected 3 columns, got 4$"):
+            asyncio.run(collect(self.parallel_processor().iter_batches(csv_path, COLUMNS)))
+        with self.assertRaisesRegex(ValueError, r"^Line 4003, Column born"):
+            asyncio.run(collect(self.parallel_processor().iter_batches(txt_path, COLUMNS)))
+
+    def test_stream_into_heap_file(self):
+        path = self.write_file("people.csv", "id,name,born\n" + "".join(
+            f"{i},n{i % 10},2024-01-01\n" for i in range(3000)
+        ))
+        storage_manager = StorageManager()
+        heap = HeapFile(os.path.join(self.tmp_dir.name, "people.dat"),
+                        [{"name": col.name, "data_type": col.data_type} for col in COLUMNS], storage_manager)
+
+        row_count = asyncio.run(heap.write_batches(self.processor.iter_batches(path, COLUMNS, batch_size=700)))
+
+        self.assertEqual(row_count, 3000)
+        self.assertEqual(asyncio.run(heap.count_rows()), 3000)
+        self.assertEqual(len(heap.zone_map.load()), heap.page_count)
+        rows = list(MappedHeapReader(heap, storage_manager).iter_rows())
+        self.assertEqual([row[0] for row in rows], list(range(3000)))
+
+
+if __name__ == '__main__':
+    unittest.main()
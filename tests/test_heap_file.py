@@ -0,0 +1,111 @@
+import asyncio
+import os
+import sys
+import tempfile
+import unittest
+
+# Backend modules import each other relative to the backend directory
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+from storage.heap_file import HeapFile, SlottedPage, encode_rid, decode_rid
+from storage.mapped_reader import MappedHeapReader
+from storage.storage_manager import StorageManager
+
+COLUMNS = [
+    {"name": "id", "data_type": "INT"},
+    {"name": "name", "data_type": "VARCHAR"},
+    {"name": "score", "data_type": "FLOAT"},
+    {"name": "born", "data_type": "DATE"},
+    {"name": "vector", "data_type": "ARRAY[FLOAT]"},
+]
+
+
+class HeapFileTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.file_path = os.path.join(self.tmp_dir.name, "table.dat")
+        self.heap = HeapFile(self.file_path, COLUMNS, StorageManager())
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_slotted_page(self):
+        page = SlottedPage()
+        self.assertEqual(page.insert(b"abc"), 0)
+        self.assertEqual(page.insert(b"defgh"), 1)
+
+        reloaded = SlottedPage(page.to_bytes())
+        self.assertEqual(reloaded.slot_count, 2)
+        self.assertEqual(reloaded.records(), [b"abc", b"defgh"])
+        self.assertFalse(reloaded.can_fit(b"x" * 4096))
+
+    def test_round_trip_across_pages(self):
+        rows = [[i, f"name {i}", i / 2, "2024-01-15", [1.0, float(i)]] for i in range(500)]
+        rows.append([None, None, None, None, None])
+
+        rids = asyncio.run(self.heap.write_all(rows))
+
+        self.assertGreater(self.heap.page_count, 1)
+        self.assertEqual(rids[0], (0, 0))
+        self.assertEqual(os.path.getsize(self.file_path) % 4096, 0)
+        self.assertEqual(asyncio.run(self.heap.read_all()), rows)
+
+    def test_insert_fills_last_page(self):
+        asyncio.run(self.heap.write_all([[1, "a", 1.0, None, []]]))
+        rids = asyncio.run(self.heap.insert_rows([[2, "b", 2.0, None, []]]))
+
+        self.assertEqual(rids, [(0, 1)])
+        self.assertEqual(self.heap.page_count, 1)
+        self.assertEqual([row[0] for row in asyncio.run(self.heap.read_all())], [1, 2])
+
+    def test_mapped_reader(self):
+        rows = [[i, f"name {i}", float(i), None, []] for i in range(300)]
+        asyncio.run(self.heap.write_all(rows))
+        reader = MappedHeapReader(self.heap, self.heap.storage_manager)
+
+        self.assertEqual(list(reader.iter_rows()), rows)
+        self.assertEqual(reader.row_count(), 300)
+        self.assertEqual(reader.read_rows(95, 10), rows[95:105])
+        self.assertEqual(reader.read_rows(299, 50), rows[299:])
+
+        # Appends are picked up by a new reader
+        asyncio.run(self.heap.insert_rows([[300, "x", 0.0, None, []]]))
+        self.assertEqual(MappedHeapReader(self.heap, self.heap.storage_manager).row_count(), 301)
+
+    def test_page_directory(self):
+        rows = [[i, f"name {i}", float(i), None, []] for i in range(200)]
+        asyncio.run(self.heap.write_all(rows[:50]))
+        for start in range(50, 200, 30):
+            asyncio.run(self.heap.insert_rows(rows[start:start + 30]))
+
+        self.assertEqual(self.heap._directory_length(), self.heap.page_count)
+        reader = MappedHeapReader(self.heap, self.heap.storage_manager)
+        for start in (0, 49, 50, 117, 190):
+            self.assertEqual(reader.read_rows(start, 7), rows[start:start + 7])
+        self.assertEqual(reader.read_rows(start, 7), reader._read_rows_by_headers(start, 7))
+
+    def test_row_ids(self):
+        self.assertEqual(decode_rid(encode_rid(7, 3)), (7, 3))
+        self.assertLess(encode_rid(0, 65535), encode_rid(1, 0))
+
+    def test_zlib_pages(self):
+        storage_manager = StorageManager()
+        compressed = HeapFile(os.path.join(self.tmp_dir.name, "compressed.dat"), COLUMNS, storage_manager,
+                              compression="zlib")
+        rows = [[i, ["lima", "cusco", "arequipa"][i % 3], 1.0, "2024-01-01", []] for i in range(2000)]
+        asyncio.run(self.heap.write_all(rows))
+        asyncio.run(compressed.write_all(rows[:1500]))
+        asyncio.run(compressed.insert_rows(rows[1500:]))
+
+        self.assertLess(os.path.getsize(compressed.file_path) * 3, os.path.getsize(self.file_path))
+        self.assertEqual(os.path.getsize(compressed.file_path) % compressed.page_size, 0)
+        self.assertEqual(asyncio.run(compressed.read_all()), rows)
+        storage_manager.buffer_cache.cache.clear()
+        self.assertEqual(list(MappedHeapReader(compressed, storage_manager).iter_rows()), rows)
+
+    def test_row_too_large(self):
+        with self.assertRaises(ValueError):
+            self.heap.encode_row([1, "x" * 5000, 1.0, None, []])
+
+
+if __name__ == '__main__':
+    unittest.main()
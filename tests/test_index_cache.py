@@ -0,0 +1,48 @@
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+from indices.index_interface import IndexInterface, RecordFileIndex, remove_index_files
+
+
+class IndexCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, "people_id_btree")
+
+    def tearDown(self):
+        remove_index_files(self.path)
+        self.tmp_dir.cleanup()
+
+    def test_open_index_is_cached(self):
+        interface = IndexInterface()
+        index = interface.open_index("BTREE", self.path)
+        index.insert_many([(i % 50, i) for i in range(200)])
+
+        # Writes through the cached index keep it valid, for every IndexInterface
+        self.assertIs(IndexInterface().open_index("BTREE", self.path), index)
+        self.assertEqual(index.search(7), [7, 57, 107, 157])
+        self.assertEqual(sorted(index.range_search(10, 11)), [10, 11, 60, 61, 110, 111, 160, 161])
+
+        # A write through another instance reloads the index from its files
+        other = RecordFileIndex(type(index.index), self.path)
+        other.insert(7, 999)
+        reopened = interface.open_index("BTREE", self.path)
+        self.assertIsNot(reopened, index)
+        self.assertEqual(reopened.search(7), [7, 57, 107, 157, 999])
+
+        remove_index_files(self.path)
+        self.assertEqual(interface.open_index("BTREE", self.path).search(7), [])
+
+    def test_isam_range_search(self):
+        index = IndexInterface().open_index("ISAM", self.path)
+        index.insert_many([(i % 30, i) for i in range(90)])
+
+        self.assertEqual(sorted(index.range_search(28, 100)), [28, 29, 58, 59, 88, 89])
+        self.assertEqual(index.search(3), [3, 33, 63])
+
+
+if __name__ == '__main__':
+    unittest.main()
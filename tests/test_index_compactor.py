@@ -0,0 +1,95 @@
+import asyncio
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+from api.schemas import ColumnDefinition
+from helpers import create_table
+from indices.index_interface import read_dead_bytes
+
+
+class IndexCompactorTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    async def create_table(self):
+        storage_manager, catalog, planner = await create_table(
+            self.tmp_dir.name, "id,name\n" + "".join(f"{i},N{i % 4}\n" for i in range(400)), [
+                ColumnDefinition(name="id", data_type="INT", index_type="BTREE"),
+                ColumnDefinition(name="name", data_type="VARCHAR", size=10, index_type="HASH"),
+            ])
+        # Every insert appends a new version of the record of its name
+        for i in range(400, 440):
+            await planner.execute_query(f"INSERT INTO people VALUES ({i}, 'N{i % 4}')", 1)
+        catalog.index_compactor.min_bytes = 0
+        return catalog, planner, catalog.get_table_metadata("people", 1)["indices"]["name"]["path"]
+
+    def test_compacts_dead_records(self):
+        async def run():
+            catalog, planner, path = await self.create_table()
+            size, dead = os.path.getsize(path + ".data"), read_dead_bytes(path)
+            candidates = catalog.index_compactor.candidates()
+            with self.assertLogs("indices.index_compactor", "INFO") as logs:
+                compacted = await catalog.index_compactor.run_once()
+            index = planner.index_interface.open_index("HASH", path)
+            return size, dead, candidates, compacted, path, index.search("N1"), logs.output
+
+        size, dead, candidates, compacted, path, rows, logs = asyncio.run(run())
+
+        self.assertGreater(dead, size / 2)
+        self.assertEqual([os.path.basename(p) for _, p in candidates], [os.path.basename(path)])
+        self.assertEqual(compacted, 1)
+        self.assertLess(os.path.getsize(path + ".data"), size - dead / 2)
+        self.assertEqual(read_dead_bytes(path), 0)
+        self.assertEqual(sorted(rows), list(range(1, 440, 4)))
+        self.assertFalse(any(name.endswith(".compact") or ".compact." in name for name in os.listdir(os.path.dirname(path))))
+        self.assertIn(f"Compacted index {os.path.basename(path)}", logs[0])
+
+    def test_index_written_during_compaction_is_kept(self):
+        async def run():
+            catalog, planner, path = await self.create_table()
+            compactor = catalog.index_compactor
+            compact_copy = compactor._compact_copy
+
+            def compact_while_inserting(index_type, work_path):
+                compact_copy(index_type, work_path)
+                metadata = catalog.get_table_metadata("people", 1)
+                planner.index_interface.add_index_entries(metadata, {"name": [("N1", 999)]})
+
+            compactor._compact_copy = compact_while_inserting
+            swapped = await compactor.compact(compactor.candidates()[0][0], path)
+            return swapped, planner.index_interface.open_index("HASH", path).search("N1")
+
+        swapped, rows = asyncio.run(run())
+
+        self.assertFalse(swapped)
+        self.assertIn(999, rows)
+
+    def test_failed_background_compaction_is_logged(self):
+        async def run():
+            catalog, planner, path = await self.create_table()
+
+            async def failing_run_once():
+                raise OSError("disk full")
+
+            catalog.index_compactor.run_once = failing_run_once
+            with self.assertLogs("indices.index_compactor", "ERROR") as logs:
+                catalog.index_compactor.start()
+                catalog.index_compactor.request()
+                await asyncio.sleep(0.05)
+            await catalog.index_compactor.stop()
+            return logs.records
+
+        records = asyncio.run(run())
+
+        self.assertEqual(records[0].getMessage(), "Index compaction failed")
+        self.assertIsNotNone(records[0].exc_info)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,41 @@
+import asyncio
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+from api.schemas import ColumnDefinition
+from helpers import create_table
+from indices.index_interface import IndexInterface
+
+
+class IndexKeyTypesTest(unittest.TestCase):
+    async def create_table(self, tmp_dir, index_type, data_type):
+        storage_manager, catalog, planner = await create_table(
+            tmp_dir, "id,key\n" + "".join(f"{i},{self.key(data_type, i)}\n" for i in range(40)), [
+                ColumnDefinition(name="id", data_type="INT"),
+                ColumnDefinition(name="key", data_type=data_type, size=10, index_type=index_type),
+            ])
+        return catalog.get_table_metadata("people", 1)["indices"]["key"]
+
+    @staticmethod
+    def key(data_type, i):
+        return f"k{i % 13:02d}" if data_type == "VARCHAR" else f"2024-01-{1 + i % 13:02d}"
+
+    def test_text_and_date_keys(self):
+        for index_type in ("ISAM", "BTREE", "AVL", "HASH"):
+            for data_type in ("VARCHAR", "DATE"):
+                with self.subTest(index_type=index_type, data_type=data_type), \
+                        tempfile.TemporaryDirectory() as tmp_dir:
+                    index_info = asyncio.run(self.create_table(tmp_dir, index_type, data_type))
+                    index = IndexInterface().open_index(index_info["type"], index_info["path"])
+
+                    self.assertEqual(sorted(index.search(self.key(data_type, 3))), [3, 16, 29])
+                    if index_type != "HASH":
+                        found = index.range_search(self.key(data_type, 1), self.key(data_type, 2))
+                        self.assertEqual(sorted(found), [1, 2, 14, 15, 27, 28])
+
+
+if __name__ == '__main__':
+    unittest.main()
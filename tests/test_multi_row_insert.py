@@ -0,0 +1,101 @@
+import asyncio
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+from api.schemas import ColumnDefinition
+from helpers import create_table
+
+
+class MultiRowInsertTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    async def create_table(self):
+        storage_manager, catalog, planner = await create_table(
+            self.tmp_dir.name, "id,name,born\n" + "".join(f"{i},n{i},2024-01-01\n" for i in range(10)), [
+                ColumnDefinition(name="id", data_type="INT", index_type="BTREE"),
+                ColumnDefinition(name="name", data_type="VARCHAR", size=20),
+                ColumnDefinition(name="born", data_type="DATE"),
+            ])
+        return catalog, planner
+
+    def test_values_and_select(self):
+        async def run():
+            catalog, planner = await self.create_table()
+            values = await planner.execute_query(
+                "INSERT INTO people VALUES (10, 'A, B', '2024-02-01'), (11, 'O''NEIL', NULL)", 1)
+            partial = await planner.execute_query("INSERT INTO people (name, id) VALUES ('X', 12), ('Y', 13)", 1)
+            selected = await planner.execute_query("INSERT INTO people SELECT * FROM people WHERE id < 3", 1)
+            metadata = catalog.get_table_metadata("people", 1)
+            rows = list(await planner._scan_table(metadata))
+            index = planner.index_interface.open_index("BTREE", metadata["indices"]["id"]["path"])
+            return values, partial, selected, metadata, rows, index
+
+        values, partial, selected, metadata, rows, index = asyncio.run(run())
+
+        self.assertEqual(values["rows_affected"], 2)
+        self.assertEqual(partial["rows_affected"], 2)
+        self.assertEqual(selected["rows_affected"], 3)
+        self.assertEqual(metadata["row_count"], 17)
+        self.assertEqual(metadata["statistics"]["row_count"], 17)
+        self.assertEqual(rows[10:14], [
+            [10, "A, B", "2024-02-01"], [11, "O'NEIL", None], [12, "X", None], [13, "Y", None],
+        ])
+        self.assertEqual([row[0] for row in rows[14:]], [0, 1, 2])
+        # New rows are indexed by position
+        self.assertEqual(index.search(11), [11])
+        self.assertEqual(index.search(2), [2, 16])
+
+    def test_positions_from_row_ids(self):
+        async def run():
+            catalog, planner = await self.create_table()
+            metadata = catalog.get_table_metadata("people", 1)
+            # Rows appended by a writer the catalog does not count yet
+            heap_file = await planner._get_writable_storage(metadata)
+            await heap_file.append_rows([[100, "a", None], [101, "b", None]])
+            await planner.execute_query("INSERT INTO people VALUES (20, 'c', NULL)", 1)
+            return planner.index_interface.open_index("BTREE", metadata["indices"]["id"]["path"]).search(20)
+
+        self.assertEqual(asyncio.run(run()), [12])
+
+    def test_arity_error_inserts_nothing(self):
+        async def run():
+            catalog, planner = await self.create_table()
+            with self.assertRaises(ValueError):
+                await planner.execute_query("INSERT INTO people VALUES (20, 'a', '2024-01-01'), (21, 'b')", 1)
+            return catalog.get_table_metadata("people", 1)
+
+        self.assertEqual(asyncio.run(run())["row_count"], 10)
+
+    def test_index_that_cannot_open_rolls_back(self):
+        async def run():
+            catalog, planner = await self.create_table()
+            open_index = planner.index_interface.open_index
+
+            def broken_open_index(index_type, filepath):
+                raise ValueError("index files are unreadable")
+
+            planner.index_interface.open_index = broken_open_index
+            with self.assertRaisesRegex(ValueError, "Index on id cannot be updated"):
+                await planner.execute_query("INSERT INTO people VALUES (20, 'a', NULL)", 1)
+            planner.index_interface.open_index = open_index
+            await planner.execute_query("INSERT INTO people VALUES (21, 'b', NULL)", 1)
+            metadata = catalog.get_table_metadata("people", 1)
+            index = open_index("BTREE", metadata["indices"]["id"]["path"])
+            return metadata, list(await planner._scan_table(metadata)), index.search(20), index.search(21)
+
+        metadata, rows, position_20, position_21 = asyncio.run(run())
+
+        self.assertEqual(metadata["row_count"], 11)
+        self.assertEqual([row[0] for row in rows], list(range(10)) + [21])
+        self.assertEqual((position_20, position_21), ([], [10]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+from query.predicates import compile_predicate
+
+COLUMNS = [
+    {"name": "id", "data_type": "INT"},
+    {"name": "price", "data_type": "FLOAT"},
+    {"name": "name", "data_type": "VARCHAR"},
+    {"name": "born", "data_type": "DATE", "date_format": "%d/%m/%Y"},
+]
+ROWS = [
+    [1, 9.5, "ana", "2024-01-05"],
+    [2, 20.0, "bob", "2024-03-01"],
+    [3, None, "10", None],
+    [4, 20.0, None, "2023-12-31"],
+]
+
+
+def condition(column, operator, value, logical_op=None):
+    return {"column": column, "operator": operator, "value": value, "logical_op": logical_op}
+
+
+class PredicatesTest(unittest.TestCase):
+    def ids(self, *conditions):
+        predicate = compile_predicate(list(conditions), COLUMNS)
+        return [row[0] for row in ROWS if predicate(row)]
+
+    def test_typed_comparisons(self):
+        self.assertEqual(self.ids(), [1, 2, 3, 4])
+        # Literals take the column type once: '2' is the number 2, 20 equals 20.0
+        self.assertEqual(self.ids(condition("id", "=", "2")), [2])
+        self.assertEqual(self.ids(condition("price", "=", 20)), [2, 4])
+        self.assertEqual(self.ids(condition("price", "<", 10)), [1])
+        self.assertEqual(self.ids(condition("name", "=", 10)), [3])
+        # Dates in the column format are compared as stored (ISO)
+        self.assertEqual(self.ids(condition("born", "<", "01/02/2024")), [1, 4])
+        self.assertEqual(self.ids(condition("born", "BETWEEN", ["2024-01-01", "2024-12-31"])), [1, 2])
+
+    def test_nulls_sets_and_groups(self):
+        self.assertEqual(self.ids(condition("price", "=", None)), [3])
+        self.assertEqual(self.ids(condition("price", "!=", None)), [1, 2, 4])
+        # NULL is neither equal nor different to a value
+        self.assertEqual(self.ids(condition("price", "!=", 20)), [1])
+        self.assertEqual(self.ids(condition("name", "!=", "bob")), [1, 3])
+        self.assertEqual(self.ids(condition("price", ">=", 0)), [1, 2, 4])
+        self.assertEqual(self.ids(condition("name", "IN", ["bob", "ana", None])), [1, 2])
+        self.assertEqual(self.ids(condition("name", "NOT IN", ["bob"])), [1, 3])
+        self.assertEqual(self.ids(condition("price", "NOT BETWEEN", [0, 10])), [2, 4])
+        # id = 1 OR price = 20 AND name = 'bob'
+        self.assertEqual(self.ids(condition("id", "=", 1, "OR"), condition("price", "=", 20, "AND"),
+                                  condition("name", "=", "bob")), [1, 2])
+
+    def test_errors(self):
+        with self.assertRaisesRegex(ValueError, "Column missing not found"):
+            compile_predicate([condition("missing", "=", 1)], COLUMNS)
+        with self.assertRaisesRegex(ValueError, r"Cannot compare column id \(INT\)"):
+            compile_predicate([condition("id", ">", "abc")], COLUMNS)
+
+
+if __name__ == '__main__':
+    unittest.main()
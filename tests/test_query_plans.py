@@ -0,0 +1,135 @@
+import asyncio
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+from api.schemas import ColumnDefinition
+from helpers import create_table
+from query import query_planner
+from query.plan_cache import normalize_statement
+
+
+class QueryPlansTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    async def create_table(self):
+        storage_manager, catalog, planner = await create_table(
+            self.tmp_dir.name, "id,name,score\n" + "".join(f"{i},Name {i % 3},{i % 4}\n" for i in range(20)), [
+                ColumnDefinition(name="id", data_type="INT", index_type="BTREE"),
+                ColumnDefinition(name="name", data_type="VARCHAR", size=50),
+                ColumnDefinition(name="score", data_type="INT"),
+            ])
+        return catalog, planner
+
+    async def ids(self, planner, query):
+        return [row[0] for row in (await planner.execute_query(query, 1))["data"]]
+
+    def test_literals_and_conditions(self):
+        async def run():
+            catalog, planner = await self.create_table()
+            await planner.execute_query("insert into people values (20, 'Mixed Case', -1), (21, 'it''s', NULL);", 1)
+            return {
+                "mixed": await planner.execute_query("SELECT name, score FROM people WHERE name = 'Mixed Case'", 1),
+                "upper": await self.ids(planner, "SELECT id FROM people WHERE name = 'MIXED CASE'"),
+                "quote": await self.ids(planner, "SELECT id FROM people WHERE name = 'it''s'"),
+                # AND binds tighter than OR
+                "precedence": await self.ids(planner, "SELECT id FROM people WHERE id = 1 OR score = 2 AND id < 10"),
+                "grouped": await self.ids(planner, "SELECT id FROM people WHERE (id = 1 OR score = 2) AND id < 10"),
+                "not_in": await self.ids(planner, "SELECT id FROM people WHERE NOT (score IN (0, 1, 2) OR id > 15)"),
+                "not_between": await self.ids(planner, "SELECT id FROM people WHERE NOT id BETWEEN 2 AND 19"),
+                "ordered": await self.ids(planner, "SELECT id FROM people WHERE score = 3 ORDER BY id DESC LIMIT 2"),
+                "none": await self.ids(planner, "SELECT id FROM people LIMIT 0"),
+            }
+
+        results = asyncio.run(run())
+
+        self.assertEqual(results["mixed"]["data"], [["Mixed Case", -1]])
+        self.assertEqual(results["upper"], [])
+        self.assertEqual(results["quote"], [21])
+        self.assertEqual(results["precedence"], [1, 2, 6])
+        self.assertEqual(results["grouped"], [1, 2, 6])
+        self.assertEqual(results["not_in"], [3, 7, 11, 15])
+        self.assertEqual(results["not_between"], [0, 1, 20, 21])
+        self.assertEqual(results["ordered"], [19, 15])
+        self.assertEqual(results["none"], [])
+
+    def test_debug_logging(self):
+        async def run():
+            catalog, planner = await self.create_table()
+            with self.assertLogs("query.query_planner", "DEBUG") as logs:
+                await planner.execute_query("INSERT INTO people VALUES (20, 'x', 1)", 1)
+                await planner.execute_query("SELECT id FROM people WHERE id = 20", 1)
+            return [record.getMessage() for record in logs.records]
+
+        messages = asyncio.run(run())
+
+        self.assertIn("Rows to insert into people: 1", messages)
+        self.assertIn("Select plan: Project -> BatchFilter -> Scan", messages)
+        self.assertTrue(any(message.startswith("Query finished in") for message in messages))
+
+    def test_plan_cache(self):
+        async def run():
+            catalog, planner = await self.create_table()
+            first = await self.ids(planner, "SELECT id FROM people WHERE name = 'Name 1' AND id < 5")
+            again = await self.ids(planner, "select  id from PEOPLE where name='Name 1' and id<5;")
+            hits = planner.plan_cache.hits
+            other = await self.ids(planner, "SELECT id FROM people WHERE name = 'name 1' AND id < 5")
+            await planner.execute_query("ANALYZE people", 1)
+            replanned = await self.ids(planner, "SELECT id FROM people WHERE name = 'Name 1' AND id < 5")
+            with self.assertRaises(ValueError):
+                await planner.execute_query("SELECT id FROM people WHERE", 1)
+            return first, again, hits, other, replanned, planner.plan_cache
+
+        first, again, hits, other, replanned, cache = asyncio.run(run())
+
+        self.assertEqual(first, [1, 4])
+        self.assertEqual(again, first)
+        self.assertEqual(hits, 1)
+        self.assertEqual(other, [])
+        self.assertEqual(replanned, first)
+        # ANALYZE changed the catalog version: the statement was planned again
+        self.assertEqual(cache.hits, 1)
+        self.assertEqual(normalize_statement("select a from t where b = 'x  Y' ;"), "SELECT A FROM T WHERE B='x  Y'")
+
+    def test_cached_statement_is_not_compiled_again(self):
+        compiled = []
+        original = query_planner.compile_predicate
+
+        def counting_compile(conditions, columns):
+            compiled.append(conditions)
+            return original(conditions, columns)
+
+        async def run():
+            catalog, planner = await self.create_table()
+            query = "SELECT id FROM people WHERE id < 3 OR id = 7"
+            results = [await self.ids(planner, query)]
+            await planner.execute_query("DELETE FROM people WHERE id = 1", 1)
+            results.append(await self.ids(planner, query))
+            compiled_before_analyze = len(compiled)
+            await planner.execute_query("ANALYZE people", 1)
+            results.append(await self.ids(planner, query))
+            return results, compiled_before_analyze
+
+        query_planner.compile_predicate = counting_compile
+        try:
+            (first, after_delete, after_analyze), compiled_before_analyze = asyncio.run(run())
+        finally:
+            query_planner.compile_predicate = original
+
+        self.assertEqual(first, [0, 1, 2, 7])
+        # The DELETE compiles its own predicate; the second SELECT reuses the first one
+        self.assertEqual(after_delete, [0, 2, 7])
+        self.assertEqual(compiled_before_analyze, 2)
+        # ANALYZE changed the catalog version: the SELECT was prepared again
+        self.assertEqual(after_analyze, [0, 2, 7])
+        self.assertEqual(len(compiled), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
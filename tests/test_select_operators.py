@@ -0,0 +1,107 @@
+import asyncio
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+from api.schemas import ColumnDefinition
+from helpers import create_table
+from query.operators import IndexScan, Limit, Scan
+from storage.column_store import ColumnStore
+
+
+class SelectOperatorsTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    async def create_table(self):
+        storage_manager, catalog, planner = await create_table(self.tmp_dir.name, "id,name,score\n" + "".join(
+            f"{i},n{i},{'' if i % 7 == 0 else i % 10}\n" for i in range(5000)
+        ), [
+            ColumnDefinition(name="id", data_type="INT", index_type="BTREE"),
+            ColumnDefinition(name="name", data_type="VARCHAR", size=20),
+            ColumnDefinition(name="score", data_type="INT"),
+        ])
+        return catalog, planner
+
+    async def run_plan(self, catalog, planner, query):
+        """Rows of a SELECT and the leaf operator of its plan"""
+        parsed_query = planner._plan(query)
+        metadata = catalog.get_table_metadata("people", 1)
+        operator = await planner._select_operator(parsed_query, metadata, [0, 2])
+        rows = list(operator)
+        while operator.child is not None:
+            operator = operator.child
+        return rows, operator
+
+    def test_limit_stops_the_scan(self):
+        async def run():
+            catalog, planner = await self.create_table()
+            return (await self.run_plan(catalog, planner, "SELECT id, score FROM people WHERE score = 1 LIMIT 5"),
+                    await self.run_plan(catalog, planner, "SELECT id, score FROM people WHERE id > 10 LIMIT 3"),
+                    await self.run_plan(catalog, planner, "SELECT id, score FROM people WHERE id BETWEEN 100 AND 4000 LIMIT 3"))
+
+        (scan_rows, scan), (filtered_rows, filtered), (range_rows, range_scan) = asyncio.run(run())
+
+        self.assertEqual(scan_rows, [[1, 1], [11, 1], [31, 1], [41, 1], [51, 1]])
+        self.assertIsInstance(scan, Scan)
+        self.assertEqual(scan.rows_read, 52)
+        self.assertEqual(filtered_rows, [[11, 1], [12, 2], [13, 3]])
+        self.assertEqual(filtered.rows_read, 14)
+        # The range holds most of the table: scanning is cheaper than the index
+        self.assertEqual(range_rows, [[100, 0], [101, 1], [102, 2]])
+        self.assertIsInstance(range_scan, Scan)
+        self.assertEqual(range_scan.rows_read, 103)
+
+    def test_limit_stops_the_index_scan(self):
+        index_scan = IndexScan(range(1000), lambda batch: [[position] for position in batch])
+
+        self.assertEqual(list(Limit(index_scan, 3)), [[0], [1], [2]])
+        # Only the first batch of index positions was read
+        self.assertEqual(index_scan.rows_read, index_scan.batch_size)
+
+    def test_columnar_index_scan_reads_only_its_rows(self):
+        async def run():
+            storage_manager, catalog, planner = await create_table(self.tmp_dir.name, "id,name,score\n" + "".join(
+                f"{i},n{i},{i % 10}\n" for i in range(5000)
+            ), [
+                ColumnDefinition(name="id", data_type="INT", index_type="BTREE"),
+                ColumnDefinition(name="name", data_type="VARCHAR", size=20),
+                ColumnDefinition(name="score", data_type="INT"),
+            ], storage_format="columnar")
+            read_column = ColumnStore.read_column
+
+            def no_full_reads(store, column_index):
+                raise AssertionError("an index scan read a whole column")
+
+            ColumnStore.read_column = no_full_reads
+            try:
+                return await self.run_plan(catalog, planner, "SELECT id, score FROM people WHERE id IN (42, 43, 4000)")
+            finally:
+                ColumnStore.read_column = read_column
+
+        rows, operator = asyncio.run(run())
+
+        self.assertIsInstance(operator, IndexScan)
+        self.assertEqual(rows, [[42, 2], [43, 3], [4000, 0]])
+
+    def test_sort_and_project(self):
+        async def run():
+            catalog, planner = await self.create_table()
+            return (await planner.execute_query("SELECT score, id FROM people WHERE id < 15 ORDER BY score DESC LIMIT 4", 1),
+                    await planner.execute_query("SELECT id FROM people WHERE id < 15 ORDER BY score LIMIT 3", 1))
+
+        descending, ascending = asyncio.run(run())
+
+        self.assertEqual(descending["columns"], ["score", "id"])
+        self.assertEqual(descending["data"], [[9, 9], [8, 8], [6, 6], [5, 5]])
+        # NULL scores first, then by score; the sort column does not need to be selected
+        self.assertEqual(ascending["data"], [[0], [7], [14]])
+
+
+if __name__ == '__main__':
+    unittest.main()
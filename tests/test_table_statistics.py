@@ -0,0 +1,95 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+from api.schemas import DataType
+from catalog.table_statistics import (
+    HISTOGRAM_BUCKETS, build_table_statistics, estimate_selectivity, merge_table_statistics
+)
+
+COLUMNS = [
+    {"name": "id", "data_type": "INT"},
+    {"name": "city", "data_type": "VARCHAR"},
+    {"name": "day", "data_type": "DATE"},
+]
+
+
+def make_rows(start, count):
+    return [
+        [i, None if i % 10 == 0 else f"city{i % 7}", f"2024-{1 + i % 12:02d}-01"]
+        for i in range(start, start + count)
+    ]
+
+
+class TableStatisticsTest(unittest.TestCase):
+    def test_column_statistics(self):
+        stats = build_table_statistics(COLUMNS, make_rows(0, 1000))
+
+        self.assertEqual(stats["row_count"], 1000)
+        city = stats["columns"]["city"]
+        self.assertEqual(city["null_count"], 100)
+        self.assertEqual(city["distinct_count"], 7)
+        self.assertEqual((city["min"], city["max"]), ("city0", "city6"))
+
+        ids = stats["columns"]["id"]
+        self.assertEqual(len(ids["histogram"]), HISTOGRAM_BUCKETS + 1)
+        self.assertEqual(ids["histogram"], sorted(ids["histogram"]))
+        self.assertEqual((ids["histogram"][0], ids["histogram"][-1]), (0, 999))
+
+    def test_distinct_estimate(self):
+        stats = build_table_statistics(COLUMNS, make_rows(0, 20000))
+        estimate = stats["columns"]["id"]["distinct_count"]
+
+        self.assertLess(abs(estimate - 20000) / 20000, 0.3)
+
+    def test_selectivity(self):
+        stats = build_table_statistics(COLUMNS, make_rows(0, 1000))
+        ids = stats["columns"]["id"]
+
+        self.assertAlmostEqual(estimate_selectivity(ids, DataType.INT, "<", 250), 0.25, delta=0.05)
+        self.assertAlmostEqual(estimate_selectivity(ids, DataType.INT, "BETWEEN", [100, 199]), 0.1, delta=0.05)
+        self.assertLess(estimate_selectivity(ids, DataType.INT, "=", 5), 0.01)
+        self.assertAlmostEqual(
+            estimate_selectivity(stats["columns"]["city"], DataType.VARCHAR, "=", "city3"), 0.9 / 7, delta=0.01
+        )
+        self.assertAlmostEqual(
+            estimate_selectivity(stats["columns"]["city"], DataType.VARCHAR, "IN", ["city1", "city3", None]),
+            2 * 0.9 / 7, delta=0.01
+        )
+        self.assertAlmostEqual(
+            estimate_selectivity(stats["columns"]["city"], DataType.VARCHAR, "NOT IN", ["city3"]), 0.9 * 6 / 7, delta=0.01
+        )
+        self.assertAlmostEqual(estimate_selectivity(ids, DataType.INT, "NOT BETWEEN", [100, 199]), 0.9, delta=0.05)
+
+    def test_inclusive_bounds(self):
+        stats = build_table_statistics(COLUMNS, make_rows(0, 1000))
+        ids, day = stats["columns"]["id"], stats["columns"]["day"]
+        equal = estimate_selectivity(ids, DataType.INT, "=", 0)
+
+        # Comparisons that include a bound count the rows equal to it
+        self.assertEqual(estimate_selectivity(ids, DataType.INT, "<", 0), 0.0)
+        self.assertAlmostEqual(estimate_selectivity(ids, DataType.INT, "<=", 0), equal)
+        self.assertEqual(estimate_selectivity(ids, DataType.INT, ">", 999), 0.0)
+        self.assertAlmostEqual(estimate_selectivity(ids, DataType.INT, ">=", 999), equal)
+        self.assertGreater(estimate_selectivity(ids, DataType.INT, "BETWEEN", [999, 999]), 0.0)
+        # A frequent value fills several histogram buckets
+        self.assertAlmostEqual(estimate_selectivity(day, DataType.DATE, "<=", "2024-01-01"), 1 / 12, delta=0.03)
+        self.assertAlmostEqual(estimate_selectivity(day, DataType.DATE, ">=", "2024-12-01"), 1 / 12, delta=0.03)
+        self.assertAlmostEqual(estimate_selectivity(day, DataType.DATE, "<", "2024-12-01"), 11 / 12, delta=0.03)
+
+    def test_incremental_refresh(self):
+        merged = merge_table_statistics(
+            build_table_statistics(COLUMNS, make_rows(0, 1000)),
+            build_table_statistics(COLUMNS, make_rows(1000, 1000))
+        )
+        ids = merged["columns"]["id"]
+
+        self.assertEqual(merged["row_count"], 2000)
+        self.assertEqual((ids["min"], ids["max"]), (0, 1999))
+        self.assertEqual(merged["columns"]["city"]["null_count"], 200)
+        self.assertAlmostEqual(estimate_selectivity(ids, DataType.INT, "<", 1000), 0.5, delta=0.05)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,138 @@
+import asyncio
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+from api.schemas import ColumnDefinition
+from helpers import create_table
+
+
+class UpdateDeleteTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    async def create_table(self):
+        return await create_table(
+            self.tmp_dir.name, "id,name,score\n" + "".join(f"{i},N{i % 5},{i % 10}\n" for i in range(1000)), [
+                ColumnDefinition(name="id", data_type="INT", index_type="BTREE"),
+                ColumnDefinition(name="name", data_type="VARCHAR", size=200),
+                ColumnDefinition(name="score", data_type="INT"),
+            ])
+
+    async def ids(self, planner, query):
+        return [row[0] for row in (await planner.execute_query(query, 1))["data"]]
+
+    def test_delete_tombstones_rows(self):
+        async def run():
+            storage_manager, catalog, planner = await self.create_table()
+            by_scan = await planner.execute_query("DELETE FROM people WHERE score = 3", 1)
+            by_index = await planner.execute_query("DELETE FROM people WHERE id BETWEEN 10 AND 19", 1)
+            size = os.path.getsize(catalog.get_table_metadata("people", 1)["data_file"])
+            await storage_manager.checkpoint()
+            metadata = catalog.get_table_metadata("people", 1)
+            return (by_scan, by_index, metadata, size, await self.ids(planner, "SELECT id FROM people WHERE id = 13"),
+                    await self.ids(planner, "SELECT id FROM people WHERE id BETWEEN 0 AND 25"),
+                    await planner.get_table_data("people", 1, 1), await self.ids(planner, "SELECT * FROM people"))
+
+        by_scan, by_index, metadata, size, id_13, low_ids, first_page, all_ids = asyncio.run(run())
+
+        self.assertEqual(by_scan["rows_affected"], 100)
+        self.assertEqual(by_index["rows_affected"], 9)
+        self.assertEqual(metadata["row_count"], 891)
+        self.assertEqual(metadata["dead_rows"], 109)
+        # Tombstones only: the data file keeps its size
+        self.assertEqual(os.path.getsize(metadata["data_file"]), size)
+        self.assertEqual(id_13, [])
+        self.assertEqual(low_ids, [0, 1, 2, 4, 5, 6, 7, 8, 9, 20, 21, 22, 24, 25])
+        self.assertEqual(len(all_ids), 891)
+        self.assertEqual([row[0] for row in first_page["data"]][:11], [0, 1, 2, 4, 5, 6, 7, 8, 9, 20, 21])
+        self.assertEqual(first_page["total_pages"], 20)
+
+    def test_update_in_place_and_moved_rows(self):
+        async def run():
+            storage_manager, catalog, planner = await self.create_table()
+            in_place = await planner.execute_query("UPDATE people SET score = 99 WHERE id = 500", 1)
+            metadata = catalog.get_table_metadata("people", 1)
+            dead_after_in_place = metadata.get("dead_rows", 0)
+            long_name = "X" * 150
+            moved = await planner.execute_query(f"UPDATE people SET name = '{long_name}' WHERE score = 7", 1)
+            rekeyed = await planner.execute_query("UPDATE people SET id = 5000 WHERE id = 42", 1)
+            metadata = catalog.get_table_metadata("people", 1)
+            return (in_place, moved, rekeyed, dead_after_in_place, metadata,
+                    await planner.execute_query("SELECT id, score FROM people WHERE score = 99", 1),
+                    await planner.execute_query("SELECT id, name FROM people WHERE id = 17", 1),
+                    await self.ids(planner, "SELECT id FROM people WHERE id = 5000"),
+                    await self.ids(planner, "SELECT id FROM people WHERE id = 42"),
+                    await self.ids(planner, "SELECT id FROM people"))
+
+        in_place, moved, rekeyed, dead_after_in_place, metadata, score_99, row_17, new_key, old_key, all_ids = \
+            asyncio.run(run())
+
+        self.assertEqual(in_place["rows_affected"], 1)
+        self.assertEqual(dead_after_in_place, 0)
+        # The zone map of the page was widened, so the scan finds the new value
+        self.assertEqual(score_99["data"], [[500, 99]])
+        self.assertEqual(moved["rows_affected"], 100)
+        self.assertGreater(metadata["dead_rows"], 0)
+        self.assertEqual(metadata["row_count"], 1000)
+        self.assertEqual(row_17["data"], [[17, "X" * 150]])
+        self.assertEqual(rekeyed["rows_affected"], 1)
+        self.assertEqual(new_key, [5000])
+        self.assertEqual(old_key, [])
+        self.assertEqual(len(all_ids), 1000)
+
+    def test_vacuum_compacts_and_rebuilds_indices(self):
+        async def run():
+            storage_manager, catalog, planner = await self.create_table()
+            await planner.execute_query("DELETE FROM people WHERE id < 600", 1)
+            await planner.execute_query("UPDATE people SET name = 'LONG NAME VALUE FOR ROW' WHERE id = 700", 1)
+            size = os.path.getsize(catalog.get_table_metadata("people", 1)["data_file"])
+            catalog.vacuum.min_dead_rows = 1
+            reclaimed = await catalog.vacuum.run_once()
+            metadata = catalog.get_table_metadata("people", 1)
+            index = planner.index_interface.open_index("BTREE", metadata["indices"]["id"]["path"])
+            return (reclaimed, size, metadata, index.search(700), index.search(999), index.search(10),
+                    await planner.execute_query("SELECT id, name FROM people WHERE id = 700", 1),
+                    await self.ids(planner, "SELECT * FROM people"))
+
+        reclaimed, size, metadata, position_700, position_999, position_10, row_700, all_ids = asyncio.run(run())
+
+        self.assertGreaterEqual(reclaimed, 600)
+        self.assertEqual(metadata["dead_rows"], 0)
+        self.assertEqual(metadata["row_count"], 400)
+        self.assertLess(os.path.getsize(metadata["data_file"]), size)
+        self.assertEqual(len(all_ids), 400)
+        self.assertEqual(sorted(all_ids), list(range(600, 1000)))
+        self.assertEqual(position_999, [all_ids.index(999)])
+        self.assertEqual(position_700, [all_ids.index(700)])
+        self.assertEqual(position_10, [])
+        self.assertEqual(row_700["data"], [[700, "LONG NAME VALUE FOR ROW"]])
+
+    def test_failed_background_vacuum_is_logged(self):
+        async def run():
+            storage_manager, catalog, planner = await self.create_table()
+
+            async def failing_run_once():
+                raise OSError("disk full")
+
+            catalog.vacuum.run_once = failing_run_once
+            with self.assertLogs("catalog.vacuum", "ERROR") as logs:
+                catalog.vacuum.start()
+                catalog.vacuum.request()
+                await asyncio.sleep(0.05)
+            await catalog.vacuum.stop()
+            return logs.records
+
+        records = asyncio.run(run())
+
+        self.assertEqual(records[0].getMessage(), "Vacuum failed")
+        self.assertIsNotNone(records[0].exc_info)
+
+
+if __name__ == '__main__':
+    unittest.main()
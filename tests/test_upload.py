@@ -0,0 +1,48 @@
+import asyncio
+import hashlib
+import io
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+from fastapi import HTTPException, UploadFile
+from storage.storage_manager import StorageManager
+
+
+class UploadTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.storage_manager = StorageManager()
+        self.storage_manager.upload_chunk_size = 1000
+        self.storage_manager.max_file_size = 10000
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_streams_to_disk_with_hash(self):
+        content = b"id,name\n" + b"".join(b"%d,n%d\n" % (i, i) for i in range(900))
+        path = os.path.join(self.tmp_dir.name, "people.csv")
+
+        size, sha256 = asyncio.run(self.storage_manager.save_upload(UploadFile(io.BytesIO(content), filename="people.csv"), path))
+
+        self.assertEqual(size, len(content))
+        self.assertEqual(sha256, hashlib.sha256(content).hexdigest())
+        with open(path, 'rb') as f:
+            self.assertEqual(f.read(), content)
+
+    def test_size_limit_stops_the_copy(self):
+        path = os.path.join(self.tmp_dir.name, "big.csv")
+        upload = UploadFile(io.BytesIO(b"x" * 25000), filename="big.csv")
+
+        with self.assertRaises(HTTPException):
+            asyncio.run(self.storage_manager.save_upload(upload, path))
+
+        self.assertEqual(os.listdir(self.tmp_dir.name), [])
+        # Stopped at the first chunk past the limit instead of reading everything
+        self.assertLessEqual(upload.file.tell(), 11000)
+
+
+if __name__ == '__main__':
+    unittest.main()
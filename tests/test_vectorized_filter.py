@@ -0,0 +1,95 @@
+import asyncio
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+from api.schemas import ColumnDefinition
+from helpers import create_table
+from query.predicates import compile_predicate
+from query.vectorized import compile_batch_predicate
+
+COLUMNS = [
+    {"name": "id", "data_type": "INT"},
+    {"name": "price", "data_type": "FLOAT"},
+    {"name": "name", "data_type": "VARCHAR"},
+    {"name": "born", "data_type": "DATE", "date_format": "%d/%m/%Y"},
+    {"name": "embedding", "data_type": "ARRAY[FLOAT]"},
+]
+ROWS = [
+    [1, 9.5, "ana", "2024-01-05", [1.0]],
+    [2, 20.0, "bob", "2024-03-01", None],
+    [3, None, "10", None, [2.0]],
+    [4, 20.0, None, "2023-12-31", None],
+    [5, -3.0, "carla", "2024-01-01", None],
+]
+
+
+def condition(column, operator, value, logical_op=None):
+    return {"column": column, "operator": operator, "value": value, "logical_op": logical_op}
+
+
+class VectorizedFilterTest(unittest.TestCase):
+    def assertSameRows(self, *conditions, rows=ROWS):
+        mask_of = compile_batch_predicate(list(conditions), COLUMNS)
+        self.assertIsNotNone(mask_of)
+        predicate = compile_predicate(list(conditions), COLUMNS)
+        expected = [row[0] for row in rows if predicate(row)]
+        self.assertEqual([row[0] for row, keep in zip(rows, mask_of(rows)) if keep], expected)
+        return expected
+
+    def test_masks_match_row_predicate(self):
+        self.assertEqual(self.assertSameRows(condition("id", "=", "2")), [2])
+        self.assertEqual(self.assertSameRows(condition("price", ">=", 0)), [1, 2, 4])
+        # NULL != value is not true either
+        self.assertEqual(self.assertSameRows(condition("price", "!=", 20)), [1, 5])
+        self.assertEqual(self.assertSameRows(condition("name", "!=", "bob")), [1, 3, 5])
+        self.assertEqual(self.assertSameRows(condition("price", "=", None)), [3])
+        self.assertEqual(self.assertSameRows(condition("name", "!=", None)), [1, 2, 3, 5])
+        self.assertEqual(self.assertSameRows(condition("name", "<", "bz")), [1, 2, 3])
+        self.assertEqual(self.assertSameRows(condition("name", "IN", ["bob", "ana", None])), [1, 2])
+        self.assertEqual(self.assertSameRows(condition("name", "NOT IN", ["bob"])), [1, 3, 5])
+        self.assertEqual(self.assertSameRows(condition("born", "<", "01/02/2024")), [1, 4, 5])
+        self.assertEqual(self.assertSameRows(condition("born", "BETWEEN", ["2024-01-01", "2024-12-31"])), [1, 2, 5])
+        self.assertEqual(self.assertSameRows(condition("price", "NOT BETWEEN", [0, 10])), [2, 4, 5])
+        self.assertEqual(self.assertSameRows(condition("id", "IN", [1, 5, 7])), [1, 5])
+        # id = 1 OR price = 20 AND name = 'bob' OR born IS NULL
+        self.assertEqual(self.assertSameRows(condition("id", "=", 1, "OR"), condition("price", "=", 20, "AND"),
+                                             condition("name", "=", "bob", "OR"), condition("born", "=", None)),
+                         [1, 2, 3])
+
+    def test_fallbacks(self):
+        # ARRAY columns are not vectorized
+        self.assertIsNone(compile_batch_predicate([condition("embedding", "=", "[1.0]")], COLUMNS))
+        self.assertIsNone(compile_batch_predicate([], COLUMNS))
+        # Integers beyond float64 precision use the row predicate for the batch
+        big = [[2 ** 60, 1.0, "x", None, None], [2 ** 60 + 1, 1.0, "y", None, None]]
+        mask_of = compile_batch_predicate([condition("id", ">", 2 ** 52)], COLUMNS)
+        self.assertEqual(list(mask_of(big)), [True, True])
+        self.assertIsNone(compile_batch_predicate([condition("id", "=", 2 ** 60 + 1)], COLUMNS))
+
+    def test_full_scan_uses_batch_filter(self):
+        async def run():
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                storage_manager, catalog, planner = await create_table(tmp_dir, "id,name,score\n" + "".join(
+                    f"{i},n{i},{'' if i % 7 == 0 else i % 10}\n" for i in range(10000)
+                ), [
+                    ColumnDefinition(name="id", data_type="INT"),
+                    ColumnDefinition(name="name", data_type="VARCHAR", size=20),
+                    ColumnDefinition(name="score", data_type="INT"),
+                ])
+                query = "SELECT id FROM people WHERE score IN (3, 4) AND id >= 9000 OR name = 'n5'"
+                operator = await planner._select_operator(
+                    planner._plan(query), catalog.get_table_metadata("people", 1), [0])
+                return operator.explain(), await planner.execute_query(query, 1)
+
+        explain, result = asyncio.run(run())
+
+        self.assertEqual(explain, ["Project", "BatchFilter", "Scan"])
+        expected = [[5]] + [[i] for i in range(9000, 10000) if i % 7 != 0 and i % 10 in (3, 4)]
+        self.assertEqual(result["data"], expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,185 @@
+import asyncio
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+from api.schemas import ColumnDefinition, CreateTableRequest
+from helpers import create_table, open_catalog
+from storage.storage_manager import StorageManager
+from storage.heap_file import HeapFile
+from storage.mapped_reader import MappedHeapReader
+
+COLUMNS = [
+    {"name": "id", "data_type": "INT"},
+    {"name": "name", "data_type": "VARCHAR"},
+]
+
+
+class WriteAheadLogTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.data_file = os.path.join(self.tmp_dir.name, "table.dat")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    async def _open(self):
+        storage_manager = StorageManager()
+        storage_manager.data_dir = self.tmp_dir.name
+        await storage_manager.initialize()
+        return storage_manager, HeapFile(self.data_file, COLUMNS, storage_manager)
+
+    def test_group_commit_and_checkpoint(self):
+        async def run():
+            storage_manager, heap_file = await self._open()
+            await heap_file.create()
+
+            async def insert(i):
+                async with storage_manager.transaction():
+                    await heap_file.insert_rows([[i, f"n{i}"]])
+
+            await asyncio.gather(*(insert(i) for i in range(20)))
+            fsyncs = storage_manager.wal.fsync_count
+            # Rows are visible before they reach the data file
+            staged_size = os.path.getsize(self.data_file)
+            visible = list(MappedHeapReader(heap_file, storage_manager).iter_rows())
+
+            await storage_manager.checkpoint()
+            return fsyncs, staged_size, visible, storage_manager, heap_file
+
+        fsyncs, staged_size, visible, storage_manager, heap_file = asyncio.run(run())
+
+        self.assertLess(fsyncs, 20)
+        self.assertEqual(staged_size, 0)
+        self.assertEqual(sorted(row[0] for row in visible), list(range(20)))
+        self.assertEqual(os.path.getsize(self.data_file), heap_file.page_size)
+        self.assertEqual(os.path.getsize(storage_manager.wal.path), 0)
+        self.assertEqual(storage_manager.dirty_pages, {})
+
+    def test_recovery_replays_committed_statements_only(self):
+        async def crash():
+            storage_manager, heap_file = await self._open()
+            await heap_file.create()
+            async with storage_manager.transaction():
+                await heap_file.insert_rows([[1, "kept"]])
+            # A statement that logged its page but never committed
+            txn = storage_manager.wal.begin()
+            page = (await heap_file.read_page(0))
+            page.insert(heap_file.encode_row([2, "lost"]))
+            storage_manager.wal.log_write(txn, self.data_file, 0, page.to_bytes())
+            await storage_manager.wal.flush()
+
+        async def restart():
+            storage_manager, heap_file = await self._open()
+            recovered = await storage_manager.recover()
+            return recovered, await heap_file.read_all()
+
+        asyncio.run(crash())
+        self.assertEqual(os.path.getsize(self.data_file), 0)
+
+        recovered, rows = asyncio.run(restart())
+        self.assertEqual(recovered, {self.data_file})
+        self.assertEqual(rows, [[1, "kept"]])
+
+    def test_failed_statement_is_rolled_back(self):
+        async def run():
+            storage_manager, heap_file = await self._open()
+            await heap_file.create()
+            async with storage_manager.transaction():
+                await heap_file.insert_rows([[1, "a"]])
+            with self.assertRaises(ValueError):
+                async with storage_manager.transaction():
+                    # The first page fills up and is staged before the oversized row fails
+                    await heap_file.insert_rows([[i, "y" * 100] for i in range(60)] + [[0, "x" * 10000]])
+            return await heap_file.read_all()
+
+        self.assertEqual(asyncio.run(run()), [[1, "a"]])
+
+    def test_new_file_inside_transaction(self):
+        async def run():
+            storage_manager, heap_file = await self._open()
+            # A checkpoint waiting for the latch holds the checkpoint lock meanwhile
+            async with storage_manager.transaction():
+                checkpoint = asyncio.create_task(storage_manager.checkpoint())
+                await asyncio.sleep(0)
+                await heap_file.insert_rows([[1, "a"]])
+                with self.assertRaises(RuntimeError):
+                    await heap_file.create()
+            await checkpoint
+            return await heap_file.read_all()
+
+        # With the lock order inverted the statement and the checkpoint deadlock
+        self.assertEqual(asyncio.run(asyncio.wait_for(run(), timeout=5)), [[1, "a"]])
+
+    def test_recovery_then_reconcile_row_counts(self):
+        async def crash():
+            storage_manager, catalog, planner = await create_table(
+                self.tmp_dir.name, "id,name\n1,a\n2,b\n", [
+                    ColumnDefinition(name="id", data_type="INT"),
+                    ColumnDefinition(name="name", data_type="VARCHAR", size=10),
+                ])
+            await planner.execute_query("INSERT INTO people VALUES (3, 'c'), (4, 'd')", 1)
+            await planner.execute_query("DELETE FROM people WHERE id = 1", 1)
+
+        async def restart():
+            storage_manager, catalog = await open_catalog(self.tmp_dir.name)
+            recovered = await storage_manager.recover()
+            await catalog.reconcile_row_counts(recovered)
+            return recovered, catalog.get_table_metadata("people", 1)
+
+        asyncio.run(crash())
+        recovered, metadata = asyncio.run(restart())
+
+        self.assertEqual(recovered, {metadata["data_file"]})
+        self.assertEqual((metadata["row_count"], metadata["dead_rows"]), (3, 1))
+
+    def test_recreated_table_ignores_writes_to_dropped_file(self):
+        columns = [
+            ColumnDefinition(name="id", data_type="INT"),
+            ColumnDefinition(name="name", data_type="VARCHAR", size=10),
+        ]
+
+        async def crash():
+            storage_manager, catalog, planner = await create_table(self.tmp_dir.name, "id,name\n1,a\n2,b\n", columns)
+            await planner.execute_query("INSERT INTO people VALUES (3, 'OLD')", 1)
+            await catalog.delete_table("people", 1)
+            source = os.path.join(self.tmp_dir.name, "new.csv")
+            with open(source, 'w', encoding='utf-8') as f:
+                f.write("id,name\n10,x\n")
+            await catalog.create_table(CreateTableRequest(table_name="people", file_name=source, columns=columns), 1)
+
+        async def restart():
+            storage_manager, catalog = await open_catalog(self.tmp_dir.name)
+            await storage_manager.recover()
+            metadata = catalog.get_table_metadata("people", 1)
+            return await HeapFile(metadata["data_file"], metadata["columns"], storage_manager).read_all()
+
+        asyncio.run(crash())
+
+        self.assertEqual(asyncio.run(restart()), [[10, "x"]])
+
+    def test_failed_checkpoint_is_logged(self):
+        async def run():
+            storage_manager, heap_file = await self._open()
+
+            async def failing_checkpoint():
+                raise OSError("disk full")
+
+            storage_manager.checkpoint = failing_checkpoint
+            with self.assertLogs("storage.wal", "ERROR") as logs:
+                storage_manager.start_checkpointer()
+                storage_manager.checkpointer.request()
+                await asyncio.sleep(0.05)
+            await storage_manager.checkpointer.stop()
+            return logs.records
+
+        records = asyncio.run(run())
+
+        self.assertEqual(records[0].getMessage(), "Checkpoint failed")
+        self.assertIsNotNone(records[0].exc_info)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+import asyncio
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+from storage.heap_file import HeapFile
+from storage.mapped_reader import MappedHeapReader
+from storage.storage_manager import StorageManager
+
+COLUMNS = [
+    {"name": "id", "data_type": "INT"},
+    {"name": "level", "data_type": "VARCHAR", "bloom_filter": True},
+    {"name": "day", "data_type": "DATE"},
+]
+
+
+def log_row(i):
+    return [i, f"level{i % 50}", f"2024-{1 + i // 1000:02d}-{1 + i % 28:02d}"]
+
+
+class ZoneMapTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.storage_manager = StorageManager()
+        self.heap = HeapFile(os.path.join(self.tmp_dir.name, "log.dat"), COLUMNS, self.storage_manager)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def scan(self, conditions):
+        entries = self.heap.zone_map.load()
+        reader = MappedHeapReader(self.heap, self.storage_manager)
+        rows = list(reader.iter_rows(
+            lambda page_no, slots: self.heap.zone_map.page_may_match(entries.get(page_no), slots, conditions)
+        ))
+        return rows, reader.pages_skipped
+
+    def test_date_range_skips_pages(self):
+        asyncio.run(self.heap.write_all([log_row(i) for i in range(5000)]))
+
+        rows, skipped = self.scan([(2, "BETWEEN", ["2024-03-01", "2024-03-31"])])
+
+        self.assertEqual([row[0] for row in rows if "2024-03-01" <= row[2] <= "2024-03-31"], list(range(2000, 3000)))
+        self.assertGreater(skipped, self.heap.page_count // 2)
+
+    def test_inserts_keep_zones_current(self):
+        asyncio.run(self.heap.write_all([log_row(i) for i in range(1000)]))
+        asyncio.run(self.heap.insert_rows([[99999, "late", "2023-06-01"]]))
+
+        rows, _ = self.scan([(0, ">", 50000)])
+
+        self.assertIn([99999, "late", "2023-06-01"], rows)
+        self.assertEqual(len(self.heap.zone_map.load()), self.heap.page_count)
+
+    def test_bloom_filter(self):
+        asyncio.run(self.heap.write_all([[i, "common" if i != 777 else "rare", "2024-01-01"] for i in range(3000)]))
+
+        rows, skipped = self.scan([(1, "=", "rare")])
+
+        self.assertIn([777, "rare", "2024-01-01"], rows)
+        self.assertEqual(skipped, self.heap.page_count - 1)
+
+    def test_stale_entry_is_ignored(self):
+        asyncio.run(self.heap.write_all([log_row(i) for i in range(10)]))
+        entry = self.heap.zone_map.load()[0]
+
+        self.assertFalse(self.heap.zone_map.page_may_match(entry, 10, [(0, ">", 100)]))
+        self.assertTrue(self.heap.zone_map.page_may_match(entry, 11, [(0, ">", 100)]))
+
+
+if __name__ == '__main__':
+    unittest.main()